@@ -0,0 +1,315 @@
+import csv
+
+import numpy as np
+
+from historique import en_nombre
+
+# -----------------------------------------------------------------------------
+# INDEX ANALYTIQUE EN MÉMOIRE (colonnes NumPy + agrégats précalculés)
+# -----------------------------------------------------------------------------
+#
+# Répond aux questions du type "top wantlist par genre / décennie" ou "prix
+# moyen par format" sans passer par un tableur :
+#   - chaque statistique est une colonne float64 (NaN = valeur absente)
+#   - chaque dimension (genre, label, format, pays, année, décennie) est
+#     encodée en identifiants entiers. Une cellule pouvant contenir plusieurs
+#     valeurs ("Rock, Pop"), la dimension est "dépliée" : deux tableaux
+#     parallèles (ligne, code), triés par code => index inverse par tranches
+#   - nombre / somme / valeurs présentes par (dimension, statistique) sont
+#     calculés une fois (np.bincount) : un regroupement sans filtre est un
+#     simple accès, avec filtre un bincount sur les lignes retenues
+
+METRIQUES = ('en_collection', 'en_wantlist', 'note_moyenne', 'nombre_notes',
+             'prix_faible', 'prix_moyen', 'prix_eleve')
+
+# Dimension => colonne du CSV (valeurs séparées par des virgules)
+DIMENSIONS_TEXTE = {'genre': 'genres', 'label': 'label', 'format': 'format', 'pays': 'pays'}
+
+AGREGATS = ('nombre', 'somme', 'moyenne')
+
+class Dimension:
+
+    def __init__(self, nom, valeurs_par_ligne):
+
+        # valeurs_par_ligne : pour chaque ligne, la liste de ses valeurs (éventuellement vide)
+
+        self.nom = nom
+        self.ids = {}
+        self.valeurs = []
+        lignes, codes = [], []
+        for ligne, valeurs in enumerate(valeurs_par_ligne):
+            for valeur in valeurs:
+                code = self.ids.get(valeur)
+                if code is None:
+                    code = self.ids[valeur] = len(self.valeurs)
+                    self.valeurs.append(valeur)
+                lignes.append(ligne)
+                codes.append(code)
+
+        # Tri stable par code : les lignes d'une valeur forment une tranche contiguë
+        codes = np.array(codes, dtype=np.int32)
+        ordre = np.argsort(codes, kind='stable')
+        self.codes = codes[ordre]
+        self.lignes = np.array(lignes, dtype=np.int32)[ordre]
+        self.debuts = np.searchsorted(self.codes, np.arange(len(self.valeurs) + 1))
+
+    def lignes_de(self, valeur):
+
+        # Index inverse : lignes (triées) qui contiennent cette valeur
+
+        code = self.ids.get(valeur)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self.lignes[self.debuts[code]:self.debuts[code + 1]]
+
+    def __len__(self):
+        return len(self.valeurs)
+
+class IndexAnalytique:
+
+    def __init__(self, albums):
+        self.albums = list(albums)
+        self.taille = len(self.albums)
+
+        self.colonnes = {metrique: np.array([_nombre(album.get(metrique)) for album in self.albums],
+                                            dtype=np.float64)
+                         for metrique in METRIQUES}
+        self.colonnes['annee'] = np.array([_annee(album) for album in self.albums], dtype=np.float64)
+
+        self.dimensions = {nom: Dimension(nom, (_separer(album.get(colonne)) for album in self.albums))
+                           for nom, colonne in DIMENSIONS_TEXTE.items()}
+        annees = self.colonnes['annee']
+        self.dimensions['annee'] = Dimension('annee', ([int(a)] if a == a else [] for a in annees))
+        self.dimensions['decennie'] = Dimension('decennie', ([int(a) // 10 * 10] if a == a else [] for a in annees))
+
+        # Agrégats précalculés : {(dimension, statistique): (nombre, somme)} par code,
+        # nombre = valeurs présentes (non NaN) ; {dimension: lignes} par code
+        self._agregats = {}
+        self._lignes_par_valeur = {}
+        self._ordres = {}
+        for nom, dimension in self.dimensions.items():
+            self._lignes_par_valeur[nom] = np.diff(dimension.debuts)
+            for metrique in self.colonnes:
+                self._agregats[(nom, metrique)] = self._bincount(dimension, metrique, None)
+
+    @classmethod
+    def depuis_csv(cls, nom_fichier='discogs_albums_final.csv'):
+        with open(nom_fichier, newline='', encoding='utf-8') as csvfile:
+            return cls(csv.DictReader(csvfile))
+
+    def _bincount(self, dimension, metrique, garder):
+
+        # (nombre de valeurs présentes, somme) par code, sur les entrées dépliées retenues
+
+        codes, lignes = dimension.codes, dimension.lignes
+        if garder is not None:
+            codes, lignes = codes[garder], lignes[garder]
+        valeurs = self.colonnes[metrique][lignes]
+        presentes = ~np.isnan(valeurs)
+        taille = len(dimension)
+        nombre = np.bincount(codes[presentes], minlength=taille)
+        somme = np.bincount(codes[presentes], weights=valeurs[presentes], minlength=taille)
+        return nombre, somme
+
+    # --- Filtres -------------------------------------------------------------
+
+    def masque(self, **criteres):
+
+        # Masque booléen des lignes qui vérifient TOUS les critères :
+        #   genre='Rock' ou genre=['Rock', 'Jazz'] (l'une des valeurs)
+        #   decennie=1970, pays='UK', label=..., format=...
+        #   prix_moyen=(10, 50), annee=(1970, 1979) : intervalle fermé, None = non borné
+
+        masque = np.ones(self.taille, dtype=bool)
+        for nom, critere in criteres.items():
+            if nom in self.colonnes and isinstance(critere, tuple) and len(critere) == 2:
+                colonne = self.colonnes[nom]
+                minimum, maximum = critere
+                if minimum is not None:
+                    masque &= colonne >= minimum
+                if maximum is not None:
+                    masque &= colonne <= maximum
+            elif nom in self.dimensions:
+                valeurs = critere if isinstance(critere, (list, tuple, set)) else [critere]
+                retenues = np.zeros(self.taille, dtype=bool)
+                for valeur in valeurs:
+                    retenues[self.dimensions[nom].lignes_de(valeur)] = True
+                masque &= retenues
+            else:
+                raise ValueError(f"Critère inconnu : {nom}")
+        return masque
+
+    def filtrer(self, **criteres):
+
+        # Indices des lignes retenues
+
+        return np.flatnonzero(self.masque(**criteres))
+
+    # --- Regroupements -------------------------------------------------------
+
+    def grouper(self, par, metrique=None, agregat='moyenne', **criteres):
+
+        # {valeur de la dimension: agrégat}, de la plus grande à la plus petite valeur
+        # metrique=None : nombre de lignes par valeur
+
+        dimension = self.dimensions[par]
+        if agregat not in AGREGATS:
+            raise ValueError(f"Agrégat inconnu : {agregat} (possibles : {', '.join(AGREGATS)})")
+
+        if metrique is None:
+            if criteres:
+                garder = self.masque(**criteres)[dimension.lignes]
+                resultat = np.bincount(dimension.codes[garder], minlength=len(dimension))
+            else:
+                resultat = self._lignes_par_valeur[par]
+            return _en_dict(dimension, resultat.astype(np.float64), resultat > 0)
+
+        if criteres:
+            garder = self.masque(**criteres)[dimension.lignes]
+            nombre, somme = self._bincount(dimension, metrique, garder)
+        else:
+            nombre, somme = self._agregats[(par, metrique)]
+
+        if agregat == 'nombre':
+            resultat = nombre.astype(np.float64)
+        elif agregat == 'somme':
+            resultat = somme
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                resultat = somme / nombre
+        return _en_dict(dimension, resultat, nombre > 0)
+
+    # --- Top-k ---------------------------------------------------------------
+
+    def top(self, metrique, k=10, par=None, **criteres):
+
+        # Les k albums avec la plus grande valeur de la statistique
+        # par='genre' : {genre: k meilleurs albums} (un album peut apparaître dans plusieurs groupes)
+
+        colonne = self.colonnes[metrique]
+        masque = self.masque(**criteres) & ~np.isnan(colonne)
+
+        if par is None:
+            lignes = np.flatnonzero(masque)
+            if len(lignes) > k:
+                # Sélection partielle O(n), seuls les k retenus sont triés
+                lignes = lignes[np.argpartition(-colonne[lignes], k - 1)[:k]]
+            lignes = lignes[np.argsort(-colonne[lignes], kind='stable')]
+            return [self.albums[i] for i in lignes]
+
+        dimension = self.dimensions[par]
+        lignes = self._lignes_triees(par, metrique)
+        resultat = {}
+        for code in range(len(dimension)):
+            # Tranche du groupe, déjà triée par valeur décroissante : les k premières retenues
+            tranche = lignes[dimension.debuts[code]:dimension.debuts[code + 1]]
+            tranche = tranche[masque[tranche]][:k]
+            if len(tranche):
+                resultat[dimension.valeurs[code]] = [self.albums[i] for i in tranche]
+        return resultat
+
+    def _lignes_triees(self, par, metrique):
+
+        # Lignes dépliées de la dimension, triées par code puis valeur décroissante
+        # (calculé à la première demande puis gardé : les top-k par groupe deviennent des tranches)
+
+        cle = (par, metrique)
+        if cle not in self._ordres:
+            dimension = self.dimensions[par]
+            valeurs = self.colonnes[metrique][dimension.lignes]
+            # NaN en fin de tranche
+            valeurs = np.where(np.isnan(valeurs), -np.inf, valeurs)
+            ordre = np.lexsort((-valeurs, dimension.codes))
+            self._ordres[cle] = dimension.lignes[ordre]
+        return self._ordres[cle]
+
+    def __len__(self):
+        return self.taille
+
+def _nombre(texte):
+    valeur = en_nombre(texte)
+    return np.nan if valeur is None else valeur
+
+def _annee(album):
+
+    # Année de la colonne 'annee', sinon de la date de sortie (JJ/MM/AAAA)
+
+    annee = en_nombre(album.get('annee'))
+    if annee is None:
+        date = album.get('date_sortie') or ''
+        annee = en_nombre(date[-4:]) if len(date) >= 4 else None
+    return np.nan if annee is None else annee
+
+def _separer(valeurs_str):
+    if not valeurs_str:
+        return []
+    valeurs = []
+    for valeur in valeurs_str.split(','):
+        valeur = valeur.strip()
+        if valeur and valeur not in valeurs:
+            valeurs.append(valeur)
+    return valeurs
+
+def _en_dict(dimension, resultat, presents):
+
+    # {valeur: agrégat} pour les valeurs présentes, triées par agrégat décroissant
+
+    codes = np.flatnonzero(presents)
+    codes = codes[np.argsort(-resultat[codes], kind='stable')]
+    return {dimension.valeurs[code]: float(resultat[code]) for code in codes}
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Requêtes sur le CSV enrichi")
+    parser.add_argument("--fichier", default="discogs_albums_final.csv")
+    filtres = argparse.ArgumentParser(add_help=False)
+    filtres.add_argument("--filtre", action="append", default=[], metavar="NOM=VALEUR",
+                         help="Ex. genre=Rock, decennie=1970, prix_moyen=10:50 (répétable)")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    commande_top = commandes.add_parser("top", parents=[filtres],
+                                        help="Albums avec la plus grande valeur d'une statistique")
+    commande_top.add_argument("metrique", choices=METRIQUES)
+    commande_top.add_argument("--par", choices=sorted(DIMENSIONS_TEXTE) + ['annee', 'decennie'])
+    commande_top.add_argument("-k", type=int, default=10)
+
+    commande_grouper = commandes.add_parser("grouper", parents=[filtres],
+                                            help="Agrégat d'une statistique par valeur d'une dimension")
+    commande_grouper.add_argument("par", choices=sorted(DIMENSIONS_TEXTE) + ['annee', 'decennie'])
+    commande_grouper.add_argument("metrique", nargs="?", choices=METRIQUES)
+    commande_grouper.add_argument("--agregat", choices=AGREGATS, default='moyenne')
+    commande_grouper.add_argument("-k", type=int, default=20)
+
+    args = parser.parse_args()
+
+    def _critere(texte):
+        nom, _, valeur = texte.partition('=')
+        if ':' in valeur:
+            minimum, _, maximum = valeur.partition(':')
+            return nom, (float(minimum) if minimum else None, float(maximum) if maximum else None)
+        if nom in ('annee', 'decennie'):
+            return nom, int(valeur)
+        return nom, valeur
+
+    criteres = dict(_critere(f) for f in args.filtre)
+
+    debut = time.perf_counter()
+    index = IndexAnalytique.depuis_csv(args.fichier)
+    print(f"{len(index)} albums indexés en {time.perf_counter() - debut:.2f}s\n")
+
+    debut = time.perf_counter()
+    if args.commande == "top":
+        resultat = index.top(args.metrique, args.k, args.par, **criteres)
+        groupes = resultat.items() if args.par else [(None, resultat)]
+        for groupe, albums in groupes:
+            if groupe is not None:
+                print(f"{groupe}")
+            for album in albums:
+                print(f"  {album[args.metrique]:>10}  {album['artiste']} - {album['album']}")
+    else:
+        resultat = index.grouper(args.par, args.metrique, args.agregat, **criteres)
+        for valeur, agregat in list(resultat.items())[:args.k]:
+            print(f"  {agregat:>12.2f}  {valeur}")
+    print(f"\nRequête : {(time.perf_counter() - debut) * 1000:.2f} ms")
@@ -0,0 +1,182 @@
+import asyncio
+
+import configuration as config
+import main
+from enregistrements import Album
+from pool_navigateurs import fermer_pool
+
+# -----------------------------------------------------------------------------
+# API ASYNCHRONE (intégrable dans une boucle d'événements existante)
+# -----------------------------------------------------------------------------
+#
+# Les résultats sont produits au fil de l'eau par des générateurs asynchrones :
+#
+#     async for album in iterer_albums_enrichis(iterer_albums_catalogue(1, 5)):
+#         ...
+#
+# Contre-pression : les files internes sont bornées, donc si le consommateur
+# ralentit, la récupération des pages ralentit aussi (rien ne s'accumule).
+# Des enveloppes synchrones sont fournies pour les scripts classiques.
+#
+# Les navigateurs sont gardés dans un pool propre à la boucle d'événements :
+# l'application hôte appelle `await fermer_pool()` quand elle a terminé.
+
+async def _extraire_hors_boucle(fonction, *args):
+
+    # Le parsing BeautifulSoup est du CPU : exécuté dans un thread pour ne pas
+    # bloquer la boucle d'événements de l'application hôte
+
+    boucle = asyncio.get_running_loop()
+    return await boucle.run_in_executor(None, fonction, *args)
+
+async def iterer_pages_catalogue(page_debut=1, page_fin=200, resultats_par_page=50, filtres=None):
+
+    # Produit (numéro de page, liste d'albums) pour chaque page du catalogue
+    # Une page en échec est ignorée (comme recuperer_infos_catalogue)
+
+    for page in range(page_debut, page_fin + 1):
+        url = main.construire_url_catalogue(page, resultats_par_page, filtres)
+        try:
+            response = await main.crawl_get_async(url, wait_for_selector="div.card-release-title",
+                                                   max_retries=3)
+        except Exception as e:
+            print(f"  Page {page} ignorée après échec des tentatives: {e}")
+            await asyncio.sleep(config.PAUSE_ERREUR_CATALOGUE)
+            continue
+
+        albums = await _extraire_hors_boucle(main.extraire_infos_catalogue, response.html)
+        yield page, albums
+
+        # Page vide : fin du listing
+        if not albums:
+            break
+        await asyncio.sleep(config.PAUSE_CATALOGUE)
+
+async def iterer_albums_catalogue(page_debut=1, page_fin=200, resultats_par_page=50, filtres=None):
+
+    # Produit les albums du catalogue un par un
+
+    async for _, albums in iterer_pages_catalogue(page_debut, page_fin, resultats_par_page, filtres):
+        for album in albums:
+            yield album
+
+async def _enrichir_un_album(album, nettoyer=True):
+
+    # Visite la page album ; en cas d'échec l'album est rendu non enrichi
+    # Les clés hors CHAMPS_ALBUM (ex : 'rang' de l'ordonnanceur) ne sont pas gardées
+
+    if not isinstance(album, Album):
+        album = Album.depuis_dict(album)
+    try:
+        response = await main.crawl_get_async(album['url'])
+        infos = await _extraire_hors_boucle(main.extraire_infos_completes_album,
+                                            response.html, album['url'], nettoyer)
+        album.mettre_a_jour(infos)
+    except Exception as e:
+        print(f"  Erreur ({album['url']}) : {e}")
+        await asyncio.sleep(config.PAUSE_ERREUR_ALBUM)
+    return album
+
+async def iterer_albums_enrichis(albums, concurrence=4, taille_tampon=None, nettoyer=True):
+
+    # Enrichit les albums (itérable classique OU asynchrone) avec `concurrence`
+    # pages album en parallèle, et les produit dans l'ordre où ils sont terminés
+
+    taille_tampon = taille_tampon or concurrence * 2
+    entrees = asyncio.Queue(maxsize=concurrence)
+    sorties = asyncio.Queue(maxsize=taille_tampon)
+    fin = object()
+    erreurs = []
+
+    async def _producteur():
+        try:
+            if hasattr(albums, '__aiter__'):
+                async for album in albums:
+                    await entrees.put(album)
+            else:
+                for album in albums:
+                    await entrees.put(album)
+        except asyncio.CancelledError:
+            # Consommateur arrêté avant la fin : fermer proprement la source
+            if hasattr(albums, 'aclose'):
+                await albums.aclose()
+            raise
+        except Exception as e:
+            erreurs.append(e)
+        # Un marqueur de fin par worker
+        for _ in range(concurrence):
+            await entrees.put(fin)
+
+    async def _worker():
+        try:
+            while True:
+                album = await entrees.get()
+                if album is fin:
+                    break
+                await sorties.put(await _enrichir_un_album(album, nettoyer))
+                await asyncio.sleep(config.PAUSE_ALBUM)
+        except asyncio.CancelledError:
+            # Consommateur arrêté : plus personne n'attend le marqueur de fin
+            raise
+        except Exception as e:
+            # Transmise au consommateur comme celles du producteur
+            erreurs.append(e)
+        # Toujours un marqueur de fin, sinon le consommateur l'attend indéfiniment
+        await sorties.put(fin)
+
+    taches = [asyncio.ensure_future(_producteur())]
+    taches += [asyncio.ensure_future(_worker()) for _ in range(concurrence)]
+
+    try:
+        termines = 0
+        while termines < concurrence:
+            album = await sorties.get()
+            if album is fin:
+                termines += 1
+                continue
+            yield album
+    finally:
+        for tache in taches:
+            tache.cancel()
+        await asyncio.gather(*taches, return_exceptions=True)
+
+    if erreurs:
+        raise erreurs[0]
+
+# -----------------------------------------------------------------------------
+# ENVELOPPES SYNCHRONES
+# -----------------------------------------------------------------------------
+
+def iterer_sync(generateur_async):
+
+    # Transforme un générateur asynchrone en générateur classique
+    # (boucle d'événements privée, résultats toujours produits au fil de l'eau)
+
+    boucle = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield boucle.run_until_complete(generateur_async.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        boucle.run_until_complete(generateur_async.aclose())
+        boucle.run_until_complete(fermer_pool())
+        boucle.run_until_complete(boucle.shutdown_asyncgens())
+        boucle.close()
+
+def iterer_albums_enrichis_sync(page_debut=1, page_fin=200, resultats_par_page=50,
+                                filtres=None, concurrence=4):
+
+    # Catalogue + enrichissement en flux, sans async/await côté appelant
+
+    albums = iterer_albums_catalogue(page_debut, page_fin, resultats_par_page, filtres)
+    return iterer_sync(iterer_albums_enrichis(albums, concurrence))
+
+def recuperer_albums_enrichis(page_debut=1, page_fin=200, resultats_par_page=50,
+                              filtres=None, concurrence=4):
+
+    # Version bloquante qui retourne la liste complète
+
+    return list(iterer_albums_enrichis_sync(page_debut, page_fin, resultats_par_page,
+                                            filtres, concurrence))
@@ -0,0 +1,73 @@
+import os
+import random
+import sys
+import time
+
+# Permet d'importer les modules du projet depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytique import IndexAnalytique
+from bench_memoire import _valeurs_brutes
+
+# -----------------------------------------------------------------------------
+# BENCHMARK INDEX ANALYTIQUE : construction et requêtes sur N albums
+# -----------------------------------------------------------------------------
+#
+# Utilisation :
+#   python benchmarks/bench_analytique.py [nombre_albums]
+
+REQUETES = {
+    "top 10 wantlist": lambda index: index.top('en_wantlist', 10),
+    "top 5 wantlist par genre": lambda index: index.top('en_wantlist', 5, par='genre'),
+    "top 5 wantlist par décennie": lambda index: index.top('en_wantlist', 5, par='decennie'),
+    "prix moyen par format": lambda index: index.grouper('format', 'prix_moyen'),
+    "prix moyen par format (Rock, 1970s)": lambda index: index.grouper('format', 'prix_moyen',
+                                                                       genre='Rock', decennie=1970),
+    "albums par label": lambda index: index.grouper('label'),
+    "filtre UK + prix 50-60": lambda index: index.filtrer(pays='UK', prix_moyen=(50, 60)),
+}
+
+def _albums(nombre):
+    rnd = random.Random(42)
+    albums = []
+    for i in range(nombre):
+        catalogue, infos = _valeurs_brutes(rnd, i)
+        albums.append({**catalogue, **infos})
+    return albums
+
+def _chronometrer(fonction, repetitions=20):
+
+    # Meilleur temps sur plusieurs répétitions (ms)
+
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur * 1000
+
+if __name__ == "__main__":
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    albums = _albums(nombre)
+
+    debut = time.perf_counter()
+    index = IndexAnalytique(albums)
+    construction = time.perf_counter() - debut
+
+    # Référence : parcours Python ligne par ligne (ce que ferait une boucle sur le CSV)
+    def prix_moyen_par_format_boucle():
+        sommes = {}
+        for album in albums:
+            for fmt in album['format'].split(', '):
+                somme, nombre_valeurs = sommes.get(fmt, (0.0, 0))
+                sommes[fmt] = (somme + float(album['prix_moyen']), nombre_valeurs + 1)
+        return {fmt: somme / n for fmt, (somme, n) in sommes.items()}
+
+    print("="*70)
+    print(f"INDEX ANALYTIQUE SUR {nombre} ALBUMS")
+    print("="*70)
+    print(f"Construction : {construction:.2f}s\n")
+    for nom, requete in REQUETES.items():
+        print(f"  {nom:40s} {_chronometrer(lambda: requete(index)):8.2f} ms")
+    print(f"\n  {'boucle Python (prix moyen par format)':40s} "
+          f"{_chronometrer(prix_moyen_par_format_boucle, 3):8.2f} ms")
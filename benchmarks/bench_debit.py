@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Permet d'importer main.py depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import configuration as config
+import main
+from disjoncteur import disjoncteur
+from pool_navigateurs import statistiques_pools
+from latences import suivi_latences
+from serveur_discogs_local import ServeurDiscogsLocal
+
+# -----------------------------------------------------------------------------
+# BENCHMARK DE DÉBIT DE BOUT EN BOUT
+# -----------------------------------------------------------------------------
+#
+# Lance le flux complet recuperer_infos_catalogue -> enrichir_avec_details -> CSV
+# contre le serveur local et mesure pages/s, latences, CPU et mémoire maximale.
+#
+# Utilisation :
+#   python benchmarks/bench_debit.py --pages 2 --albums-max 20 --latence 100 --json resultats.json
+
+def percentile(valeurs, p):
+
+    # Percentile par interpolation linéaire (p entre 0 et 100)
+
+    if not valeurs:
+        return 0.0
+    triees = sorted(valeurs)
+    position = (len(triees) - 1) * p / 100
+    bas = int(position)
+    haut = min(bas + 1, len(triees) - 1)
+    return triees[bas] + (triees[haut] - triees[bas]) * (position - bas)
+
+def _instrumenter_crawl_get(latences):
+
+    # Remplace main.crawl_get par une version chronométrée
+
+    crawl_get_original = main.crawl_get
+
+    def crawl_get_chronometre(url, *args, **kwargs):
+        debut = time.perf_counter()
+        try:
+            return crawl_get_original(url, *args, **kwargs)
+        finally:
+            type_page = 'catalogue' if '/search' in url else 'album'
+            latences.setdefault(type_page, []).append(time.perf_counter() - debut)
+
+    main.crawl_get = crawl_get_chronometre
+    return crawl_get_original
+
+def _ressources():
+
+    # CPU (utilisateur + système) et RSS max du processus et de ses enfants (Chromium)
+
+    soi = resource.getrusage(resource.RUSAGE_SELF)
+    enfants = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    facteur = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'cpu_s': soi.ru_utime + soi.ru_stime + enfants.ru_utime + enfants.ru_stime,
+        'rss_max_mo': soi.ru_maxrss * facteur / 1024 / 1024,
+        'rss_max_enfants_mo': enfants.ru_maxrss * facteur / 1024 / 1024,
+    }
+
+def lancer_benchmark(pages=2, resultats_par_page=50, albums_max=None, latence_ms=0,
+                     gigue_ms=0, taux_erreur=0.0, taux_429=0.0, delai_avant_html=0.0,
+                     taux_blocage=0.0, taux_lent=0.0, hedging=False):
+
+    # Exécute le flux complet contre le serveur local et retourne le rapport
+
+    serveur = ServeurDiscogsLocal(latence_ms=latence_ms, gigue_ms=gigue_ms,
+                                  taux_erreur=taux_erreur, taux_429=taux_429,
+                                  taux_blocage=taux_blocage, taux_lent=taux_lent).demarrer()
+
+    # Pointer le scraper vers le serveur local, sans pauses de politesse
+    config.URL_DISCOGS = serveur.url
+    config.DELAI_AVANT_HTML = delai_avant_html
+    for pause in ('PAUSE_RETRY', 'PAUSE_CATALOGUE', 'PAUSE_CATALOGUE_VIDE',
+                  'PAUSE_ERREUR_CATALOGUE', 'PAUSE_ALBUM', 'PAUSE_ERREUR_ALBUM'):
+        setattr(config, pause, 0)
+    config.REFROIDISSEMENT_DISJONCTEUR = 1
+    config.HEDGING = hedging
+    disjoncteur.reinitialiser()
+    suivi_latences.reinitialiser()
+
+    latences = {}
+    crawl_get_original = _instrumenter_crawl_get(latences)
+    ressources_debut = _ressources()
+    debut = time.perf_counter()
+
+    try:
+        debut_etape1 = time.perf_counter()
+        albums = main.recuperer_infos_catalogue(1, pages, resultats_par_page)
+        duree_etape1 = time.perf_counter() - debut_etape1
+
+        if albums_max:
+            albums = albums[:albums_max]
+
+        debut_etape2 = time.perf_counter()
+        albums_enrichis = main.enrichir_avec_details(albums, sauvegarder_tous_les=10**9)
+        duree_etape2 = time.perf_counter() - debut_etape2
+
+        debut_csv = time.perf_counter()
+        with tempfile.TemporaryDirectory() as dossier:
+            main.sauvegarder_csv_enrichi(albums_enrichis, os.path.join(dossier, 'bench.csv'))
+        duree_csv = time.perf_counter() - debut_csv
+        duree_totale = time.perf_counter() - debut
+    finally:
+        main.crawl_get = crawl_get_original
+        serveur.arreter()
+
+    ressources_fin = _ressources()
+    toutes_latences = [l for valeurs in latences.values() for l in valeurs]
+
+    rapport = {
+        'parametres': {
+            'pages': pages, 'resultats_par_page': resultats_par_page, 'albums_max': albums_max,
+            'latence_ms': latence_ms, 'gigue_ms': gigue_ms, 'taux_erreur': taux_erreur,
+            'taux_429': taux_429, 'delai_avant_html': delai_avant_html,
+            'taux_blocage': taux_blocage, 'taux_lent': taux_lent, 'hedging': hedging,
+        },
+        'albums': len(albums_enrichis),
+        'pages_chargees': len(toutes_latences),
+        'duree_s': duree_totale,
+        'duree_etape1_s': duree_etape1,
+        'duree_etape2_s': duree_etape2,
+        'duree_csv_s': duree_csv,
+        'pages_par_s': len(toutes_latences) / duree_totale if duree_totale else 0.0,
+        'latence_p50_s': percentile(toutes_latences, 50),
+        'latence_p95_s': percentile(toutes_latences, 95),
+        'latence_p95_par_type_s': {t: percentile(v, 95) for t, v in latences.items()},
+        'cpu_s': ressources_fin['cpu_s'] - ressources_debut['cpu_s'],
+        'rss_max_mo': ressources_fin['rss_max_mo'],
+        'rss_max_enfants_mo': ressources_fin['rss_max_enfants_mo'],
+        'requetes_serveur': dict(serveur.compteurs),
+        'disjoncteur': disjoncteur.rapport(),
+        'pool_navigateurs': statistiques_pools(),
+        'latences_reseau': suivi_latences.rapport(),
+    }
+    return rapport
+
+def afficher_rapport(rapport):
+    print("\n" + "="*70)
+    print("RAPPORT DE BENCHMARK")
+    print("="*70)
+    print(f"Albums traités     : {rapport['albums']}")
+    print(f"Pages chargées     : {rapport['pages_chargees']}")
+    print(f"Durée totale       : {rapport['duree_s']:.2f}s "
+          f"(étape 1 : {rapport['duree_etape1_s']:.2f}s, étape 2 : {rapport['duree_etape2_s']:.2f}s, "
+          f"CSV : {rapport['duree_csv_s']*1000:.1f}ms)")
+    print(f"Débit              : {rapport['pages_par_s']:.2f} pages/s")
+    print(f"Latence p50 / p95  : {rapport['latence_p50_s']*1000:.0f}ms / {rapport['latence_p95_s']*1000:.0f}ms")
+    for type_page, p95 in rapport['latence_p95_par_type_s'].items():
+        print(f"  p95 {type_page:10s}  : {p95*1000:.0f}ms")
+    print(f"CPU                : {rapport['cpu_s']:.2f}s")
+    print(f"RSS max            : {rapport['rss_max_mo']:.1f} Mo (navigateur : {rapport['rss_max_enfants_mo']:.1f} Mo)")
+    print(f"Requêtes serveur   : {rapport['requetes_serveur']}")
+    disj = rapport['disjoncteur']
+    print(f"Blocages détectés  : {disj['total_blocages']} {disj['blocages'] or ''} "
+          f"({disj['ouvertures']} ouvertures du disjoncteur, {disj['secondes_en_pause']}s en pause)")
+    for type_page, lat in rapport['latences_reseau'].items():
+        print(f"  {type_page:10s} p99 : {lat['p99']*1000:.0f}ms, max {lat['max']*1000:.0f}ms, "
+              f"timeout {lat['timeout_s']:.1f}s, {lat.get('timeouts', 0)} timeouts, "
+              f"{lat.get('relances', 0)} relances ({lat.get('relances_gagnantes', 0)} gagnantes)")
+    pool = rapport['pool_navigateurs']
+    print(f"Pool navigateurs   : {pool['crees']} lancés, {pool['pages_servies']} pages, "
+          f"recyclés {pool['recycles'] or 0}, en cours {pool['en_cours']}, libres {pool['libres']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de débit contre le serveur Discogs local")
+    parser.add_argument("--pages", type=int, default=2, help="Pages de catalogue")
+    parser.add_argument("--resultats-par-page", type=int, default=50)
+    parser.add_argument("--albums-max", type=int, default=None, help="Limiter l'étape 2")
+    parser.add_argument("--latence", type=float, default=0, help="Latence serveur moyenne (ms)")
+    parser.add_argument("--gigue", type=float, default=0, help="Gigue de latence (ms)")
+    parser.add_argument("--taux-erreur", type=float, default=0.0)
+    parser.add_argument("--taux-429", type=float, default=0.0)
+    parser.add_argument("--taux-blocage", type=float, default=0.0)
+    parser.add_argument("--taux-lent", type=float, default=0.0, help="Pages lentes (10s)")
+    parser.add_argument("--hedging", action="store_true", help="Relancer les pages au-delà du p95")
+    parser.add_argument("--delai-avant-html", type=float, default=0.0)
+    parser.add_argument("--json", help="Écrire le rapport dans ce fichier (comparaison entre versions)")
+    args = parser.parse_args()
+
+    rapport = lancer_benchmark(args.pages, args.resultats_par_page, args.albums_max, args.latence,
+                               args.gigue, args.taux_erreur, args.taux_429, args.delai_avant_html,
+                               args.taux_blocage, args.taux_lent, args.hedging)
+    afficher_rapport(rapport)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Rapport sauvegardé dans '{args.json}'")
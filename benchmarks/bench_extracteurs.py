@@ -0,0 +1,141 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+# Permet d'importer main.py depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import main
+
+# -----------------------------------------------------------------------------
+# CORPUS DE RÉFÉRENCE DES EXTRACTEURS (correction + temps de parsing)
+# -----------------------------------------------------------------------------
+#
+# benchmarks/corpus/ contient des pages sauvegardées (catalogue_*.html,
+# album_*.html) et attendu.json, la sortie attendue de chaque page.
+#
+# Utilisation :
+#   pytest benchmarks/bench_extracteurs.py          (nécessite pytest-benchmark)
+#   python benchmarks/bench_extracteurs.py          (sans pytest, rapport texte)
+#   python benchmarks/bench_extracteurs.py --regenerer
+#       (réécrit attendu.json après un changement VOLONTAIRE des extracteurs)
+
+DOSSIER_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+FICHIER_ATTENDU = os.path.join(DOSSIER_CORPUS, 'attendu.json')
+
+# Budget de parsing par page : au-delà, le test échoue (régression de performance)
+BUDGET_MS_PAR_PAGE = 250
+
+def _lister_pages(prefixe):
+    return sorted(f for f in os.listdir(DOSSIER_CORPUS)
+                  if f.startswith(prefixe) and f.endswith('.html'))
+
+def _lire_page(nom_fichier):
+    with open(os.path.join(DOSSIER_CORPUS, nom_fichier), encoding='utf-8') as f:
+        return f.read()
+
+def _url_page(nom_fichier):
+    # URL fixe par page pour que la sortie attendue soit stable
+    return f"https://www.discogs.com/release/{nom_fichier[:-len('.html')]}"
+
+def _charger_attendu():
+    with open(FICHIER_ATTENDU, encoding='utf-8') as f:
+        return json.load(f)
+
+def extraire_catalogue(html_content):
+    # Sans les messages console de l'extracteur
+    with contextlib.redirect_stdout(io.StringIO()):
+        return main.extraire_infos_catalogue(html_content)
+
+def extraire_album(html_content, url):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return main.extraire_infos_completes_album(html_content, url)
+
+def regenerer_attendu():
+
+    # Réécrit attendu.json à partir des extracteurs actuels
+
+    attendu = {
+        'catalogue': {nom: [dict(album) for album in extraire_catalogue(_lire_page(nom))]
+                      for nom in _lister_pages('catalogue_')},
+        'album': {nom: extraire_album(_lire_page(nom), _url_page(nom)) for nom in _lister_pages('album_')},
+    }
+    with open(FICHIER_ATTENDU, 'w', encoding='utf-8') as f:
+        json.dump(attendu, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f"✓ {len(attendu['catalogue']) + len(attendu['album'])} pages de référence dans '{FICHIER_ATTENDU}'")
+
+# -----------------------------------------------------------------------------
+# TESTS pytest-benchmark
+# -----------------------------------------------------------------------------
+
+def _verifier_budget(benchmark):
+    # Pas de statistiques avec --benchmark-disable : seule la correction est vérifiée
+    if benchmark.stats:
+        assert benchmark.stats.stats.mean * 1000 < BUDGET_MS_PAR_PAGE
+
+@pytest.mark.parametrize('nom_fichier', _lister_pages('catalogue_'))
+def test_extraction_catalogue(benchmark, nom_fichier):
+    html_content = _lire_page(nom_fichier)
+    benchmark.group = 'catalogue'
+    resultat = benchmark(extraire_catalogue, html_content)
+    assert resultat == _charger_attendu()['catalogue'][nom_fichier]
+    _verifier_budget(benchmark)
+
+@pytest.mark.parametrize('nom_fichier', _lister_pages('album_'))
+def test_extraction_album(benchmark, nom_fichier):
+    html_content = _lire_page(nom_fichier)
+    benchmark.group = 'album'
+    resultat = benchmark(extraire_album, html_content, _url_page(nom_fichier))
+    assert resultat == _charger_attendu()['album'][nom_fichier]
+    _verifier_budget(benchmark)
+
+# -----------------------------------------------------------------------------
+# EXÉCUTION SANS PYTEST
+# -----------------------------------------------------------------------------
+
+def lancer_corpus(repetitions=20):
+
+    # Vérifie chaque page du corpus et mesure le temps de parsing moyen
+
+    attendu = _charger_attendu()
+    echecs = 0
+
+    print(f"{'Page':40s} {'Résultat':10s} {'ms/page':>10s}")
+    print("-"*62)
+
+    pages = [('catalogue', nom) for nom in _lister_pages('catalogue_')]
+    pages += [('album', nom) for nom in _lister_pages('album_')]
+
+    for type_page, nom in pages:
+        html_content = _lire_page(nom)
+        if type_page == 'catalogue':
+            extraire = lambda: extraire_catalogue(html_content)
+        else:
+            extraire = lambda: extraire_album(html_content, _url_page(nom))
+
+        resultat = extraire()
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            extraire()
+        ms_par_page = (time.perf_counter() - debut) * 1000 / repetitions
+
+        correct = resultat == attendu[type_page].get(nom)
+        if not correct:
+            echecs += 1
+        print(f"{nom:40s} {'✓ OK' if correct else '✗ ÉCART':10s} {ms_par_page:10.2f}")
+
+    print("-"*62)
+    print(f"{len(pages) - echecs}/{len(pages)} pages conformes")
+    return echecs
+
+if __name__ == "__main__":
+    if '--regenerer' in sys.argv:
+        regenerer_attendu()
+    else:
+        sys.exit(1 if lancer_corpus() else 0)
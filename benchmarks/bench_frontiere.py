@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Permet d'importer les modules du projet depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontiere import BitmapIds, FiltreBloom
+
+# -----------------------------------------------------------------------------
+# BENCHMARK ENSEMBLE DES PAGES VUES : set d'URLs vs bitmap vs filtre de Bloom
+# -----------------------------------------------------------------------------
+#
+# Pour N identifiants de releases (tirés parmi les 35 millions possibles) :
+#   - set Python des URLs : mémoire mesurée avec tracemalloc
+#   - bitmap d'identifiants (mmap) : taille du fichier, faux positifs (attendu : 0)
+#   - filtre de Bloom (mmap, 0,1 %) : taille du fichier, taux de faux positifs
+#     mesuré sur 200 000 URLs jamais ajoutées
+#
+# Utilisation :
+#   python benchmarks/bench_frontiere.py [N ...]      (défaut : 1000000 10000000)
+
+IDENTIFIANT_MAX = 35_000_000
+TESTS_FAUX_POSITIFS = 200_000
+
+def _url(identifiant):
+    return f"https://www.discogs.com/release/{identifiant}"
+
+def _memoire_set(identifiants):
+
+    # Au-delà d'un million d'URLs, mesure sur un million puis extrapolation linéaire
+
+    echantillon = identifiants[:1_000_000]
+    tracemalloc.start()
+    urls = {_url(i) for i in echantillon}
+    taille, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del urls
+    return taille * len(identifiants) / len(echantillon), len(echantillon) < len(identifiants)
+
+def _mesurer(nombre, dossier):
+    rnd = random.Random(nombre)
+    tires = rnd.sample(range(IDENTIFIANT_MAX + TESTS_FAUX_POSITIFS), nombre + TESTS_FAUX_POSITIFS)
+    identifiants, absents = tires[:nombre], tires[nombre:]
+
+    memoire_set, extrapolee = _memoire_set(identifiants)
+
+    chemin_bitmap = os.path.join(dossier, f'bench_{nombre}.bits')
+    debut = time.perf_counter()
+    bitmap = BitmapIds(chemin_bitmap)
+    for identifiant in identifiants:
+        bitmap.ajouter(identifiant)
+    duree_bitmap = time.perf_counter() - debut
+    bitmap.fermer()
+
+    # Relecture depuis le disque : rien n'est rechargé, le fichier est projeté
+    bitmap = BitmapIds(chemin_bitmap)
+    faux_bitmap = sum(identifiant in bitmap for identifiant in absents)
+    manquants = sum(identifiant not in bitmap for identifiant in identifiants[:TESTS_FAUX_POSITIFS])
+    bitmap.fermer()
+
+    chemin_bloom = os.path.join(dossier, f'bench_{nombre}.bloom')
+    debut = time.perf_counter()
+    bloom = FiltreBloom(chemin_bloom, capacite=nombre, taux_faux_positifs=0.001)
+    for identifiant in identifiants:
+        bloom.ajouter(_url(identifiant))
+    duree_bloom = time.perf_counter() - debut
+    taux_theorique = bloom.taux_theorique()
+    bloom.fermer()
+
+    bloom = FiltreBloom(chemin_bloom)
+    faux_bloom = sum(_url(identifiant) in bloom for identifiant in absents)
+    manquants += sum(_url(identifiant) not in bloom for identifiant in identifiants[:TESTS_FAUX_POSITIFS])
+    bloom.fermer()
+
+    print(f"\n{nombre:,} identifiants".replace(',', ' '))
+    print(f"  set d'URLs   : {memoire_set / 2**20:8.1f} Mo{' (extrapolé)' if extrapolee else ''}")
+    print(f"  bitmap       : {os.path.getsize(chemin_bitmap) / 2**20:8.1f} Mo | "
+          f"faux positifs {faux_bitmap / len(absents):.4%} | "
+          f"{duree_bitmap / nombre * 1e6:.2f} µs/ajout")
+    print(f"  Bloom 0,1 %  : {os.path.getsize(chemin_bloom) / 2**20:8.1f} Mo | "
+          f"faux positifs {faux_bloom / len(absents):.4%} (théorique {taux_theorique:.4%}) | "
+          f"{duree_bloom / nombre * 1e6:.2f} µs/ajout")
+    print(f"  faux négatifs : {manquants}")
+
+    os.remove(chemin_bitmap)
+    os.remove(chemin_bloom)
+
+if __name__ == "__main__":
+    tailles = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+    with tempfile.TemporaryDirectory() as dossier:
+        for nombre in tailles:
+            _mesurer(nombre, dossier)
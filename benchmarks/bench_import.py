@@ -0,0 +1,80 @@
+import os
+import re
+import subprocess
+import sys
+
+# -----------------------------------------------------------------------------
+# BENCHMARK DU TEMPS D'IMPORT (python -X importtime)
+# -----------------------------------------------------------------------------
+#
+# Mesure le temps d'import du chemin hors ligne (parsing + nettoyage de HTML
+# en cache) et vérifie qu'il ne charge ni crawl4ai ni Playwright.
+#
+# Utilisation :
+#   python benchmarks/bench_import.py
+
+DOSSIER_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'hors ligne (extraction + nettoyage)': 'import extraction, nettoyage',
+    'main.py (sans téléchargement)': 'import main',
+    'réseau (premier téléchargement)': 'import reseau; reseau._charger_crawl4ai()',
+}
+
+# Modules qui ne doivent jamais être chargés sur le chemin hors ligne
+MODULES_NAVIGATEUR = ('crawl4ai', 'playwright')
+
+RE_LIGNE_IMPORTTIME = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def mesurer_import(code):
+
+    # Retourne (durée totale en ms, [(cumul_us, module)] des imports de premier niveau)
+    # ou None si l'import échoue (dépendance absente)
+
+    resultat = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                              cwd=DOSSIER_PROJET, capture_output=True, text=True)
+    if resultat.returncode != 0:
+        return None
+
+    modules = []
+    premier_niveau = []
+    for ligne in resultat.stderr.splitlines():
+        match = RE_LIGNE_IMPORTTIME.match(ligne)
+        if not match:
+            continue
+        cumul_us = int(match.group(2))
+        indentation = len(match.group(3))
+        module = match.group(4)
+        modules.append(module)
+        if indentation == 1:
+            premier_niveau.append((cumul_us, module))
+
+    total_ms = sum(cumul for cumul, _ in premier_niveau) / 1000
+    return total_ms, sorted(premier_niveau, reverse=True), modules
+
+if __name__ == "__main__":
+    print("="*70)
+    print("TEMPS D'IMPORT (python -X importtime)")
+    print("="*70)
+
+    code_retour = 0
+    for nom, code in SCENARIOS.items():
+        mesure = mesurer_import(code)
+        if mesure is None:
+            print(f"\n{nom} : import impossible (dépendance absente ?)")
+            continue
+
+        total_ms, premier_niveau, modules = mesure
+        print(f"\n{nom} : {total_ms:.1f} ms, {len(modules)} modules")
+        for cumul_us, module in premier_niveau[:5]:
+            print(f"  {cumul_us / 1000:8.1f} ms  {module}")
+
+        if code.startswith('import extraction') or code == 'import main':
+            charges = [m for m in modules if m.split('.')[0] in MODULES_NAVIGATEUR]
+            if charges:
+                print(f"  ✗ Dépendances navigateur chargées : {', '.join(sorted(set(charges))[:5])}")
+                code_retour = 1
+            else:
+                print("  ✓ Aucune dépendance navigateur chargée")
+
+    sys.exit(code_retour)
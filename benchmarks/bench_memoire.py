@@ -0,0 +1,94 @@
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+# Permet d'importer les modules du projet depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enregistrements import Album
+
+# -----------------------------------------------------------------------------
+# BENCHMARK MÉMOIRE : dict {**album, **infos} vs Album (__slots__ + interning)
+# -----------------------------------------------------------------------------
+#
+# Utilisation :
+#   python benchmarks/bench_memoire.py [nombre_albums]
+
+LABELS = [f"Label {i}" for i in range(300)]
+GENRES = ['Rock', 'Pop', 'Electronic', 'Jazz', 'Funk / Soul', 'Stage & Screen', 'Hip Hop']
+PAYS = ['UK', 'US', 'Europe', 'France', 'Germany', 'Japan']
+FORMATS = ['Vinyl', 'LP', 'CD', 'Album', 'Cassette']
+
+def _valeurs_brutes(rnd, i):
+
+    # Comme en sortie de BeautifulSoup : chaque valeur est une NOUVELLE chaîne,
+    # même quand son texte est identique à celui d'un autre album
+
+    def nouvelle(texte):
+        return ''.join(list(texte))
+
+    catalogue = {
+        'artiste': nouvelle(f"Artiste {rnd.randint(1, 2000)}"),
+        'album': f"Album N°{i}",
+        'url': f"https://www.discogs.com/release/{i}-Album-{i}",
+        'annee': nouvelle(str(rnd.randint(1960, 2024))),
+        'format': nouvelle(', '.join(rnd.sample(FORMATS, 2))),
+        'miniature': f"https://i.discogs.com/thumb/{i}.jpg",
+    }
+    infos = {
+        'url': catalogue['url'],
+        'label': nouvelle(', '.join(rnd.sample(LABELS, 2))),
+        'format': nouvelle(', '.join(rnd.sample(FORMATS, 2))),
+        'pays': nouvelle(rnd.choice(PAYS)),
+        'date_sortie': f"01/01/{catalogue['annee']}",
+        'annee': nouvelle(catalogue['annee']),
+        'genres': nouvelle(', '.join(rnd.sample(GENRES, 2))),
+        'en_collection': str(rnd.randint(100, 150000)),
+        'en_wantlist': str(rnd.randint(10, 50000)),
+        'note_moyenne': f"{rnd.uniform(3, 5):.2f}",
+        'nombre_notes': str(rnd.randint(10, 20000)),
+        'derniere_vente': "15/10/2025",
+        'prix_faible': f"{rnd.uniform(1, 50):.2f}",
+        'prix_moyen': f"{rnd.uniform(50, 100):.2f}",
+        'prix_eleve': f"{rnd.uniform(100, 500):.2f}",
+    }
+    return catalogue, infos
+
+def mesurer(nombre, avec_enregistrement):
+
+    # Mémoire retenue (Mo) par la liste d'albums enrichis
+
+    rnd = random.Random(42)
+    gc.collect()
+    tracemalloc.start()
+    albums = []
+    for i in range(nombre):
+        catalogue, infos = _valeurs_brutes(rnd, i)
+        if avec_enregistrement:
+            album = Album(catalogue)
+            album.mettre_a_jour(infos)
+        else:
+            album = {**catalogue, **infos}
+        albums.append(album)
+        del catalogue, infos
+    gc.collect()
+    courant, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return courant / 1024 / 1024, pic / 1024 / 1024
+
+if __name__ == "__main__":
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    mo_dict, pic_dict = mesurer(nombre, avec_enregistrement=False)
+    mo_album, pic_album = mesurer(nombre, avec_enregistrement=True)
+
+    print("="*70)
+    print(f"MÉMOIRE POUR {nombre} ALBUMS ENRICHIS")
+    print("="*70)
+    print(f"dict {{**album, **infos}} : {mo_dict:8.1f} Mo (pic {pic_dict:.1f} Mo)")
+    print(f"Album (__slots__)        : {mo_album:8.1f} Mo (pic {pic_album:.1f} Mo)")
+    print(f"Gain                     : {1 - mo_album / mo_dict:8.1%}")
+    print(f"Par album                : {mo_dict * 1024 * 1024 / nombre:.0f} o => "
+          f"{mo_album * 1024 * 1024 / nombre:.0f} o")
@@ -0,0 +1,106 @@
+import os
+import random
+import sys
+import time
+
+# Permet d'importer nettoyage.py depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nettoyage
+import nettoyage_origine
+
+# -----------------------------------------------------------------------------
+# MICRO-BENCHMARK DU NETTOYAGE PAR LIGNE (avant / après nettoyage.py)
+# -----------------------------------------------------------------------------
+#
+# Simule 10 000 lignes brutes où artistes, labels, genres, pays et dates se
+# répètent (distribution très inégale, comme sur le catalogue "most collected")
+# et mesure le coût de nettoyage par ligne :
+#   - origine       : fonctions d'avant (nettoyage_origine.py : motifs
+#                     recompilés et dictionnaire des mois reconstruit à chaque appel)
+#   - sans cache    : nettoyage.py sans le cache LRU (expressions précompilées seules)
+#   - cache         : nettoyage.py complet, premier puis second passage
+#
+# Utilisation :
+#   python benchmarks/bench_nettoyage.py [nombre_de_lignes]
+
+ARTISTES = [f"Artiste N°{i} ({i % 7})" for i in range(1500)]
+LABELS = [f"Label {i} (6), Warner Music Group, Label {i}, Parlophone" for i in range(400)]
+GENRES = ['Rock', 'Pop, Folk, World, & Country', 'Electronic, Stage & Screen',
+          'Funk / Soul, Pop', 'Jazz', 'Hip Hop, Funk / Soul', 'Classical']
+PAYS = ['UK', 'US', 'UK, Europe &amp; US', 'France', 'Germany', 'Europe', 'Japan']
+FORMATS = ['Vinyl, LP, Album, Tout format', 'CD, Album', 'Cassette', 'Vinyl, 7", Single']
+DATES = [f"{j} {m} {a}" for j in (1, 12, 28) for m in ('janv.', 'mai', 'oct.', 'déc.')
+         for a in range(1960, 2025)]
+PRIX = [f"{p},{c:02d} €" for p in range(1, 300) for c in (0, 50, 99)]
+
+def _choix_zipf(rnd, valeurs):
+    # Les premières valeurs sont beaucoup plus fréquentes (loi de puissance)
+    return valeurs[min(int(rnd.paretovariate(1.2)) - 1, len(valeurs) - 1)]
+
+def generer_lignes(nombre, graine=42):
+    rnd = random.Random(graine)
+    return [{
+        'artiste': _choix_zipf(rnd, ARTISTES),
+        'album': f"Album &#39;{rnd.randint(1, nombre)}&#39;",
+        'label': _choix_zipf(rnd, LABELS),
+        'format': rnd.choice(FORMATS),
+        'pays': rnd.choice(PAYS),
+        'date_sortie': _choix_zipf(rnd, DATES),
+        'genres': rnd.choice(GENRES),
+        'en_collection': f"{rnd.randint(100, 150000):,}".replace(',', ' '),
+        'prix_moyen': _choix_zipf(rnd, PRIX),
+    } for _ in range(nombre)]
+
+def nettoyer_ligne(ligne, f):
+    # Même enchaînement que les extracteurs de main.py
+    return {
+        'artiste': f['nettoyer_artiste'](ligne['artiste']),
+        'album': f['nettoyer_album'](ligne['album']),
+        'label': f['nettoyer_label'](ligne['label']),
+        'format': f['nettoyer_format'](ligne['format']),
+        'pays': f['nettoyer_pays'](ligne['pays']),
+        'date_sortie': f['formater_date_pour_excel'](ligne['date_sortie']),
+        'genres': f['nettoyer_genres'](ligne['genres']),
+        'en_collection': f['nettoyer_nombre'](ligne['en_collection']),
+        'prix_moyen': f['nettoyer_prix'](ligne['prix_moyen']),
+    }
+
+def mesurer(lignes, fonctions):
+    debut = time.perf_counter()
+    resultats = [nettoyer_ligne(ligne, fonctions) for ligne in lignes]
+    return (time.perf_counter() - debut) / len(lignes) * 1e6, resultats
+
+if __name__ == "__main__":
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    lignes = generer_lignes(nombre)
+
+    noms = ['nettoyer_artiste', 'nettoyer_album', 'nettoyer_label', 'nettoyer_format',
+            'nettoyer_pays', 'formater_date_pour_excel', 'nettoyer_genres',
+            'nettoyer_nombre', 'nettoyer_prix']
+    origine = {nom: getattr(nettoyage_origine, nom) for nom in noms}
+    avec_cache = {nom: getattr(nettoyage, nom) for nom in noms}
+    # __wrapped__ : la fonction de nettoyage.py sans le cache LRU
+    sans_cache = {nom: getattr(fonction, '__wrapped__', fonction) for nom, fonction in avec_cache.items()}
+
+    nettoyage.vider_caches()
+    us_origine, reference = mesurer(lignes, origine)
+    us_sans_cache, resultats_sans_cache = mesurer(lignes, sans_cache)
+    us_cache_froid, resultats = mesurer(lignes, avec_cache)
+    us_cache_chaud, _ = mesurer(lignes, avec_cache)
+
+    assert resultats_sans_cache == reference, "nettoyage.py ne donne pas le même résultat que l'origine !"
+    assert resultats == reference, "Le cache change le résultat du nettoyage !"
+
+    print("="*70)
+    print(f"NETTOYAGE DE {nombre} LIGNES")
+    print("="*70)
+    print(f"Origine            : {us_origine:8.2f} µs/ligne")
+    print(f"Sans cache         : {us_sans_cache:8.2f} µs/ligne  (x{us_origine / us_sans_cache:.1f})")
+    print(f"Cache (1er passage): {us_cache_froid:8.2f} µs/ligne  (x{us_origine / us_cache_froid:.1f})")
+    print(f"Cache (2e passage) : {us_cache_chaud:8.2f} µs/ligne  (x{us_origine / us_cache_chaud:.1f})")
+    print("\nTaux de succès du cache :")
+    for nom, (hits, misses, taille) in nettoyage.statistiques_cache().items():
+        total = hits + misses
+        if total:
+            print(f"  {nom:26s} {hits / total:6.1%}  ({taille} valeurs en cache)")
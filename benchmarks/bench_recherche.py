@@ -0,0 +1,74 @@
+import os
+import random
+import sys
+import time
+
+# Permet d'importer les modules du projet depuis le dossier benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recherche import IndexCorrespondance, cle_normalisee
+
+# -----------------------------------------------------------------------------
+# BENCHMARK CORRESPONDANCE FLOUE : index de trigrammes vs parcours linéaire
+# -----------------------------------------------------------------------------
+#
+# Utilisation :
+#   python benchmarks/bench_recherche.py [nombre_albums]
+
+SYLLABES = ['ka', 'lo', 'mi', 'ra', 'ne', 'to', 'su', 'vi', 'da', 'ber', 'gon', 'mel', 'tri',
+            'os', 'ul', 'an', 'el', 'ric', 'sto', 'ny', 'zer', 'pha', 'que', 'lyn', 'dor']
+MOTS = ['Love', 'Night', 'Blue', 'Dream', 'Fire', 'Road', 'Heart', 'Live', 'Gold', 'Sun',
+        'Songs', 'Rain', 'Dance', 'Wild', 'Young', 'Time', 'City', 'Soul', 'Street', 'Moon']
+
+def _nom(rnd, syllabes):
+    return ''.join(rnd.choice(SYLLABES) for _ in range(syllabes)).capitalize()
+
+def _albums(nombre):
+    rnd = random.Random(42)
+    artistes = [' '.join(_nom(rnd, rnd.randint(2, 3)) for _ in range(rnd.randint(1, 2)))
+                for _ in range(nombre // 4)]
+    return [{'artiste': rnd.choice(artistes),
+             'album': ' '.join(rnd.sample(MOTS, rnd.randint(1, 3))) + f" {_nom(rnd, 2)}",
+             'url': f"https://www.discogs.com/release/{i}"} for i in range(nombre)]
+
+def _alterer(rnd, texte):
+
+    # Faute de frappe : une lettre supprimée, casse et ponctuation modifiées
+
+    position = rnd.randrange(len(texte))
+    return (texte[:position] + texte[position + 1:]).upper() + ' (Remastered)'
+
+if __name__ == "__main__":
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rnd = random.Random(7)
+    albums = _albums(nombre)
+
+    debut = time.perf_counter()
+    index = IndexCorrespondance.construire(albums)
+    construction = time.perf_counter() - debut
+
+    cibles = rnd.sample(albums, 500)
+    requetes = [(_alterer(rnd, album['artiste']), _alterer(rnd, album['album'])) for album in cibles]
+
+    debut = time.perf_counter()
+    trouves = 0
+    for cible, (artiste, titre) in zip(cibles, requetes):
+        resultats = index.chercher(artiste, titre, limite=1)
+        trouves += bool(resultats) and resultats[0]['url'] == cible['url']
+    duree_index = (time.perf_counter() - debut) / len(requetes)
+
+    # Référence : comparaison de chaînes sur toutes les lignes (10 requêtes seulement)
+    debut = time.perf_counter()
+    for artiste, titre in requetes[:10]:
+        cle = (cle_normalisee(artiste), cle_normalisee(titre))
+        [album for album in albums
+         if cle_normalisee(album['artiste']) == cle[0] and cle_normalisee(album['album']) == cle[1]]
+    duree_lineaire = (time.perf_counter() - debut) / 10
+
+    print("="*70)
+    print(f"CORRESPONDANCE FLOUE SUR {nombre} ALBUMS")
+    print("="*70)
+    print(f"Construction         : {construction:.2f}s ({len(index.listes)} trigrammes)")
+    print(f"Recherche (index)    : {duree_index * 1000:.3f} ms par requête")
+    print(f"Parcours linéaire    : {duree_lineaire * 1000:.1f} ms par requête (égalité exacte seulement)")
+    print(f"Bonne réponse en tête: {trouves}/{len(requetes)} requêtes avec faute de frappe")
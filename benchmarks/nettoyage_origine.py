@@ -0,0 +1,256 @@
+import html
+import re
+
+# -----------------------------------------------------------------------------
+# NETTOYAGE D'ORIGINE (main.py avant nettoyage.py), RÉFÉRENCE DES BENCHMARKS
+# -----------------------------------------------------------------------------
+#
+# Copie telle quelle des fonctions de nettoyage du commit de départ : chaque
+# appel recompile ses expressions (re.sub / re.match / re.search avec un motif
+# en chaîne) et reconstruit le dictionnaire des mois. Ne pas optimiser : c'est
+# le "avant" auquel bench_nettoyage.py compare nettoyage.py.
+
+def nettoyer_artiste(artiste):
+    
+    #Nettoie le nom de l'artiste en supprimant les numéros entre parenthèses
+    #Exemple : Justice (3) devient Justice
+   
+    if not artiste:
+        return artiste
+    
+    # Décoder les entités HTML d'abord
+    artiste = html.unescape(artiste)
+    
+    # Supprimer les guillemets indésirables
+    artiste = artiste.replace('"', '').replace('"', '').replace('"', '')
+    
+    # Supprimer les patterns comme (3), (12), etc. à la fin
+    artiste = re.sub(r'\s*\(\d+\)$', '', artiste)
+    
+    return artiste.strip()
+
+def nettoyer_album(album):
+    
+    # Nettoie le titre de l'album en décodant les entités HTML
+    # Exemple : She&#39;s So Unusual devient She's So Unusual
+    
+    if not album:
+        return album
+    
+    # Décoder les entités HTML
+    album = html.unescape(album)
+    
+    # Supprimer les guillemets indésirables (mais garder les apostrophes)
+    album = album.replace('"', '').replace('"', '').replace('"', '')
+    
+    # Nettoyer les doubles espaces
+    album = re.sub(r'\s+', ' ', album)
+    
+    return album.strip()
+
+def nettoyer_label(label_str):
+    
+    # Nettoie les labels en limitant à 3 principaux, supprimant les doublons 
+    # ET en retirant les numéros entre parenthèses
+    # Exemple : "Parlophone, Warner Music Group, GEM (6)" => "Parlophone, Warner Music Group, GEM"
+    
+    if not label_str:
+        return ""
+    
+    # Séparer les labels
+    labels = [l.strip() for l in label_str.split(',')]
+    
+    # Nettoyer chaque label individuellement
+    labels_nettoyes = []
+    for label in labels:
+        if label:
+            # Supprimer les numéros entre parenthèses à la fin : (6), (12), etc.
+            label_propre = re.sub(r'\s*\(\d+\)$', '', label.strip())
+            
+            # Ajouter seulement si pas déjà présent (supprimer doublons)
+            if label_propre and label_propre not in labels_nettoyes:
+                labels_nettoyes.append(label_propre)
+    
+    # Limiter à 3 labels principaux
+    return ', '.join(labels_nettoyes[:3])
+
+def nettoyer_format(format_str):
+    
+    # Nettoie les formats en supprimant "Tout format" et les doublons
+    
+    if not format_str:
+        return ""
+    
+    # Séparer les formats
+    formats = [f.strip() for f in format_str.split(',')]
+    
+    # Supprimer "Tout format" et les doublons
+    formats_clean = []
+    for fmt in formats:
+        if fmt and fmt != "Tout format" and fmt not in formats_clean:
+            formats_clean.append(fmt)
+    
+    return ', '.join(formats_clean)
+
+def nettoyer_genres(genres_str):
+    
+    # Nettoie les genres en supprimant les doublons ET les "&" 
+    # SAUF pour "Stage & Screen" qui est un genre spécifique
+    # Exemples :
+    # - "Pop, Folk, World, & Country" => "Pop, Folk, World, Country"
+    # - "Rock, Funk / Soul, Pop, Stage & Screen" => "Rock, Funk / Soul, Pop, Stage & Screen"
+    
+    if not genres_str:
+        return ""
+    
+    # Décoder HTML
+    genres = html.unescape(genres_str)
+    
+    # Protéger "Stage & Screen" en le remplaçant temporairement
+    placeholder = "___STAGE_AND_SCREEN___"
+    genres = genres.replace("Stage & Screen", placeholder)
+    
+    # Maintenant supprimer tous les autres "&"
+    genres = genres.replace(' & ', ', ')
+    genres = genres.replace('&', ',')
+    
+    # Restaurer "Stage & Screen"
+    genres = genres.replace(placeholder, "Stage & Screen")
+    
+    # Séparer les genres pour supprimer les doublons
+    genres_list = [g.strip() for g in genres.split(',')]
+    
+    # Supprimer les doublons tout en gardant l'ordre
+    genres_uniques = []
+    for genre in genres_list:
+        if genre and genre not in genres_uniques:
+            genres_uniques.append(genre)
+    
+    return ', '.join(genres_uniques)
+
+def nettoyer_prix(prix_str):
+    
+    # Version simple : convertit toutes les virgules en points pour Excel
+    
+    if not prix_str:
+        return ""
+    
+    # Décoder les entités HTML
+    prix = html.unescape(prix_str)
+    
+    # Remplacer les espaces insécables par des espaces normaux
+    prix = prix.replace('\u00a0', ' ').replace('\xa0', ' ')
+    
+    # Supprimer le symbole € et autres devises
+    prix = prix.replace('€', '').replace('$', '').replace('£', '')
+    
+    # Supprimer tous les espaces
+    prix = re.sub(r'\s+', '', prix)
+    
+    # Convertir TOUTES les virgules en points
+    prix = prix.replace(',', '.')
+    
+    return prix.strip()
+
+def nettoyer_nombre(nombre_str):
+    
+    # Nettoie les nombres en supprimant les espaces et en gardant seulement les chiffres
+    # Exemple : "76 309" devient "76309"
+    
+    if not nombre_str:
+        return ""
+    
+    # Supprimer tous les espaces et caractères non numériques sauf le point et la virgule
+    nombre = re.sub(r'[^\d.,]', '', nombre_str.strip())
+    
+    return nombre
+
+def nettoyer_pays(pays_str):
+    
+    # Nettoie les pays en supprimant les espaces en trop ET les "&"
+    # Exemple : "UK, Europe & US" => "UK, Europe, US"
+    
+    if not pays_str:
+        return ""
+    
+    # Décoder HTML et nettoyer
+    pays = html.unescape(pays_str)
+    
+    # Supprimer tous les "&" et les remplacer par des virgules
+    pays = pays.replace(' & ', ', ')
+    pays = pays.replace('&', ',')
+    
+    # Nettoyer les virgules multiples et espaces
+    pays = re.sub(r',\s*,+', ',', pays)  # Supprimer virgules multiples
+    pays = re.sub(r'\s+', ' ', pays)     # Espaces multiples
+    pays = pays.strip().strip(',')       # Espaces et virgules en début/fin
+    
+    return pays
+
+def formater_date_pour_excel(date_str):
+    
+    # Convertit TOUTES les dates au format JJ/MM/AAAA pour Excel
+    
+    if not date_str:
+        return ""
+    
+    try:
+        date_str = date_str.strip()
+        
+        # Si c'est juste une année (4 chiffres)
+        if re.match(r'^\d{4}$', date_str):
+            return f"01/01/{date_str}"
+        
+        # Si c'est déjà au bon format JJ/MM/AAAA
+        if re.match(r'^\d{2}/\d{2}/\d{4}$', date_str):
+            return date_str
+        
+        # Dictionnaire des mois français
+        mois_dict = {
+            # Français
+            'janv': '01', 'janvier': '01',
+            'févr': '02', 'février': '02', 'fevrier': '02',
+            'mars': '03',
+            'avr': '04', 'avril': '04',
+            'mai': '05',
+            'juin': '06',
+            'juil': '07', 'juillet': '07',
+            'août': '08', 'aout': '08',
+            'sept': '09', 'septembre': '09',
+            'oct': '10', 'octobre': '10',
+            'nov': '11', 'novembre': '11',
+            'déc': '12', 'décembre': '12', 'decembre': '12',
+        }
+        
+        # Pattern pour "22 oct. 2012" ou "4 nov. 2016" ou "15 Dec 2023"
+        match_jour_mois_annee = re.search(r'(\d{1,2})\s+(\w+)\.?\s+(\d{4})', date_str, re.IGNORECASE)
+        if match_jour_mois_annee:
+            jour = match_jour_mois_annee.group(1).zfill(2)
+            mois_txt = match_jour_mois_annee.group(2).lower().rstrip('.')
+            annee = match_jour_mois_annee.group(3)
+            
+            if mois_txt in mois_dict:
+                return f"{jour}/{mois_dict[mois_txt]}/{annee}"
+        
+        # Pattern pour "oct. 2012" ou "nov 2016" (sans jour)
+        match_mois_annee = re.search(r'(\w+)\.?\s+(\d{4})', date_str, re.IGNORECASE)
+        if match_mois_annee:
+            mois_txt = match_mois_annee.group(1).lower().rstrip('.')
+            annee = match_mois_annee.group(2)
+            
+            if mois_txt in mois_dict:
+                return f"01/{mois_dict[mois_txt]}/{annee}"
+        
+        # Pattern pour format ISO "2023-05-15"
+        match_iso = re.search(r'(\d{4})-(\d{2})-(\d{2})', date_str)
+        if match_iso:
+            annee = match_iso.group(1)
+            mois = match_iso.group(2)
+            jour = match_iso.group(3)
+            return f"{jour}/{mois}/{annee}"
+        
+        # Si rien ne marche, retourner tel quel
+        return date_str
+    
+    except Exception as e:
+        return date_str
@@ -0,0 +1,345 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# -----------------------------------------------------------------------------
+# SERVEUR LOCAL IMITANT DISCOGS (catalogue + pages album synthétiques)
+# -----------------------------------------------------------------------------
+#
+# Sert des pages avec la même structure HTML que discogs.com (classes
+# card-release-title, name_qjn4_, link_wXY7O, section#release-stats...) pour
+# mesurer les performances du scraper sans solliciter le vrai site.
+#
+# Utilisation :
+#   python benchmarks/serveur_discogs_local.py --port 8765 --latence 200 --taux-429 0.02
+
+ARTISTES = ['Pink Floyd', 'Michael Jackson', 'Fleetwood Mac', 'The Beatles', 'Daft Punk',
+            'Justice (3)', 'Nirvana', 'Adele', 'Miles Davis', 'Bob Marley &amp; The Wailers']
+LABELS = ['Harvest', 'Epic', 'Warner Bros. Records', 'Parlophone', 'Columbia',
+          'Virgin', 'EMI', 'Capitol Records', 'GEM (6)', 'Island Records']
+FORMATS = ['Vinyl', 'CD', 'Cassette', 'LP', 'Album', 'Reissue']
+PAYS = ['UK', 'US', 'Europe', 'France', 'Germany', 'Japan', 'UK, Europe &amp; US']
+GENRES = ['Rock', 'Pop', 'Electronic', 'Jazz', 'Funk / Soul', 'Stage &amp; Screen',
+          'Folk, World, &amp; Country', 'Hip Hop']
+MOIS = ['janv.', 'févr.', 'mars', 'avr.', 'mai', 'juin',
+        'juil.', 'août', 'sept.', 'oct.', 'nov.', 'déc.']
+
+def _generateur(release_id):
+
+    # Générateur pseudo-aléatoire déterministe : une release donne toujours la même page
+
+    return random.Random(release_id)
+
+def _master(release_id, pressages=1):
+
+    # Master de la release : pressages releases consécutives partagent le même album
+
+    return (release_id - 1) // pressages + 1
+
+def generer_page_catalogue(page, resultats_par_page=50, total_albums=10000, pressages=1):
+
+    # Génère une page de recherche avec une carte par release
+
+    debut = (page - 1) * resultats_par_page
+    fin = min(debut + resultats_par_page, total_albums)
+
+    cartes = []
+    for release_id in range(debut + 1, fin + 1):
+        rnd = _generateur(release_id)
+        master = _master(release_id, pressages)
+        artiste = rnd.choice(ARTISTES)
+        if pressages > 1:
+            # Même artiste et même titre pour tous les pressages d'un master
+            artiste = _generateur(master).choice(ARTISTES)
+        titre = f"Album N°{master} &#39;Édition&#39;"
+        cartes.append(f"""
+<li role="listitem">
+  <div class="card card_large float_fix shortcut_navigable">
+    <a class="thumbnail_link" href="/release/{release_id}-Album-{release_id}">
+      <span class="thumbnail_center"><img data-src="https://i.discogs.com/thumb/{release_id}.jpg" alt=""></span>
+    </a>
+    <div class="card-release-title">
+      <h4><a class="search_result_title" href="/release/{release_id}-Album-{release_id}" title="{titre}">{titre}</a></h4>
+    </div>
+    <div class="card-artist-name"><span><a href="/artist/{release_id % 97}" title="{artiste}">{artiste}</a></span></div>
+    <div class="card-release-format">{rnd.choice(FORMATS)}, Album</div>
+    <div class="card-release-year">{rnd.randint(1960, 2024)}</div>
+  </div>
+</li>""")
+
+    return f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Discogs - Recherche</title></head>
+<body>
+<div id="search_results"><ul class="cards cards_layout_large">{''.join(cartes)}
+</ul></div>
+<p>{'Lorem ipsum dolor sit amet. ' * 20}</p>
+</body></html>"""
+
+def generer_page_album(release_id, pressages=1):
+
+    # Génère une page album complète (en-tête + statistiques)
+
+    rnd = _generateur(release_id)
+    master = _master(release_id, pressages)
+    labels = rnd.sample(LABELS, rnd.randint(1, 4))
+    formats = rnd.sample(FORMATS, rnd.randint(1, 3))
+    genres = rnd.sample(GENRES, rnd.randint(1, 3))
+    annee = rnd.randint(1960, 2024)
+    mois = rnd.randint(1, 12)
+    jour = rnd.randint(1, 28)
+    collection = rnd.randint(100, 150000)
+    note = rnd.uniform(3.0, 5.0)
+    prix = sorted(rnd.uniform(1, 500) for _ in range(3))
+    pays = rnd.choice(PAYS)
+
+    def _nombre(valeur):
+        # Séparateur de milliers à la française : 76 309
+        return f"{valeur:,}".replace(',', ' ')
+
+    def _prix(valeur):
+        return f"{valeur:.2f}".replace('.', ',') + "&nbsp;€"
+
+    liens_labels = ', '.join(f'<a href="/label/{LABELS.index(l)}-{l.replace(" ", "-")}">{l}</a>' for l in labels)
+    liens_formats = ', '.join(f'<a href="/search/?format_exact={f}">{f}</a>' for f in formats)
+    liens_genres = ', '.join(f'<a href="/genre/{g}">{g}</a>' for g in genres)
+
+    return f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Release {release_id}</title></head>
+<body>
+<div id="page">
+  <h1 class="title_1q3xW">{rnd.choice(ARTISTES)} – Album N°{release_id}</h1>
+  <a class="link_1ctor" href="/master/{master}-Album-{master}">Master Release</a>
+  <table class="table_1fWaB"><tbody>
+    <tr><th>Label:</th><td>{liens_labels}</td></tr>
+    <tr><th>Format:</th><td>{liens_formats}</td></tr>
+    <tr><th>Pays:</th><td><a href="/search/?country={pays}">{pays}</a></td></tr>
+    <tr><th>Sortie:</th><td><time datetime="{annee}-{mois:02d}-{jour:02d}">{jour} {MOIS[mois - 1]} {annee}</time></td></tr>
+    <tr><th>Genre:</th><td>{liens_genres}</td></tr>
+  </tbody></table>
+  <section id="release-stats"><ul>
+    <li><span class="name_qjn4_">En collection:</span><a class="link_wXY7O" href="#">{_nombre(collection)}</a></li>
+    <li><span class="name_qjn4_">En wantlist:</span><a class="link_wXY7O" href="#">{_nombre(collection // 3)}</a></li>
+    <li><span class="name_qjn4_">Note moyenne:</span><span>{note:.2f} / 5</span></li>
+    <li><span class="name_qjn4_">Notes:</span><a class="link_wXY7O" href="#">{_nombre(collection // 10)}</a></li>
+    <li><span class="name_qjn4_">Dernière vente:</span><time datetime="{annee}">{jour} {MOIS[mois - 1]} 2025</time></li>
+    <li><span class="name_qjn4_">Faible:</span><span>{_prix(prix[0])}</span></li>
+    <li><span class="name_qjn4_">Moyen:</span><span>{_prix(prix[1])}</span></li>
+    <li><span class="name_qjn4_">Élevée:</span><span>{_prix(prix[2])}</span></li>
+  </ul></section>
+</div>
+<p>{'Lorem ipsum dolor sit amet. ' * 20}</p>
+</body></html>"""
+
+# Releases par page des listings artiste / label / master
+RELEASES_PAR_PAGE_LISTING = 25
+
+def generer_page_listing(chemin, releases, page=1, pressages=1):
+
+    # Discographie d'un artiste ou d'un label, versions d'un master : une ligne par
+    # release ou par master (plusieurs pressages), lien vers la page suivante
+
+    debut = (page - 1) * RELEASES_PAR_PAGE_LISTING
+    lignes = []
+    masters_vus = set()
+    for release_id in releases[debut:debut + RELEASES_PAR_PAGE_LISTING]:
+        master = _master(release_id, pressages)
+        if pressages > 1 and not chemin.startswith('/master/'):
+            if master in masters_vus:
+                continue
+            masters_vus.add(master)
+            lien = f'<a href="/master/{master}-Album-{master}">Album N°{master}</a>'
+        else:
+            lien = f'<a href="/release/{release_id}-Album-{release_id}">Album N°{release_id}</a>'
+        lignes.append(f'<tr class="card_1ov9L"><td class="title_2Ml6x">{lien}</td>'
+                      f'<td><a href="/label/{release_id % len(LABELS)}-x">Label</a></td></tr>')
+
+    suivante = ''
+    if debut + RELEASES_PAR_PAGE_LISTING < len(releases):
+        suivante = f'<a class="pagination_next" href="{chemin}?page={page + 1}">Suivant</a>'
+
+    return f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Discographie</title></head>
+<body>
+<table class="releases_3Onry"><tbody>{''.join(lignes)}
+</tbody></table>
+<nav class="pagination_1RDuL">{suivante}</nav>
+<p>{'Lorem ipsum dolor sit amet. ' * 20}</p>
+</body></html>"""
+
+# Page de challenge anti-bot (code 200, assez longue pour passer le test des 500 caractères)
+PAGE_CHALLENGE = f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Just a moment...</title></head>
+<body>
+<div id="challenge-platform"><h1>Checking your browser before accessing discogs.com</h1>
+<div class="cf-turnstile" data-sitekey="0x0000"></div></div>
+<p>{'Please enable JavaScript and cookies to continue. ' * 15}</p>
+</body></html>"""
+
+# -----------------------------------------------------------------------------
+# SERVEUR HTTP
+# -----------------------------------------------------------------------------
+
+class GestionnaireDiscogs(BaseHTTPRequestHandler):
+
+    # Les paramètres (latence, erreurs...) sont portés par le serveur
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Pas de log par requête (fausserait les mesures)
+        pass
+
+    def _repondre(self, code, contenu, entetes=None):
+        corps = contenu.encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        for nom, valeur in (entetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        serveur = self.server
+
+        # Latence simulée (moyenne + gigue)
+        if serveur.latence_ms:
+            gigue = random.uniform(-serveur.gigue_ms, serveur.gigue_ms)
+            time.sleep(max(0.0, serveur.latence_ms + gigue) / 1000)
+
+        # Pages lentes (queue de latence)
+        if serveur.taux_lent and random.random() < serveur.taux_lent:
+            serveur.compter('lente')
+            time.sleep(serveur.latence_lente_ms / 1000)
+
+        # Injection d'erreurs
+        tirage = random.random()
+        if tirage < serveur.taux_429:
+            serveur.compter('429')
+            self._repondre(429, "Too Many Requests", {"Retry-After": "1"})
+            return
+        if tirage < serveur.taux_429 + serveur.taux_erreur:
+            serveur.compter('500')
+            self._repondre(500, "Internal Server Error")
+            return
+        if tirage < serveur.taux_429 + serveur.taux_erreur + serveur.taux_blocage:
+            serveur.compter('challenge')
+            self._repondre(200, PAGE_CHALLENGE)
+            return
+
+        chemin = urlparse(self.path)
+        parametres = parse_qs(chemin.query)
+
+        if chemin.path.rstrip('/').endswith('/search'):
+            page = int(parametres.get('page', ['1'])[0])
+            limite = int(parametres.get('limit', ['50'])[0])
+            serveur.compter('catalogue')
+            self._repondre(200, generer_page_catalogue(page, limite, serveur.total_albums, serveur.pressages))
+            return
+
+        # Listings : artiste n => releases n, n+97, n+194... ; label n => releases n, n+10...
+        match_listing = re.match(r'^/(?:fr/)?(artist|label|master)/(\d+)', chemin.path)
+        if match_listing:
+            type_listing, identifiant = match_listing.group(1), int(match_listing.group(2))
+            if type_listing == 'master':
+                debut = (identifiant - 1) * serveur.pressages + 1
+                releases = list(range(debut, min(debut + serveur.pressages, serveur.total_albums + 1)))
+            else:
+                pas = 97 if type_listing == 'artist' else len(LABELS)
+                releases = list(range(identifiant or pas, serveur.total_albums + 1, pas))
+            page = int(parametres.get('page', ['1'])[0])
+            serveur.compter(type_listing)
+            self._repondre(200, generer_page_listing(chemin.path, releases, page, serveur.pressages))
+            return
+
+        match_release = re.match(r'^/(?:fr/)?release/(\d+)', chemin.path)
+        if match_release:
+            # Validateurs HTTP : une page inchangée est servie en 304 sans contenu
+            page = generer_page_album(int(match_release.group(1)), serveur.pressages)
+            etag = '"' + hashlib.blake2b(page.encode('utf-8'), digest_size=8).hexdigest() + '"'
+            entetes = {'ETag': etag, 'Last-Modified': 'Mon, 06 Oct 2025 12:00:00 GMT'}
+            if self.headers.get('If-None-Match') == etag:
+                serveur.compter('304')
+                self.send_response(304)
+                for nom, valeur in entetes.items():
+                    self.send_header(nom, valeur)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            serveur.compter('album')
+            self._repondre(200, page, entetes)
+            return
+
+        serveur.compter('404')
+        self._repondre(404, "Not Found")
+
+class ServeurDiscogsLocal(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latence_ms=0, gigue_ms=0, taux_erreur=0.0,
+                 taux_429=0.0, total_albums=10000, taux_blocage=0.0, taux_lent=0.0,
+                 latence_lente_ms=10000, pressages=1):
+        super().__init__(("127.0.0.1", port), GestionnaireDiscogs)
+        self.latence_ms = latence_ms
+        self.gigue_ms = gigue_ms
+        self.taux_erreur = taux_erreur
+        self.taux_429 = taux_429
+        self.taux_blocage = taux_blocage
+        self.taux_lent = taux_lent
+        self.latence_lente_ms = latence_lente_ms
+        self.total_albums = total_albums
+        self.pressages = pressages
+        self.compteurs = {}
+        self._verrou = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def compter(self, cle):
+        with self._verrou:
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + 1
+
+    def demarrer(self):
+        # Démarre le serveur dans un thread (pour les benchmarks)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        self.shutdown()
+        self.server_close()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur local imitant Discogs")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latence", type=float, default=0, help="Latence moyenne (ms)")
+    parser.add_argument("--gigue", type=float, default=0, help="Gigue de latence (ms)")
+    parser.add_argument("--taux-erreur", type=float, default=0.0, help="Proportion de réponses 500")
+    parser.add_argument("--taux-429", type=float, default=0.0, help="Proportion de réponses 429")
+    parser.add_argument("--taux-blocage", type=float, default=0.0,
+                        help="Proportion de pages de challenge (code 200)")
+    parser.add_argument("--taux-lent", type=float, default=0.0,
+                        help="Proportion de pages très lentes (queue de latence)")
+    parser.add_argument("--latence-lente", type=float, default=10000, help="Latence des pages lentes (ms)")
+    parser.add_argument("--albums", type=int, default=10000, help="Taille du catalogue")
+    parser.add_argument("--pressages", type=int, default=1,
+                        help="Releases consécutives partageant le même master")
+    args = parser.parse_args()
+
+    serveur = ServeurDiscogsLocal(args.port, args.latence, args.gigue, args.taux_erreur,
+                                  args.taux_429, args.albums, args.taux_blocage,
+                                  args.taux_lent, args.latence_lente, args.pressages)
+    print(f"Serveur Discogs local sur {serveur.url} (Ctrl+C pour arrêter)")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nRequêtes servies : {serveur.compteurs}")
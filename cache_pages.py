@@ -0,0 +1,139 @@
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+import configuration as config
+import reseau
+from extraction import extraire_infos_completes_album
+from schema_extraction import extracteur_album
+
+# -----------------------------------------------------------------------------
+# CACHE DES PAGES ALBUM (requêtes conditionnelles + empreinte du contenu)
+# -----------------------------------------------------------------------------
+#
+# Lors d'un nouveau passage, la plupart des pages release n'ont pas changé.
+# Pour chaque URL sont gardés l'ETag / Last-Modified, une empreinte des
+# sections utiles (en-tête + section#release-stats) et les infos extraites :
+#   - chemin HTTP : requête conditionnelle, réponse 304 => infos du cache
+#   - sinon : empreinte identique => infos du cache, sans parsing BeautifulSoup
+# Dans les deux cas les infos ne sont ni re-extraites ni réécrites dans le cache.
+# Chaque entrée garde aussi la version de l'extracteur (schema_album.json,
+# langues, VERSION_EXTRACTEUR) : après une modification du schéma ou du code
+# d'extraction, une page inchangée est ré-extraite au lieu de rendre des
+# infos périmées (champ ajouté absent, anciens sélecteurs).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    derniere_modification TEXT,
+    empreinte TEXT,
+    nettoye INTEGER,
+    infos TEXT NOT NULL,
+    vu_le REAL,
+    version TEXT
+)
+"""
+
+# Sections dont dépendent les infos extraites (recherche sur le HTML brut)
+RE_SECTIONS = (
+    re.compile(r'<h1\b.*?</h1>', re.S),
+    re.compile(r'<table\b.*?</table>', re.S),
+    re.compile(r'<section[^>]*id="release-stats".*?</section>', re.S),
+    # Lien vers le master, en dehors des sections ci-dessus (master_id)
+    re.compile(r'href="[^"]*/master/\d+'),
+)
+
+def empreinte_contenu(html):
+
+    # Empreinte de l'en-tête et des statistiques ; toute la page si elles sont introuvables
+    # (publicités, jetons et scripts qui changent à chaque chargement sont ignorés)
+
+    sections = [match.group(0) for regex in RE_SECTIONS for match in [regex.search(html)] if match]
+    contenu = ''.join(sections) if sections else html
+    return hashlib.blake2b(contenu.encode('utf-8'), digest_size=16).hexdigest()
+
+class CachePages:
+
+    def __init__(self, chemin=None):
+        self.chemin = chemin or config.FICHIER_CACHE_PAGES
+        self.connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+        self.connexion.execute(SCHEMA)
+        # Cache créé avant la colonne version : ses entrées seront toutes ré-extraites
+        colonnes = [ligne[1] for ligne in self.connexion.execute("PRAGMA table_info(pages)")]
+        if 'version' not in colonnes:
+            self.connexion.execute("ALTER TABLE pages ADD COLUMN version TEXT")
+        self.statistiques = {'extraites': 0, 'non_modifiees_304': 0, 'empreinte_identique': 0}
+
+    def lire(self, url):
+        ligne = self.connexion.execute(
+            "SELECT etag, derniere_modification, empreinte, nettoye, infos, version FROM pages WHERE url = ?",
+            (url,)).fetchone()
+        if ligne is None:
+            return None
+        return {'etag': ligne[0], 'derniere_modification': ligne[1], 'empreinte': ligne[2],
+                'nettoye': bool(ligne[3]), 'infos': json.loads(ligne[4]), 'version': ligne[5]}
+
+    def ecrire(self, url, infos, empreinte, nettoye, etag=None, derniere_modification=None, version=None):
+        with self.connexion:
+            self.connexion.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, derniere_modification, empreinte, nettoye, infos, "
+                "vu_le, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, derniere_modification, empreinte, int(nettoye),
+                 json.dumps(infos, ensure_ascii=False), time.time(), version))
+
+    def mettre_a_jour_validateurs(self, url, etag, derniere_modification):
+        with self.connexion:
+            self.connexion.execute("UPDATE pages SET etag = ?, derniere_modification = ? WHERE url = ?",
+                                   (etag, derniere_modification, url))
+
+    def compter(self, statut):
+        self.statistiques[statut] += 1
+
+    def taux_evitement(self):
+
+        # Part des pages dont l'extraction et l'écriture ont été évitées
+
+        total = sum(self.statistiques.values())
+        evitees = total - self.statistiques['extraites']
+        return evitees / total if total else 0.0
+
+    def fermer(self):
+        self.connexion.close()
+
+def charger_infos_album(url, cache, nettoyer=True, max_retries=3):
+
+    # Télécharge et extrait une page album en évitant le travail si elle n'a pas changé
+    # Retourne (infos, statut) avec statut 'extraites', 'non_modifiees_304' ou 'empreinte_identique'
+
+    version = extracteur_album().version
+    entree = cache.lire(url)
+    if entree is not None and (entree['nettoye'] != nettoyer or entree['version'] != version):
+        # Infos du cache dans l'autre mode (brut / nettoyé) ou d'un autre extracteur : inutilisables
+        entree = None
+
+    etag = derniere_modification = None
+    if config.CHARGEMENT_HTTP:
+        reponse = reseau.http_get(url, entree and entree['etag'], entree and entree['derniere_modification'],
+                                  max_retries=max_retries)
+        if reponse.statut == 304 and entree is not None:
+            cache.compter('non_modifiees_304')
+            return entree['infos'], 'non_modifiees_304'
+        etag, derniere_modification = reponse.etag, reponse.derniere_modification
+    else:
+        reponse = reseau.crawl_get(url, max_retries=max_retries)
+
+    empreinte = empreinte_contenu(reponse.html)
+    if entree is not None and entree['empreinte'] == empreinte:
+        # Seuls les validateurs HTTP sont enregistrés s'ils sont nouveaux (pour le prochain 304)
+        if (etag, derniere_modification) != (entree['etag'], entree['derniere_modification']) and etag:
+            cache.mettre_a_jour_validateurs(url, etag, derniere_modification)
+        cache.compter('empreinte_identique')
+        return entree['infos'], 'empreinte_identique'
+
+    infos = extraire_infos_completes_album(reponse.html, url, nettoyer)
+    cache.ecrire(url, infos, empreinte, nettoyer, etag, derniere_modification, version)
+    cache.compter('extraites')
+    return infos, 'extraites'
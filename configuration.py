@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# CONFIGURATION
+# -----------------------------------------------------------------------------
+#
+# Paramètres partagés par main.py, reseau.py, extraction.py et api.py.
+# Ils sont lus à chaque utilisation : on peut les modifier à l'exécution
+# (ex : configuration.URL_DISCOGS = "http://127.0.0.1:8765" pour les benchmarks).
+
+# Site cible (remplaçable par un serveur local pour les benchmarks)
+URL_DISCOGS = "https://www.discogs.com"
+
+# Chargement des pages
+DELAI_AVANT_HTML = 3.0      # Secondes d'attente avant de récupérer le HTML
+PAGE_TIMEOUT_MS = 30000     # Timeout de chargement d'une page
+
+# Nettoyage par lot en fin de run (colonnes typées, nécessite pandas)
+# au lieu du nettoyage ligne par ligne pendant le scraping
+POST_TRAITEMENT_PAR_LOT = False
+
+# Export supplémentaire en tables d'entités (ids + dim_label.csv, dim_genres.csv...)
+EXPORT_TABLES_ENTITES = False
+
+# Pauses (en secondes)
+PAUSE_RETRY = 5             # Entre deux tentatives
+PAUSE_CATALOGUE = 1         # Entre chaque page du catalogue
+PAUSE_CATALOGUE_VIDE = 2    # Après une page catalogue vide
+PAUSE_ERREUR_CATALOGUE = 5  # Après l'échec d'une page catalogue
+PAUSE_ALBUM = 1.5           # Entre chaque page album
+PAUSE_ERREUR_ALBUM = 3      # Après l'échec d'une page album
+
+# File des échecs : une page en échec est enregistrée dans FICHIER_ECHECS
+# (une seule tentative, aucune pause) puis retentée par une passe de reprise
+# en fin de run ou lors d'un run suivant. False = retry et pauses sur place.
+REPRISE_DIFFEREE = True
+FICHIER_ECHECS = 'discogs_echecs.jsonl'
+REPRISE_CONCURRENCE = 2     # Pages retentées en parallèle
+REPRISE_MAX_TENTATIVES = 3  # Au-delà, l'échec reste dans le fichier
+REPRISE_BACKOFF_BASE = 10   # Secondes, doublées à chaque tentative
+REPRISE_BACKOFF_MAX = 120
+
+# Détection des pages de blocage (challenge, captcha, consentement, sélecteurs
+# absents) et disjoncteur global : après SEUIL_DISJONCTEUR blocages consécutifs,
+# tous les workers s'arrêtent REFROIDISSEMENT_DISJONCTEUR secondes puis une
+# requête sonde décide de la reprise (refroidissement doublé si elle échoue)
+DETECTION_BLOCAGE = True
+SEUIL_DISJONCTEUR = 3
+REFROIDISSEMENT_DISJONCTEUR = 60
+REFROIDISSEMENT_MAX = 900
+
+# Pool de navigateurs réutilisés (0 = un navigateur lancé par page)
+# Chaque navigateur est recyclé après POOL_PAGES_MAX pages, ou quand la RSS
+# des processus navigateur dépasse POOL_RSS_MAX_MO (mesurée avec psutil
+# toutes les POOL_VERIFICATION_RSS pages, ignorée si psutil est absent)
+TAILLE_POOL = 2
+POOL_PAGES_MAX = 200
+POOL_RSS_MAX_MO = 1500
+POOL_VERIFICATION_RSS = 20
+
+# Timeouts adaptatifs : après LATENCE_MIN_ECHANTILLONS pages d'un type, le
+# timeout devient p99 x LATENCE_MARGE (borné par TIMEOUT_MIN_MS et PAGE_TIMEOUT_MS)
+TIMEOUTS_ADAPTATIFS = True
+LATENCE_MIN_ECHANTILLONS = 20
+LATENCE_MARGE = 3.0
+TIMEOUT_MIN_MS = 5000
+
+# Relance (hedging) : une page sans réponse au bout du p95 de son type est
+# redemandée en parallèle, la première réponse valide est gardée
+HEDGING = False
+
+# Crawl distribué (distribue.py) : file de travail SQLite partagée
+FICHIER_FILE_TRAVAIL = 'discogs_travail.sqlite'
+DUREE_BAIL = 120            # Secondes avant qu'une tâche d'un worker muet soit reprise
+BATTEMENT_S = 30            # Intervalle des battements de cœur
+MAX_TENTATIVES_TACHE = 3    # Au-delà, la tâche est classée en échec
+PAUSE_FILE_VIDE = 2         # Attente quand d'autres workers ont encore du travail
+
+# Ordre de l'enrichissement (ordonnancement.py) : score = somme pondérée du rang
+# dans le catalogue, de l'ancienneté de la dernière visite et des champs vides
+# False = ordre du catalogue
+ORDONNANCEMENT_PRIORITE = True
+POIDS_RANG = 1.0
+POIDS_ANCIENNETE = 0.5
+POIDS_CHAMPS_VIDES = 0.5
+ANCIENNETE_MAX_JOURS = 30   # Ancienneté à partir de laquelle le score est maximal
+
+# Cache des pages album (cache_pages.py) : ETag / Last-Modified, empreinte de
+# l'en-tête et de section#release-stats, infos extraites. Une page inchangée
+# n'est ni re-parsée ni réécrite.
+CACHE_PAGES = True
+FICHIER_CACHE_PAGES = 'discogs_cache_pages.sqlite'
+
+# Pages album téléchargées en HTTP simple (urllib, requêtes conditionnelles
+# If-None-Match / If-Modified-Since) au lieu du navigateur
+CHARGEMENT_HTTP = False
+
+# Historique des statistiques (historique.py) : un relevé par run, seules les
+# valeurs modifiées depuis le relevé précédent sont écrites
+HISTORIQUE_STATS = True
+FICHIER_HISTORIQUE = 'discogs_historique.sqlite'
+
+# Index de correspondance floue artiste / album (recherche.py)
+FICHIER_INDEX_RECHERCHE = 'discogs_index_recherche.sqlite'
+
+# Mode master (masters.py) : une seule page album visitée par album, tous
+# pressages confondus ; les correspondances release => master apprises sont
+# gardées pour les runs suivants
+REGROUPEMENT_MASTERS = False
+FICHIER_MASTERS = 'discogs_masters.json'
+
+# Releases déjà enrichies par le crawl des discographies (discographie.py),
+# gardées d'un run à l'autre dans un bitmap sur disque (frontiere.py, 1 bit
+# par identifiant) : seules les nouvelles releases sont visitées
+RELEASES_VUES_PERSISTANTES = False
+FICHIER_RELEASES_VUES = 'discogs_releases_vues.bits'
+
+# Schéma déclaratif de la page album (schema_extraction.py) : sélecteurs,
+# libellés des statistiques par langue, nettoyeurs. Chemin relatif au dossier
+# du projet ; seules les langues listées sont reconnues (les nettoyeurs de
+# nettoyage.py lisent les nombres, prix et dates des pages fr comme en).
+FICHIER_SCHEMA_EXTRACTION = 'schema_album.json'
+LANGUES_EXTRACTION = ('fr', 'en')
+
+# Profilage par étape (python main.py --profile, profilage.py) : cProfile,
+# piles échantillonnées (flamegraph) et tracemalloc
+DOSSIER_PROFIL = 'discogs_profil'
+PROFIL_INTERVALLE_MS = 5            # Intervalle d'échantillonnage des piles
+PROFIL_ECHANTILLON_MEMOIRE = 50     # Clichés tracemalloc sur 1 appel sur N par étape
+PROFIL_CLICHES_MAX = 20             # ... et au plus N appels mesurés par étape
+PROFIL_PROFONDEUR_TRACEMALLOC = 1   # Trames gardées par allocation
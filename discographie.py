@@ -0,0 +1,222 @@
+import asyncio
+from collections import deque
+
+import configuration as config
+import reseau
+from enregistrements import Album
+from extraction import (analyser_url_discogs, extraire_liens_discographie, extraire_titre_release,
+                        extraire_infos_completes_album)
+from frontiere import BitmapIds, EnsembleVus
+from pool_navigateurs import fermer_pool
+
+# -----------------------------------------------------------------------------
+# CRAWL DES DISCOGRAPHIES (artistes, labels) EN LARGEUR
+# -----------------------------------------------------------------------------
+#
+# En plus du catalogue "Most Collected" : discographies complètes d'artistes
+# ou de labels choisis. Le site est parcouru comme un graphe, en largeur :
+#   page artiste / label  => pages suivantes du listing, masters, releases
+#   page master           => ses versions (releases)
+#   page release          => enrichie avec l'extracteur habituel ; si la
+#                            profondeur le permet, ses artistes et labels
+#                            deviennent de nouveaux points de départ
+# La frontière est une file FIFO doublée de l'ensemble des pages déjà vues
+# (clé type + identifiant + page, sans le slug ni le préfixe de langue) :
+# une release listée par l'artiste, son label et son master n'est visitée
+# qu'une fois. Les pages vues sont gardées dans un ensemble compact
+# (frontiere.py : 1 bit par identifiant) et non sous forme de chaînes.
+# Avec RELEASES_VUES_PERSISTANTES, les releases enrichies sont aussi notées
+# dans un bitmap sur disque : un run suivant ne revisite que les nouvelles.
+#
+# Téléchargements : crawl_get_async (retry, disjoncteur, timeouts adaptatifs,
+# pool de navigateurs), `concurrence` pages en parallèle, PAUSE_ALBUM après
+# chaque page comme dans api.py.
+
+class Frontiere:
+
+    def __init__(self, releases_deja_vues=None):
+        self.file = deque()
+        self.vues = EnsembleVus()
+        self.doublons = 0
+        # Bitmap persistant des releases enrichies lors des runs précédents (optionnel)
+        self.releases_deja_vues = releases_deja_vues
+        self.deja_enrichies = 0
+
+    def ajouter(self, url, profondeur):
+
+        # Ajoute la page si elle n'a jamais été vue ; retourne True si ajoutée
+
+        cible = analyser_url_discogs(url)
+        if cible is None:
+            return False
+        if not self.vues.ajouter(cible):
+            self.doublons += 1
+            return False
+        if (self.releases_deja_vues is not None and cible[0] == 'release'
+                and int(cible[1]) in self.releases_deja_vues):
+            self.deja_enrichies += 1
+            return False
+        self.file.append((url, cible[0], profondeur))
+        return True
+
+    def extraire(self):
+        return self.file.popleft()
+
+    def __len__(self):
+        return len(self.file)
+
+async def _visiter(url, type_page, profondeur, frontiere, profondeur_max, nettoyer):
+
+    # Télécharge une page ; retourne l'album pour une release, None pour un listing
+
+    if type_page == 'release':
+        response = await reseau.crawl_get_async(url, max_retries=3, type_page='album')
+    else:
+        response = await reseau.crawl_get_async(url, max_retries=3, type_page='discographie')
+
+    # Parsing BeautifulSoup (CPU) hors de la boucle d'événements
+    boucle = asyncio.get_running_loop()
+
+    if type_page != 'release':
+        # Pages suivantes et masters restent au même niveau que la page artiste / label
+        liens = await boucle.run_in_executor(None, extraire_liens_discographie, response.html, url)
+        for lien in liens['page'] + liens['master'] + liens['release']:
+            frontiere.ajouter(lien, profondeur)
+        return None
+
+    if profondeur < profondeur_max:
+        liens = await boucle.run_in_executor(None, extraire_liens_discographie, response.html, url)
+        for lien in liens['artist'] + liens['label']:
+            frontiere.ajouter(lien, profondeur + 1)
+
+    artiste, titre = await boucle.run_in_executor(None, extraire_titre_release, response.html, nettoyer)
+    infos = await boucle.run_in_executor(None, extraire_infos_completes_album, response.html, url, nettoyer)
+    album = Album({'artiste': artiste, 'album': titre, 'url': url})
+    album.mettre_a_jour(infos)
+    return album
+
+async def crawler_discographies_async(graines, profondeur_max=0, concurrence=4, releases_max=None,
+                                      nettoyer=True, file_echecs=None):
+
+    # Parcourt les discographies à partir d'URLs d'artistes / labels (ou de masters)
+    # profondeur_max : 0 = discographies des graines seulement, 1 = aussi celles des
+    # artistes et labels rencontrés sur leurs releases, etc.
+    # Retourne (albums enrichis dans l'ordre de visite, statistiques)
+
+    releases_deja_vues = BitmapIds(config.FICHIER_RELEASES_VUES) if config.RELEASES_VUES_PERSISTANTES else None
+    frontiere = Frontiere(releases_deja_vues)
+    for url in graines:
+        frontiere.ajouter(url, 0)
+
+    albums = []
+    statistiques = {'pages': {}, 'echecs': 0, 'pages_non_visitees': 0}
+    # Pages en cours de téléchargement (elles peuvent encore remplir la frontière)
+    en_cours = 0
+    releases_en_cours = 0
+    nouvelle_page = asyncio.Event()
+
+    async def _worker():
+        nonlocal en_cours, releases_en_cours
+        while True:
+            if not frontiere:
+                # File vide : fin si plus aucune page en cours ne peut en ajouter
+                if en_cours == 0:
+                    nouvelle_page.set()
+                    return
+                nouvelle_page.clear()
+                await nouvelle_page.wait()
+                continue
+
+            if releases_max is not None and len(albums) + releases_en_cours >= releases_max:
+                # Limite atteinte : le reste de la frontière n'est pas visité
+                statistiques['pages_non_visitees'] += len(frontiere)
+                frontiere.file.clear()
+                continue
+
+            url, type_page, profondeur = frontiere.extraire()
+            est_release = type_page == 'release'
+
+            en_cours += 1
+            releases_en_cours += est_release
+            try:
+                album = await _visiter(url, type_page, profondeur, frontiere, profondeur_max, nettoyer)
+                statistiques['pages'][type_page] = statistiques['pages'].get(type_page, 0) + 1
+                if album is not None:
+                    albums.append(album)
+                    if releases_deja_vues is not None:
+                        releases_deja_vues.ajouter(int(analyser_url_discogs(url)[1]))
+                    print(f"  [{len(albums)}] {album['artiste']} - {album['album']}")
+            except Exception as e:
+                statistiques['echecs'] += 1
+                print(f"  ✗ {url} : {type(e).__name__}")
+                if file_echecs is not None and est_release:
+                    file_echecs.ajouter(url, 'album', e, {'url': url})
+                await asyncio.sleep(config.PAUSE_ERREUR_ALBUM)
+            finally:
+                en_cours -= 1
+                releases_en_cours -= est_release
+                nouvelle_page.set()
+
+            await asyncio.sleep(config.PAUSE_ALBUM)
+
+    print("\n" + "="*70)
+    print(f"DISCOGRAPHIES : {len(graines)} points de départ, profondeur {profondeur_max}, "
+          f"{concurrence} pages en parallèle")
+    print("="*70)
+
+    try:
+        await asyncio.gather(*(_worker() for _ in range(concurrence)))
+    finally:
+        if releases_deja_vues is not None:
+            releases_deja_vues.fermer()
+
+    statistiques['pages_vues'] = len(frontiere.vues)
+    statistiques['doublons_evites'] = frontiere.doublons
+    statistiques['deja_enrichies'] = frontiere.deja_enrichies
+    return albums, statistiques
+
+def crawler_discographies(graines, profondeur_max=0, concurrence=4, releases_max=None,
+                          nettoyer=True, file_echecs=None):
+
+    # Version bloquante (boucle privée, navigateurs fermés à la fin)
+
+    async def _crawler():
+        try:
+            return await crawler_discographies_async(graines, profondeur_max, concurrence, releases_max,
+                                                     nettoyer, file_echecs)
+        finally:
+            await fermer_pool()
+
+    return asyncio.run(_crawler())
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import main
+
+    parser = argparse.ArgumentParser(description="Discographies complètes d'artistes et de labels")
+    parser.add_argument("graines", nargs="+",
+                        help="URLs ou chemins d'artistes / labels (ex. /artist/45467-Daft-Punk)")
+    parser.add_argument("--profondeur", type=int, default=0,
+                        help="0 = discographies des graines, 1 = aussi artistes et labels rencontrés...")
+    parser.add_argument("--concurrence", type=int, default=4)
+    parser.add_argument("--max", type=int, default=None, help="Nombre maximum de releases")
+    parser.add_argument("--sortie", default="discogs_discographies.csv")
+    args = parser.parse_args()
+
+    graines = [g if g.startswith('http') else f"{config.URL_DISCOGS}{g}" for g in args.graines]
+
+    debut = time.time()
+    albums, statistiques = crawler_discographies(graines, args.profondeur, args.concurrence, args.max,
+                                                 nettoyer=not config.POST_TRAITEMENT_PAR_LOT)
+    print(f"\n{len(albums)} releases en {(time.time() - debut) / 60:.1f} minutes | "
+          f"pages {statistiques['pages']} | {statistiques['doublons_evites']} doublons évités | "
+          f"{statistiques['deja_enrichies']} déjà enrichies | {statistiques['echecs']} échecs")
+    if config.POST_TRAITEMENT_PAR_LOT and albums:
+        # Valeurs brutes, artiste et titre compris (lus sur la page release) : nettoyées par lot
+        from post_traitement import post_traiter_colonnes, sauvegarder_csv_post_traite
+        tableau = post_traiter_colonnes(albums, inclure_catalogue=True)
+        sauvegarder_csv_post_traite(tableau, args.sortie, main.COLONNES_ENRICHIES)
+    else:
+        main.sauvegarder_csv_enrichi(albums, args.sortie)
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+
+import configuration as config
+
+# -----------------------------------------------------------------------------
+# DÉTECTION DES PAGES DE BLOCAGE / CAPTCHA / CONSENTEMENT
+# -----------------------------------------------------------------------------
+#
+# Une page de challenge fait plus de 500 caractères : sans détection elle est
+# parsée comme un album vide et le scraper continue de solliciter le site.
+# La détection se fait sur le HTML brut (pas de BeautifulSoup : appelée à
+# chaque téléchargement).
+
+# Présence d'au moins un de ces fragments = page normale
+SELECTEURS_CLES = {
+    'catalogue': ('card-release-title', 'id="search_results"'),
+    'album': ('id="release-stats"', 'href="/label/', '<time datetime='),
+    'discographie': ('/release/', '/master/'),
+}
+
+# Marqueurs cherchés (en minuscules) quand les sélecteurs clés sont absents
+MARQUEURS_BLOCAGE = {
+    'challenge': ('cf-challenge', 'challenge-platform', 'cf-turnstile', 'just a moment',
+                  'checking your browser'),
+    'captcha': ('captcha',),
+    'blocage': ('access denied', 'accès refusé', 'too many requests', 'request blocked',
+                'unusual traffic', 'error 1020', '403 forbidden'),
+    'consentement': ('onetrust', 'cookie consent', 'consentement', 'accept all cookies'),
+}
+
+class PageBloquee(Exception):
+
+    # Page reçue mais inexploitable (challenge, captcha, consentement, sélecteurs absents)
+
+    def __init__(self, motif, url=''):
+        super().__init__(f"Page bloquée ({motif}) : {url}")
+        self.motif = motif
+
+def detecter_blocage(html, type_page='album'):
+
+    # Retourne le motif du blocage ('challenge', 'captcha', 'blocage',
+    # 'consentement', 'selecteurs_absents') ou None si la page est normale
+
+    if any(selecteur in html for selecteur in SELECTEURS_CLES.get(type_page, ())):
+        return None
+
+    html_minuscule = html.lower()
+    for motif, marqueurs in MARQUEURS_BLOCAGE.items():
+        if any(marqueur in html_minuscule for marqueur in marqueurs):
+            return motif
+    return 'selecteurs_absents'
+
+# -----------------------------------------------------------------------------
+# DISJONCTEUR GLOBAL
+# -----------------------------------------------------------------------------
+#
+# Partagé par tous les workers (threads des shards, tâches asyncio de api.py) :
+#   fermé      : les requêtes passent
+#   ouvert     : SEUIL_DISJONCTEUR blocages consécutifs => tout le monde attend
+#                la fin du refroidissement
+#   demi-ouvert: une seule requête sonde passe ; succès => fermé, nouveau
+#                blocage => ouvert avec un refroidissement doublé
+
+FERME, OUVERT, DEMI_OUVERT = 'fermé', 'ouvert', 'demi-ouvert'
+
+class Disjoncteur:
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        with self._verrou:
+            self.etat = FERME
+            self.blocages_consecutifs = 0
+            self.refroidissement = 0
+            self.reprise = 0.0
+            self.sonde_en_cours = False
+            self.blocages = {}
+            self.ouvertures = 0
+            self.secondes_en_pause = 0.0
+
+    def _autoriser(self):
+
+        # Retourne 0 si la requête peut partir, sinon le temps d'attente conseillé
+
+        with self._verrou:
+            if self.etat == FERME:
+                return 0
+            maintenant = time.monotonic()
+            if self.etat == OUVERT and maintenant >= self.reprise:
+                self.etat = DEMI_OUVERT
+            if self.etat == DEMI_OUVERT and not self.sonde_en_cours:
+                self.sonde_en_cours = True
+                print("    Disjoncteur : requête sonde")
+                return 0
+            return min(max(self.reprise - maintenant, 0.5), 5)
+
+    async def attendre_async(self):
+        debut = time.monotonic()
+        while (attente := self._autoriser()):
+            await asyncio.sleep(attente)
+        with self._verrou:
+            self.secondes_en_pause += time.monotonic() - debut
+
+    def signaler_succes(self):
+        with self._verrou:
+            self.blocages_consecutifs = 0
+            if self.etat != FERME:
+                print("    Disjoncteur : sonde réussie, reprise du scraping")
+            self.etat = FERME
+            self.refroidissement = 0
+            self.sonde_en_cours = False
+
+    def signaler_erreur(self):
+
+        # Erreur réseau (ni succès ni blocage) : libère la sonde pour une autre requête
+
+        with self._verrou:
+            self.sonde_en_cours = False
+
+    def signaler_blocage(self, motif):
+        with self._verrou:
+            self.blocages[motif] = self.blocages.get(motif, 0) + 1
+            self.blocages_consecutifs += 1
+            if self.etat == OUVERT:
+                # Requête partie avant l'ouverture : déjà pris en compte
+                return
+            if self.etat == DEMI_OUVERT or self.blocages_consecutifs >= config.SEUIL_DISJONCTEUR:
+                if self.etat == DEMI_OUVERT:
+                    self.refroidissement = min(self.refroidissement * 2, config.REFROIDISSEMENT_MAX)
+                else:
+                    self.refroidissement = config.REFROIDISSEMENT_DISJONCTEUR
+                self.etat = OUVERT
+                self.sonde_en_cours = False
+                self.reprise = time.monotonic() + self.refroidissement
+                self.ouvertures += 1
+                print(f"    Disjoncteur ouvert ({motif}) : pause de {self.refroidissement}s pour tous les workers")
+
+    def rapport(self):
+        with self._verrou:
+            return {
+                'etat': self.etat,
+                'blocages': dict(self.blocages),
+                'total_blocages': sum(self.blocages.values()),
+                'ouvertures': self.ouvertures,
+                # Cumul sur tous les workers
+                'secondes_en_pause': round(self.secondes_en_pause, 1),
+            }
+
+# Instance partagée par tout le processus
+disjoncteur = Disjoncteur()
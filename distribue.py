@@ -0,0 +1,388 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+import configuration as config
+from enregistrements import Album
+
+# -----------------------------------------------------------------------------
+# CRAWL DISTRIBUÉ (file de travail SQLite partagée)
+# -----------------------------------------------------------------------------
+#
+# Au lieu de découper les pages à la main entre processus puis de concaténer
+# les CSV, un coordinateur remplit une file de travail SQLite partagée, et
+# autant de workers que voulu (processus d'une même machine) :
+#   - louent une tâche (page catalogue ou page album) pour DUREE_BAIL secondes,
+#   - prolongent leurs baux par un battement de cœur toutes les BATTEMENT_S secondes,
+#   - écrivent le résultat dans la table commune (une ligne par URL, sans doublon).
+# Un worker qui plante cesse de battre : ses baux expirent et les tâches
+# repartent dans la file.
+#
+# Une seule machine : le mode WAL de SQLite partage un index en mémoire
+# partagée (fichier -shm) entre les processus, ce qu'un disque réseau
+# (NFS, SMB) ne permet pas ; les verrous y sont aussi peu fiables. Plusieurs
+# machines corrompraient la base.
+#
+# Utilisation :
+#   python distribue.py coordinateur --pages 1-40 --resultats-par-page 250
+#   python distribue.py worker            (à lancer dans plusieurs terminaux)
+#   python distribue.py etat
+#   python distribue.py exporter discogs_albums_final.csv
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS taches (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    donnees TEXT,
+    etat TEXT NOT NULL DEFAULT 'attente',
+    worker TEXT,
+    bail_expire REAL,
+    tentatives INTEGER NOT NULL DEFAULT 0,
+    erreur TEXT
+);
+CREATE INDEX IF NOT EXISTS taches_etat ON taches (etat, type, id);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    hote TEXT,
+    pid INTEGER,
+    demarre_le REAL,
+    dernier_battement REAL,
+    pages INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS resultats (
+    url TEXT PRIMARY KEY,
+    donnees TEXT NOT NULL,
+    worker TEXT,
+    termine_le REAL
+);
+"""
+
+# Les pages catalogue passent avant les pages album (elles créent le travail)
+ORDRE_TYPES = "CASE type WHEN 'catalogue' THEN 0 ELSE 1 END"
+
+class FileTravail:
+
+    def __init__(self, chemin=None):
+        self.chemin = chemin or config.FICHIER_FILE_TRAVAIL
+        self.connexion = self._connecter()
+        self.connexion.executescript(SCHEMA)
+
+    def _connecter(self):
+
+        # Mode WAL : lectures et écritures concurrentes entre processus de la même machine
+        # isolation_level=None : transactions explicites (BEGIN IMMEDIATE)
+
+        connexion = sqlite3.connect(self.chemin, timeout=60, isolation_level=None,
+                                    check_same_thread=False)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.execute("PRAGMA synchronous=NORMAL")
+        return connexion
+
+    def _transaction(self, fonction, *args):
+
+        # Exécute fonction(curseur, *args) dans une transaction qui verrouille l'écriture
+
+        curseur = self.connexion.cursor()
+        curseur.execute("BEGIN IMMEDIATE")
+        try:
+            resultat = fonction(curseur, *args)
+        except BaseException:
+            curseur.execute("ROLLBACK")
+            raise
+        curseur.execute("COMMIT")
+        return resultat
+
+    # --- Remplissage (coordinateur et workers) -------------------------------
+
+    def ajouter_taches(self, type_page, elements):
+
+        # elements : [(url, données ou None)] ; une URL déjà présente est ignorée
+        # Retourne le nombre de tâches réellement ajoutées
+
+        lignes = [(type_page, url, json.dumps(donnees, ensure_ascii=False) if donnees else None)
+                  for url, donnees in elements]
+
+        def _inserer(curseur):
+            avant = self.connexion.total_changes
+            curseur.executemany("INSERT OR IGNORE INTO taches (type, url, donnees) VALUES (?, ?, ?)", lignes)
+            return self.connexion.total_changes - avant
+
+        return self._transaction(_inserer)
+
+    def ajouter_albums(self, albums):
+        return self.ajouter_taches('album', [(album['url'], dict(album)) for album in albums])
+
+    # --- Baux ----------------------------------------------------------------
+
+    def enregistrer_worker(self, worker_id):
+        maintenant = time.time()
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO workers (id, hote, pid, demarre_le, dernier_battement) VALUES (?, ?, ?, ?, ?)",
+            (worker_id, socket.gethostname(), os.getpid(), maintenant, maintenant))
+
+    def louer(self, worker_id):
+
+        # Réserve la prochaine tâche pour ce worker, None si rien n'est disponible
+        # Les baux expirés (worker planté) sont d'abord remis dans la file
+
+        def _louer(curseur):
+            maintenant = time.time()
+            curseur.execute("UPDATE taches SET etat = 'attente', worker = NULL "
+                            "WHERE etat = 'bail' AND bail_expire < ?", (maintenant,))
+            ligne = curseur.execute(f"SELECT id, type, url, donnees FROM taches WHERE etat = 'attente' "
+                                    f"ORDER BY {ORDRE_TYPES}, id LIMIT 1").fetchone()
+            if ligne is None:
+                return None
+            curseur.execute("UPDATE taches SET etat = 'bail', worker = ?, bail_expire = ? WHERE id = ?",
+                            (worker_id, maintenant + config.DUREE_BAIL, ligne[0]))
+            return {'id': ligne[0], 'type': ligne[1], 'url': ligne[2],
+                    'donnees': json.loads(ligne[3]) if ligne[3] else None}
+
+        return self._transaction(_louer)
+
+    def battement(self, worker_id):
+
+        # Prolonge les baux du worker et signale qu'il est vivant
+
+        maintenant = time.time()
+        self._transaction(lambda curseur: (
+            curseur.execute("UPDATE workers SET dernier_battement = ? WHERE id = ?", (maintenant, worker_id)),
+            curseur.execute("UPDATE taches SET bail_expire = ? WHERE etat = 'bail' AND worker = ?",
+                            (maintenant + config.DUREE_BAIL, worker_id))))
+
+    def terminer(self, tache, worker_id, resultat=None):
+
+        # Marque la tâche faite et écrit le résultat dans la même transaction
+        # Si le bail a été repris entre-temps (worker jugé mort), rien n'est écrit
+        # Retourne True si la tâche a bien été terminée par ce worker
+
+        def _terminer(curseur):
+            curseur.execute("UPDATE taches SET etat = 'fait', bail_expire = NULL "
+                            "WHERE id = ? AND etat = 'bail' AND worker = ?", (tache['id'], worker_id))
+            if curseur.rowcount == 0:
+                return False
+            if resultat is not None:
+                curseur.execute("INSERT INTO resultats (url, donnees, worker, termine_le) VALUES (?, ?, ?, ?) "
+                                "ON CONFLICT (url) DO UPDATE SET donnees = excluded.donnees, "
+                                "worker = excluded.worker, termine_le = excluded.termine_le",
+                                (resultat['url'], json.dumps(dict(resultat), ensure_ascii=False),
+                                 worker_id, time.time()))
+            curseur.execute("UPDATE workers SET pages = pages + 1 WHERE id = ?", (worker_id,))
+            return True
+
+        return self._transaction(_terminer)
+
+    def echouer(self, tache, worker_id, erreur):
+
+        # Remet la tâche dans la file, ou la classe en échec après MAX_TENTATIVES_TACHE
+
+        self._transaction(lambda curseur: curseur.execute(
+            "UPDATE taches SET tentatives = tentatives + 1, erreur = ?, worker = NULL, bail_expire = NULL, "
+            "etat = CASE WHEN tentatives + 1 >= ? THEN 'echec' ELSE 'attente' END "
+            "WHERE id = ? AND worker = ?",
+            (f"{type(erreur).__name__}: {str(erreur)[:200]}", config.MAX_TENTATIVES_TACHE,
+             tache['id'], worker_id)))
+
+    def liberer_baux(self, worker_id):
+
+        # Arrêt propre d'un worker : ses tâches en cours repartent immédiatement
+
+        self._transaction(lambda curseur: curseur.execute(
+            "UPDATE taches SET etat = 'attente', worker = NULL, bail_expire = NULL "
+            "WHERE etat = 'bail' AND worker = ?", (worker_id,)))
+
+    # --- Suivi et export -----------------------------------------------------
+
+    def travail_restant(self):
+
+        # Tâches en attente ou louées (un worker peut encore en créer d'autres)
+
+        return self.connexion.execute(
+            "SELECT COUNT(*) FROM taches WHERE etat IN ('attente', 'bail')").fetchone()[0]
+
+    def etat(self):
+        comptes = {}
+        for type_page, etat, nombre in self.connexion.execute(
+                "SELECT type, etat, COUNT(*) FROM taches GROUP BY type, etat"):
+            comptes.setdefault(type_page, {})[etat] = nombre
+        limite = time.time() - 2 * config.BATTEMENT_S
+        workers = self.connexion.execute(
+            "SELECT id, hote, pid, pages, dernier_battement >= ? FROM workers ORDER BY demarre_le",
+            (limite,)).fetchall()
+        return {
+            'taches': comptes,
+            'resultats': self.connexion.execute("SELECT COUNT(*) FROM resultats").fetchone()[0],
+            'workers': [{'id': w[0], 'hote': w[1], 'pid': w[2], 'pages': w[3], 'actif': bool(w[4])}
+                        for w in workers],
+        }
+
+    def resultats(self):
+        return [Album.depuis_dict(json.loads(donnees)) for (donnees,) in
+                self.connexion.execute("SELECT donnees FROM resultats ORDER BY rowid")]
+
+    def albums_en_echec(self):
+
+        # Albums dont la page album a épuisé ses tentatives : colonnes du catalogue seules
+
+        return [Album.depuis_dict(json.loads(donnees) if donnees else {'url': url}) for url, donnees in
+                self.connexion.execute("SELECT url, donnees FROM taches "
+                                       "WHERE type = 'album' AND etat = 'echec' ORDER BY id")]
+
+    def fermer(self):
+        self.connexion.close()
+
+# -----------------------------------------------------------------------------
+# COORDINATEUR ET WORKER
+# -----------------------------------------------------------------------------
+
+def coordonner(page_debut=1, page_fin=200, resultats_par_page=50, shards=None, chemin=None):
+
+    # Remplit la file avec les pages catalogue (éventuellement par shards)
+
+    import main
+
+    file_travail = FileTravail(chemin)
+    urls = [main.construire_url_catalogue(page, resultats_par_page, filtres)
+            for filtres in (shards or [None])
+            for page in range(page_debut, page_fin + 1)]
+    ajoutees = file_travail.ajouter_taches('catalogue', [(url, None) for url in urls])
+    print(f"✓ {ajoutees} pages catalogue ajoutées à '{file_travail.chemin}' "
+          f"({len(urls) - ajoutees} déjà présentes)")
+    file_travail.fermer()
+
+def _battre(chemin, worker_id, arret):
+
+    # Thread de battement de cœur (connexion SQLite dédiée)
+
+    file_travail = FileTravail(chemin)
+    try:
+        while not arret.wait(config.BATTEMENT_S):
+            try:
+                file_travail.battement(worker_id)
+            except sqlite3.Error as e:
+                print(f"  Battement impossible : {e}")
+    finally:
+        file_travail.fermer()
+
+def _traiter(tache, nettoyer):
+
+    # Télécharge et extrait une tâche ; retourne (albums à ajouter, résultat)
+
+    import main
+
+    if tache['type'] == 'catalogue':
+        response = main.crawl_get(tache['url'], wait_for_selector="div.card-release-title", max_retries=1)
+        return main.extraire_infos_catalogue(response.html, nettoyer), None
+
+    response = main.crawl_get(tache['url'], max_retries=1)
+    album = Album.depuis_dict(tache['donnees'] or {'url': tache['url']})
+    album.mettre_a_jour(main.extraire_infos_completes_album(response.html, tache['url'], nettoyer))
+    return [], album
+
+def lancer_worker(chemin=None, worker_id=None, nettoyer=True, taches_max=None):
+
+    # Boucle d'un worker : louer, traiter, terminer, jusqu'à épuisement de la file
+
+    chemin = chemin or config.FICHIER_FILE_TRAVAIL
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    file_travail = FileTravail(chemin)
+    file_travail.enregistrer_worker(worker_id)
+
+    arret = threading.Event()
+    threading.Thread(target=_battre, args=(chemin, worker_id, arret), daemon=True).start()
+    print(f"Worker {worker_id} démarré sur '{chemin}'")
+
+    traitees = 0
+    try:
+        while taches_max is None or traitees < taches_max:
+            tache = file_travail.louer(worker_id)
+            if tache is None:
+                # Plus rien à louer : fin, sauf si d'autres workers peuvent encore créer du travail
+                if not file_travail.travail_restant():
+                    break
+                time.sleep(config.PAUSE_FILE_VIDE)
+                continue
+
+            try:
+                albums, resultat = _traiter(tache, nettoyer)
+            except Exception as e:
+                print(f"  ✗ {tache['url']} : {type(e).__name__}")
+                file_travail.echouer(tache, worker_id, e)
+                continue
+
+            if albums:
+                ajoutes = file_travail.ajouter_albums(albums)
+                print(f"  ✓ Catalogue : {ajoutes} nouveaux albums ({len(albums) - ajoutes} déjà connus)")
+            if file_travail.terminer(tache, worker_id, resultat):
+                traitees += 1
+                if resultat is not None:
+                    print(f"  ✓ {resultat.get('artiste', '')} - {resultat.get('album', '')}")
+            else:
+                print(f"  Bail perdu pour {tache['url']} (repris par un autre worker)")
+
+            time.sleep(config.PAUSE_ALBUM if tache['type'] == 'album' else config.PAUSE_CATALOGUE)
+    finally:
+        arret.set()
+        file_travail.liberer_baux(worker_id)
+        file_travail.fermer()
+
+    print(f"Worker {worker_id} terminé : {traitees} tâches")
+    return traitees
+
+def exporter(nom_fichier='discogs_albums_final.csv', colonnes=None, chemin=None):
+    import main
+
+    # Comme le run classique, un album non enrichi reste dans le CSV (colonnes du catalogue)
+
+    file_travail = FileTravail(chemin)
+    albums = file_travail.resultats()
+    echecs = file_travail.albums_en_echec()
+    file_travail.fermer()
+    if echecs:
+        print(f"  {len(echecs)} albums en échec exportés sans enrichissement")
+    main.sauvegarder_csv_enrichi(albums + echecs, nom_fichier, colonnes)
+    return albums + echecs
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Crawl distribué sur une file de travail SQLite (une machine)")
+    parser.add_argument("--base", default=None, help=f"Fichier SQLite (défaut : {config.FICHIER_FILE_TRAVAIL})")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    coordinateur = commandes.add_parser("coordinateur", help="Ajouter les pages catalogue à la file")
+    coordinateur.add_argument("--pages", default="1-2", help="Plage de pages, ex : 1-200")
+    coordinateur.add_argument("--resultats-par-page", type=int, default=50)
+    coordinateur.add_argument("--shards", action="store_true", help="Découper par genre et décennie")
+
+    worker = commandes.add_parser("worker", help="Traiter des tâches jusqu'à épuisement de la file")
+    worker.add_argument("--id", default=None)
+    worker.add_argument("--taches-max", type=int, default=None)
+
+    commandes.add_parser("etat", help="Afficher l'avancement")
+
+    export = commandes.add_parser("exporter", help="Écrire les résultats dans un CSV")
+    export.add_argument("fichier", nargs="?", default="discogs_albums_final.csv")
+
+    args = parser.parse_args()
+
+    if args.commande == "coordinateur":
+        debut, _, fin = args.pages.partition('-')
+        shards = None
+        if args.shards:
+            from main import generer_shards, GENRES_DISCOGS, DECENNIES_DISCOGS
+            shards = generer_shards(genres=GENRES_DISCOGS, decennies=DECENNIES_DISCOGS)
+        coordonner(int(debut), int(fin or debut), args.resultats_par_page, shards, args.base)
+    elif args.commande == "worker":
+        lancer_worker(args.base, args.id, taches_max=args.taches_max)
+    elif args.commande == "etat":
+        file_travail = FileTravail(args.base)
+        print(json.dumps(file_travail.etat(), indent=2, ensure_ascii=False))
+        file_travail.fermer()
+    else:
+        exporter(args.fichier, chemin=args.base)
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import configuration as config
+from enregistrements import Album
+from extraction import extraire_infos_catalogue, extraire_infos_completes_album
+import reseau
+from pool_navigateurs import fermer_pool
+
+# -----------------------------------------------------------------------------
+# FILE DES ÉCHECS (dead-letter queue) ET REPRISE DIFFÉRÉE
+# -----------------------------------------------------------------------------
+#
+# Pendant le passage principal, une page en échec n'est plus retentée sur
+# place (pauses de 5s + 3s qui bloquent tout le run) : elle est enregistrée
+# dans un fichier JSONL persistant avec la classe de l'erreur, et le run
+# continue à pleine vitesse. Une passe de reprise, avec sa propre concurrence
+# et son propre backoff, la retente en fin de run ou lors d'un run suivant.
+#
+# Le fichier est en ajout seul : une ligne par échec, une ligne "resolu" quand
+# la reprise réussit. Il est relu au démarrage (les échecs survivent au run).
+
+class FileEchecs:
+
+    def __init__(self, chemin=None):
+        self.chemin = chemin or config.FICHIER_ECHECS
+        self._verrou = threading.Lock()
+        self.entrees = {}
+        self._charger()
+
+    def _charger(self):
+        if not os.path.exists(self.chemin):
+            return
+        with open(self.chemin, encoding='utf-8') as f:
+            for ligne in f:
+                ligne = ligne.strip()
+                if not ligne:
+                    continue
+                try:
+                    entree = json.loads(ligne)
+                except json.JSONDecodeError:
+                    # Ligne tronquée (run interrompu pendant l'écriture)
+                    continue
+                if entree.get('resolu'):
+                    self.entrees.pop(entree['url'], None)
+                else:
+                    self.entrees[entree['url']] = entree
+
+    def _ecrire(self, entree):
+        with open(self.chemin, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entree, ensure_ascii=False) + '\n')
+
+    def ajouter(self, url, type_page, erreur, album=None):
+
+        # Enregistre un échec (type_page : 'catalogue' ou 'album')
+
+        with self._verrou:
+            precedente = self.entrees.get(url, {})
+            entree = {
+                'url': url,
+                'type': type_page,
+                'classe_erreur': type(erreur).__name__,
+                'message': str(erreur)[:200],
+                'tentatives': precedente.get('tentatives', 0) + 1,
+                'horodatage': time.time(),
+            }
+            if album is not None:
+                entree['album'] = dict(album)
+            self.entrees[url] = entree
+            self._ecrire(entree)
+
+    def resoudre(self, url):
+        with self._verrou:
+            if self.entrees.pop(url, None) is not None:
+                self._ecrire({'url': url, 'resolu': True, 'horodatage': time.time()})
+
+    def en_attente(self, type_page=None):
+        with self._verrou:
+            return [e for e in self.entrees.values() if type_page is None or e['type'] == type_page]
+
+    def compacter(self):
+
+        # Réécrit le fichier avec seulement les échecs en attente
+
+        with self._verrou:
+            temporaire = self.chemin + '.tmp'
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                for entree in self.entrees.values():
+                    f.write(json.dumps(entree, ensure_ascii=False) + '\n')
+            os.replace(temporaire, self.chemin)
+
+    def resume(self):
+
+        # Nombre d'échecs en attente par classe d'erreur
+
+        comptes = {}
+        for entree in self.en_attente():
+            comptes[entree['classe_erreur']] = comptes.get(entree['classe_erreur'], 0) + 1
+        return comptes
+
+    def __len__(self):
+        return len(self.entrees)
+
+# -----------------------------------------------------------------------------
+# PASSE DE REPRISE
+# -----------------------------------------------------------------------------
+
+def _delai_backoff(tentatives):
+
+    # Backoff exponentiel avec gigue : 10s, 20s, 40s... plafonné
+
+    delai = config.REPRISE_BACKOFF_BASE * (2 ** max(tentatives - 1, 0))
+    return min(delai, config.REPRISE_BACKOFF_MAX) * random.uniform(0.8, 1.2)
+
+async def _reprendre_entree(file_echecs, entree, semaphore, nettoyer=True):
+
+    # Retente une page ; retourne (réussie, liste des albums récupérés)
+
+    await asyncio.sleep(_delai_backoff(entree['tentatives']))
+
+    # Le parsing BeautifulSoup est du CPU : dans un thread, la boucle continue les téléchargements
+    async with semaphore:
+        try:
+            if entree['type'] == 'catalogue':
+                response = await reseau.crawl_get_async(entree['url'], wait_for_selector="div.card-release-title",
+                                                        max_retries=1)
+                # Toujours nettoyé, comme l'étape 1 : le post-traitement par lot
+                # ne repasse pas sur artiste/album des pages catalogue
+                albums = await asyncio.to_thread(extraire_infos_catalogue, response.html)
+            else:
+                response = await reseau.crawl_get_async(entree['url'], max_retries=1)
+                album = Album.depuis_dict(entree.get('album') or {'url': entree['url']})
+                album.mettre_a_jour(await asyncio.to_thread(extraire_infos_completes_album,
+                                                            response.html, entree['url'], nettoyer))
+                albums = [album]
+        except Exception as e:
+            print(f"  ✗ {entree['url']} : {type(e).__name__}")
+            file_echecs.ajouter(entree['url'], entree['type'], e, entree.get('album'))
+            return False, []
+
+    file_echecs.resoudre(entree['url'])
+    print(f"  ✓ {entree['url']}")
+    return True, albums
+
+async def rejouer_echecs_async(file_echecs, concurrence=None, max_tentatives=None, nettoyer=True):
+
+    # Retente tous les échecs en attente (sauf ceux qui ont épuisé leurs tentatives)
+    # Retourne {'catalogue': [albums], 'album': [albums enrichis]}
+
+    concurrence = concurrence or config.REPRISE_CONCURRENCE
+    max_tentatives = max_tentatives or config.REPRISE_MAX_TENTATIVES
+
+    entrees = [e for e in file_echecs.en_attente() if e['tentatives'] < max_tentatives]
+    print("\n" + "="*70)
+    print(f"REPRISE DES ÉCHECS : {len(entrees)} pages ({concurrence} en parallèle)")
+    print("="*70)
+
+    semaphore = asyncio.Semaphore(concurrence)
+    resultats = await asyncio.gather(*(_reprendre_entree(file_echecs, e, semaphore, nettoyer) for e in entrees))
+
+    recuperes = {'catalogue': [], 'album': []}
+    reussies = 0
+    for entree, (reussie, albums) in zip(entrees, resultats):
+        reussies += reussie
+        recuperes[entree['type']].extend(albums)
+
+    file_echecs.compacter()
+    print(f"\n  {reussies} pages récupérées, "
+          f"{len(file_echecs)} toujours en échec {file_echecs.resume() or ''}")
+    return recuperes
+
+def rejouer_echecs(file_echecs, concurrence=None, max_tentatives=None, nettoyer=True):
+
+    # Boucle d'événements propre à la passe : ses navigateurs sont fermés avec elle
+
+    async def _rejouer():
+        try:
+            return await rejouer_echecs_async(file_echecs, concurrence, max_tentatives, nettoyer)
+        finally:
+            await fermer_pool()
+
+    return asyncio.run(_rejouer())
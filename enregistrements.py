@@ -0,0 +1,102 @@
+import sys
+
+# -----------------------------------------------------------------------------
+# ENREGISTREMENT ALBUM COMPACT
+# -----------------------------------------------------------------------------
+#
+# Un dict Python par album (17 clés) coûte cher sur 10 000 à 100 000 albums
+# gardés en mémoire pendant tout le run. Album utilise __slots__ (pas de dict
+# par instance) et interne les chaînes très répétées (artistes, labels,
+# formats, pays, genres, années) : une seule copie en mémoire par valeur.
+#
+# Album se manipule comme un dict (album['url'], album.get('label'),
+# 'note_moyenne' in album, dict(album)) : le reste du code et csv.DictWriter
+# fonctionnent sans changement.
+
+CHAMPS_ALBUM = ('artiste', 'album', 'url', 'annee', 'format', 'miniature',
+                'label', 'pays', 'date_sortie', 'genres',
+                'en_collection', 'en_wantlist', 'note_moyenne', 'nombre_notes',
+                'derniere_vente', 'prix_faible', 'prix_moyen', 'prix_eleve',
+                'master_id', 'pressages')
+
+# Champs dont les valeurs se répètent massivement d'un album à l'autre
+CHAMPS_INTERNES = frozenset(['artiste', 'annee', 'format', 'label', 'pays', 'genres'])
+
+def _interner(cle, valeur):
+    if cle in CHAMPS_INTERNES and type(valeur) is str:
+        return sys.intern(valeur)
+    return valeur
+
+class Album:
+
+    # Comme un dict : un champ jamais renseigné n'existe pas (KeyError, absent de keys())
+
+    __slots__ = CHAMPS_ALBUM
+
+    def __init__(self, valeurs=None, **kwargs):
+        if valeurs:
+            self.mettre_a_jour(valeurs)
+        if kwargs:
+            self.mettre_a_jour(kwargs)
+
+    @classmethod
+    def depuis_dict(cls, valeurs):
+
+        # Constructeur tolérant : les clés hors CHAMPS_ALBUM (ex : 'rang' de
+        # l'ordonnanceur, colonnes d'un ancien CSV) sont ignorées au lieu de lever KeyError
+
+        return cls({cle: valeur for cle, valeur in valeurs.items() if cle in CHAMPS_ALBUM})
+
+    def mettre_a_jour(self, valeurs):
+
+        # Équivalent de {**album, **valeurs}, mais en place (aucune copie)
+
+        for cle, valeur in valeurs.items():
+            self[cle] = valeur
+
+    def __getitem__(self, cle):
+        try:
+            return getattr(self, cle)
+        except (AttributeError, TypeError):
+            raise KeyError(cle) from None
+
+    def __setitem__(self, cle, valeur):
+        if cle not in CHAMPS_ALBUM:
+            raise KeyError(f"Champ inconnu : {cle}")
+        setattr(self, cle, _interner(cle, valeur))
+
+    def __contains__(self, cle):
+        return cle in CHAMPS_ALBUM and hasattr(self, cle)
+
+    def get(self, cle, defaut=None):
+        try:
+            return self[cle]
+        except KeyError:
+            return defaut
+
+    def keys(self):
+        return [cle for cle in CHAMPS_ALBUM if hasattr(self, cle)]
+
+    def items(self):
+        return [(cle, getattr(self, cle)) for cle in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, autre):
+        if isinstance(autre, (Album, dict)):
+            return dict(self.items()) == dict(autre.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Album({dict(self.items())!r})"
+
+    # Permet de sauvegarder / recharger un Album (pickle, multiprocessing)
+    def __getstate__(self):
+        return dict(self.items())
+
+    def __setstate__(self, etat):
+        self.mettre_a_jour(etat)
@@ -0,0 +1,181 @@
+import csv
+import os
+
+# -----------------------------------------------------------------------------
+# TABLES D'ENTITÉS (labels, formats, genres, pays)
+# -----------------------------------------------------------------------------
+#
+# Au lieu de répéter "Parlophone, Warner Music Group, GEM" sur chaque ligne,
+# chaque label / format / genre / pays reçoit un identifiant entier. Les
+# lignes ne contiennent que les identifiants ("3;17;42") et chaque entité
+# est écrite une seule fois dans un fichier de dimension (dim_label.csv...).
+#
+# Les index inverses (identifiant => lignes) rendent les regroupements par
+# genre ou par label immédiats, sans relire les chaînes.
+
+ENTITES = ('label', 'format', 'genres', 'pays')
+
+# Séparateur des identifiants dans une cellule du CSV
+SEPARATEUR_IDS = ';'
+
+class TableEntites:
+
+    # Table nom <=> identifiant pour une entité (identifiants à partir de 1)
+
+    def __init__(self, nom):
+        self.nom = nom
+        self.ids = {}
+        self.noms = []
+
+    def identifiant(self, valeur):
+        identifiant = self.ids.get(valeur)
+        if identifiant is None:
+            self.noms.append(valeur)
+            identifiant = len(self.noms)
+            self.ids[valeur] = identifiant
+        return identifiant
+
+    def identifiants(self, valeurs_str):
+
+        # "Rock, Pop, Rock" => (1, 2) : une valeur nettoyée peut contenir plusieurs entités
+
+        if not valeurs_str:
+            return ()
+        identifiants = []
+        for valeur in valeurs_str.split(','):
+            valeur = valeur.strip()
+            if valeur:
+                identifiant = self.identifiant(valeur)
+                if identifiant not in identifiants:
+                    identifiants.append(identifiant)
+        return tuple(identifiants)
+
+    def nom_de(self, identifiant):
+        return self.noms[identifiant - 1]
+
+    def __len__(self):
+        return len(self.noms)
+
+class EncodeurEntites:
+
+    # Encode les albums avec les tables d'entités et maintient les index inverses
+
+    def __init__(self, entites=ENTITES):
+        self.tables = {entite: TableEntites(entite) for entite in entites}
+        self.lignes = []
+        # {entite: {identifiant: [numéros de ligne]}}
+        self.index = {entite: {} for entite in entites}
+
+    def encoder(self, album):
+
+        # Ajoute un album, retourne sa ligne encodée
+        # Exemple : {'genres': 'Rock, Pop'} => {'genres_ids': (1, 2)}
+
+        numero = len(self.lignes)
+        ligne = {}
+        for cle, valeur in album.items():
+            if cle in self.tables:
+                identifiants = self.tables[cle].identifiants(valeur)
+                ligne[f"{cle}_ids"] = identifiants
+                for identifiant in identifiants:
+                    self.index[cle].setdefault(identifiant, []).append(numero)
+            else:
+                ligne[cle] = valeur
+        self.lignes.append(ligne)
+        return ligne
+
+    def encoder_tout(self, albums):
+        for album in albums:
+            self.encoder(album)
+        return self.lignes
+
+    def lignes_avec(self, entite, nom):
+
+        # Lignes ayant cette entité (ex : toutes les lignes du genre "Rock")
+
+        identifiant = self.tables[entite].ids.get(nom)
+        if identifiant is None:
+            return []
+        return [self.lignes[numero] for numero in self.index[entite].get(identifiant, [])]
+
+    def compter_par(self, entite):
+
+        # Nombre de lignes par entité, du plus fréquent au moins fréquent
+
+        table = self.tables[entite]
+        comptes = [(table.nom_de(identifiant), len(numeros))
+                   for identifiant, numeros in self.index[entite].items()]
+        return sorted(comptes, key=lambda c: c[1], reverse=True)
+
+    def decoder(self, ligne):
+
+        # Ligne encodée => album avec les noms (même format que le CSV enrichi)
+
+        album = {}
+        for cle, valeur in ligne.items():
+            entite = cle[:-len('_ids')] if cle.endswith('_ids') else None
+            if entite in self.tables:
+                album[entite] = ', '.join(self.tables[entite].nom_de(i) for i in valeur)
+            else:
+                album[cle] = valeur
+        return album
+
+# -----------------------------------------------------------------------------
+# SAUVEGARDE / CHARGEMENT
+# -----------------------------------------------------------------------------
+
+def sauvegarder_tables_entites(albums, dossier='discogs_tables', colonnes=None):
+
+    # Écrit albums.csv (identifiants) + un fichier dim_<entite>.csv par entité
+
+    if not albums:
+        return None
+
+    os.makedirs(dossier, exist_ok=True)
+    encodeur = EncodeurEntites()
+    encodeur.encoder_tout(albums)
+
+    colonnes = colonnes or list(albums[0].keys())
+    fieldnames = [f"{c}_ids" if c in encodeur.tables else c for c in colonnes]
+
+    with open(os.path.join(dossier, 'albums.csv'), 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for ligne in encodeur.lignes:
+            writer.writerow({cle: SEPARATEUR_IDS.join(map(str, valeur)) if cle.endswith('_ids') else valeur
+                             for cle, valeur in ligne.items()})
+
+    for entite, table in encodeur.tables.items():
+        with open(os.path.join(dossier, f'dim_{entite}.csv'), 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['id', 'nom'])
+            for identifiant, nom in enumerate(table.noms, 1):
+                writer.writerow([identifiant, nom])
+
+    resume = ', '.join(f"{len(t)} {e}" for e, t in encodeur.tables.items())
+    print(f"  ✓ {len(albums)} albums + tables d'entités ({resume}) dans '{dossier}/'")
+    return encodeur
+
+def charger_tables_entites(dossier='discogs_tables'):
+
+    # Recharge albums.csv et les dimensions dans un EncodeurEntites (index compris)
+
+    encodeur = EncodeurEntites()
+    for entite, table in encodeur.tables.items():
+        with open(os.path.join(dossier, f'dim_{entite}.csv'), newline='', encoding='utf-8') as csvfile:
+            for ligne in csv.DictReader(csvfile):
+                table.ids[ligne['nom']] = int(ligne['id'])
+                table.noms.append(ligne['nom'])
+
+    with open(os.path.join(dossier, 'albums.csv'), newline='', encoding='utf-8') as csvfile:
+        for numero, ligne in enumerate(csv.DictReader(csvfile)):
+            for cle, valeur in ligne.items():
+                if cle.endswith('_ids'):
+                    entite = cle[:-len('_ids')]
+                    identifiants = tuple(int(i) for i in valeur.split(SEPARATEUR_IDS) if i)
+                    ligne[cle] = identifiants
+                    for identifiant in identifiants:
+                        encodeur.index[entite].setdefault(identifiant, []).append(numero)
+            encodeur.lignes.append(ligne)
+
+    return encodeur
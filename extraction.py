@@ -0,0 +1,183 @@
+import re
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+import configuration as config
+from nettoyage import nettoyer_artiste, nettoyer_album, nettoyer_format
+from enregistrements import Album
+from schema_extraction import extracteur_album
+
+# -----------------------------------------------------------------------------
+# EXTRACTION (parsing HTML, sans dépendance au navigateur)
+# -----------------------------------------------------------------------------
+#
+# Utilisable hors ligne sur du HTML en cache : n'importe ni crawl4ai ni Playwright.
+
+def _appliquer(nettoyeur, valeur, nettoyer=True):
+    
+    # Applique la fonction de nettoyage, sauf en mode brut (nettoyage par lot ensuite)
+    
+    return nettoyeur(valeur) if nettoyer else valeur
+
+# -----------------------------------------------------------------------------
+# PAGE CATALOGUE
+# -----------------------------------------------------------------------------
+
+def _texte_carte(carte, classe):
+    
+    # Récupère le texte d'un élément de la carte du catalogue (vide si absent)
+    
+    if not carte:
+        return ""
+    element = carte.find(class_=classe)
+    return element.get_text(" ", strip=True) if element else ""
+
+def _miniature_carte(carte):
+    
+    # Récupère l'URL de la miniature de la carte (chargement différé => data-src)
+    
+    if not carte:
+        return ""
+    image = carte.find('img')
+    if not image:
+        return ""
+    return image.get('data-src') or image.get('src') or ""
+
+def extraire_infos_catalogue(html_content, nettoyer=True):
+    
+    # Extrait URLs, artistes et albums depuis la page de catalogue
+    # nettoyer=False : valeurs brutes, nettoyées ensuite par lot (post_traitement.py)
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    albums = []
+    
+    # Chercher toutes les div avec la classe card-release-title
+    titres_divs = soup.find_all('div', class_='card-release-title')
+    
+    print(f"  → {len(titres_divs)} albums trouvés")
+    
+    for titre_div in titres_divs:
+        try:
+            # Extraire le lien et le titre de l'album
+            lien_titre = titre_div.find('a', class_='search_result_title')
+            if not lien_titre:
+                continue
+            
+            # Récupérer le titre de l'album
+            album = lien_titre.get('title', lien_titre.get_text(strip=True))
+            
+            # Récupérer le href et construire l'URL complète
+            href = lien_titre.get('href', '')
+            if not href:
+                continue
+            url_album = f"{config.URL_DISCOGS}{href}"
+            
+            # Trouver la div de l'artiste (juste après)
+            artiste_div = titre_div.find_next_sibling('div', class_='card-artist-name')
+            
+            if artiste_div:
+                # Chercher le lien de l'artiste
+                lien_artiste = artiste_div.find('a')
+                if lien_artiste:
+                    artiste = lien_artiste.get('title', lien_artiste.get_text(strip=True))
+                else:
+                    # Si pas de lien, prendre le texte du span
+                    span = artiste_div.find('span')
+                    artiste = span.get('title', span.get_text(strip=True)) if span else "Inconnu"
+            else:
+                artiste = "Inconnu"
+            
+            # Infos supplémentaires déjà présentes sur la carte (année, format, miniature)
+            carte = titre_div.parent
+            annee = re.search(r'\d{4}', _texte_carte(carte, 'card-release-year'))
+            
+            # Ajouter à la liste avec nettoyage
+            albums.append(Album({
+                'artiste': _appliquer(nettoyer_artiste, artiste.strip(), nettoyer),
+                'album': _appliquer(nettoyer_album, album.strip(), nettoyer),
+                'url': url_album,
+                'annee': annee.group(0) if annee else '',
+                'format': _appliquer(nettoyer_format, _texte_carte(carte, 'card-release-format'), nettoyer),
+                'miniature': _miniature_carte(carte)
+            }))
+        
+        except Exception as e:
+            continue
+    
+    return albums
+
+# -----------------------------------------------------------------------------
+# PAGE ALBUM
+# -----------------------------------------------------------------------------
+
+def extraire_infos_completes_album(html_content, url, nettoyer=True):
+    
+    # Extrait TOUTES les informations de la page album avec nettoyage AMÉLIORÉ
+    # nettoyer=False : valeurs brutes, nettoyées ensuite par lot (post_traitement.py)
+    # Champs, sélecteurs et libellés : schema_album.json, compilé une fois (schema_extraction.py)
+    
+    return extracteur_album().extraire(html_content, url, nettoyer)
+
+# -----------------------------------------------------------------------------
+# PAGES DISCOGRAPHIE (artiste, label, master)
+# -----------------------------------------------------------------------------
+
+# Type d'une page d'après son chemin : /release/123-Titre, /fr/artist/45-Nom...
+RE_CHEMIN_DISCOGS = re.compile(r'^(?:/[a-z]{2})?/(release|master|artist|label)/(\d+)')
+RE_NUMERO_PAGE = re.compile(r'[?&]page=(\d+)')
+
+def analyser_url_discogs(url):
+
+    # (type, identifiant, numéro de page) ou None pour une URL hors discographie
+    # "/artist/45-Nom?page=2" => ('artist', '45', 2)
+
+    parsed = urlparse(url)
+    match = RE_CHEMIN_DISCOGS.match(parsed.path)
+    if not match:
+        return None
+    numero = RE_NUMERO_PAGE.search('?' + parsed.query) if parsed.query else None
+    return match.group(1), match.group(2), int(numero.group(1)) if numero else 1
+
+def extraire_liens_discographie(html_content, url):
+    
+    # Liens d'une page artiste / label / master / release, par type :
+    # {'release': [...], 'master': [...], 'artist': [...], 'label': [...], 'page': [...]}
+    # 'page' : pages suivantes du MÊME listing (même chemin, ?page=N)
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    liens = {'release': [], 'master': [], 'artist': [], 'label': [], 'page': []}
+    page_courante = analyser_url_discogs(url)
+    
+    for lien in soup.find_all('a', href=True):
+        url_lien = urljoin(url, lien['href'])
+        cible = analyser_url_discogs(url_lien)
+        if cible is None:
+            continue
+        
+        # Pagination du listing courant
+        if page_courante and cible[:2] == page_courante[:2]:
+            if cible[2] != page_courante[2] and url_lien not in liens['page']:
+                liens['page'].append(url_lien)
+            continue
+        
+        if url_lien not in liens[cible[0]]:
+            liens[cible[0]].append(url_lien)
+    
+    return liens
+
+def extraire_titre_release(html_content, nettoyer=True):
+    
+    # (artiste, album) depuis le titre de la page release : "Artiste – Album"
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    titre = soup.find('h1')
+    if not titre:
+        return "Inconnu", ""
+    
+    texte = titre.get_text(" ", strip=True)
+    artiste, separateur, album = texte.partition(' – ')
+    if not separateur:
+        artiste, album = "Inconnu", texte
+    return (_appliquer(nettoyer_artiste, artiste.strip(), nettoyer),
+            _appliquer(nettoyer_album, album.strip(), nettoyer))
@@ -0,0 +1,251 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+from extraction import analyser_url_discogs
+
+# -----------------------------------------------------------------------------
+# ENSEMBLE COMPACT DES PAGES DÉJÀ VUES (bitmap d'identifiants + filtre de Bloom)
+# -----------------------------------------------------------------------------
+#
+# Au-delà du top 10 000, garder chaque URL vue sous forme de chaîne Python
+# (~100 octets par URL dans un set) ne tient plus en mémoire. Les pages
+# Discogs sont identifiées par un entier (/release/1234-Titre) :
+#   - bitmap par type de page (release, master, artist, label) : 1 bit par
+#     identifiant possible, exact (aucun faux positif), ~4 Mo pour 35 millions
+#     d'identifiants de releases
+#   - filtre de Bloom pour le reste (pages 2+ des listings, URLs sans
+#     identifiant) : taille fixe, taux de faux positifs choisi à la création
+# Les bits sont dans des fichiers projetés en mémoire (mmap) : l'ensemble est
+# repris tel quel au run suivant, sans rien recharger.
+
+MAGIQUE_BITMAP = b'DGBITMAP'
+MAGIQUE_BLOOM = b'DGBLOOM1'
+
+# Magique, nombre d'éléments ajoutés, taille en bits, nombre de hachages
+ENTETE = struct.Struct('<8sQQQ')
+
+TYPES_BITMAP = ('release', 'master', 'artist', 'label')
+
+class _TableauBits:
+
+    # Tableau de bits précédé d'un en-tête, dans un fichier mmap (ou en mémoire si chemin=None)
+
+    def __init__(self, chemin, magique, taille_bits, hachages=0):
+        self.chemin = chemin
+        self.magique = magique
+        self._fichier = None
+
+        if chemin and os.path.exists(chemin) and os.path.getsize(chemin) >= ENTETE.size:
+            with open(chemin, 'rb') as f:
+                magique_lue, nombre, taille_bits, hachages = ENTETE.unpack(f.read(ENTETE.size))
+            if magique_lue != magique:
+                raise ValueError(f"{chemin} n'est pas un fichier {magique.decode()}")
+            self._projeter(taille_bits)
+        else:
+            nombre = 0
+            self._projeter(taille_bits)
+
+        self.nombre = nombre
+        self.taille_bits = taille_bits
+        self.hachages = hachages
+        self._ecrire_entete()
+
+    def _projeter(self, taille_bits):
+        taille = ENTETE.size + (taille_bits + 7) // 8
+        if self.chemin is None:
+            ancien = getattr(self, 'bits', None)
+            self.bits = bytearray(taille)
+            if ancien is not None:
+                self.bits[:len(ancien)] = ancien
+            return
+        if self._fichier is not None:
+            self.bits.flush()
+            self.bits.close()
+            self._fichier.close()
+        mode = 'r+b' if os.path.exists(self.chemin) else 'w+b'
+        self._fichier = open(self.chemin, mode)
+        if os.path.getsize(self.chemin) < taille:
+            self._fichier.truncate(taille)
+        self.bits = mmap.mmap(self._fichier.fileno(), taille)
+
+    def _ecrire_entete(self):
+        ENTETE.pack_into(self.bits, 0, self.magique, self.nombre, self.taille_bits, self.hachages)
+
+    def _tester(self, position):
+        return self.bits[ENTETE.size + (position >> 3)] >> (position & 7) & 1
+
+    def _activer(self, position):
+        octet = ENTETE.size + (position >> 3)
+        self.bits[octet] |= 1 << (position & 7)
+
+    def octets(self):
+        return len(self.bits)
+
+    def __len__(self):
+        return self.nombre
+
+    def synchroniser(self):
+        self._ecrire_entete()
+        if self._fichier is not None:
+            self.bits.flush()
+
+    def fermer(self):
+        self.synchroniser()
+        if self._fichier is not None:
+            self.bits.close()
+            self._fichier.close()
+            self._fichier = None
+
+class BitmapIds(_TableauBits):
+
+    # Ensemble exact d'identifiants entiers : 1 bit par identifiant, agrandi au besoin
+
+    def __init__(self, chemin=None, capacite=1 << 20):
+        super().__init__(chemin, MAGIQUE_BITMAP, capacite)
+
+    def ajouter(self, identifiant):
+
+        # True si l'identifiant est nouveau
+
+        if identifiant >= self.taille_bits:
+            # Doublement : nombre d'agrandissements logarithmique
+            nouvelle_taille = max(self.taille_bits * 2, identifiant + 1)
+            self._projeter(nouvelle_taille)
+            self.taille_bits = nouvelle_taille
+            self._ecrire_entete()
+        if self._tester(identifiant):
+            return False
+        self._activer(identifiant)
+        self.nombre += 1
+        self._ecrire_entete()
+        return True
+
+    def __contains__(self, identifiant):
+        return identifiant < self.taille_bits and bool(self._tester(identifiant))
+
+class FiltreBloom(_TableauBits):
+
+    # Ensemble approché de chaînes : jamais de faux négatif, faux positifs au taux choisi
+
+    def __init__(self, chemin=None, capacite=1_000_000, taux_faux_positifs=0.001):
+        taille_bits, hachages = self.dimensionner(capacite, taux_faux_positifs)
+        super().__init__(chemin, MAGIQUE_BLOOM, taille_bits, hachages)
+
+    @staticmethod
+    def dimensionner(capacite, taux_faux_positifs):
+
+        # m = -n ln(p) / ln(2)², k = m/n ln(2)
+        # Positions sur 32 bits : au plus 2³² bits (512 Mo), et 16 hachages (empreinte de 64 octets)
+
+        taille_bits = math.ceil(-capacite * math.log(taux_faux_positifs) / math.log(2) ** 2)
+        if taille_bits > 1 << 32:
+            raise ValueError(f"Filtre de Bloom trop grand ({taille_bits} bits) : réduire la capacité")
+        hachages = min(16, max(1, round(taille_bits / capacite * math.log(2))))
+        return taille_bits, hachages
+
+    def _positions(self, cle):
+
+        # k positions lues dans une seule empreinte blake2b de 4 x k octets (k <= 16)
+
+        empreinte = hashlib.blake2b(cle.encode('utf-8'), digest_size=4 * self.hachages).digest()
+        taille = self.taille_bits
+        return [valeur % taille for valeur in memoryview(empreinte).cast('I')]
+
+    def ajouter(self, cle):
+
+        # True si la clé n'était (probablement) pas encore présente
+        # Un seul passage : chaque octet est lu une fois et réécrit seulement si un bit manque
+
+        bits = self.bits
+        nouvelle = False
+        for position in self._positions(cle):
+            octet = ENTETE.size + (position >> 3)
+            masque = 1 << (position & 7)
+            valeur = bits[octet]
+            if not valeur & masque:
+                bits[octet] = valeur | masque
+                nouvelle = True
+        if nouvelle:
+            self.nombre += 1
+            self._ecrire_entete()
+        return nouvelle
+
+    def __contains__(self, cle):
+        return all(self._tester(p) for p in self._positions(cle))
+
+    def taux_theorique(self):
+
+        # Taux de faux positifs attendu avec le nombre d'éléments actuel
+
+        return (1 - math.exp(-self.hachages * self.nombre / self.taille_bits)) ** self.hachages
+
+class EnsembleVus:
+
+    # Pages déjà vues : bitmap exact pour /type/identifiant, Bloom pour le reste
+    # dossier=None : en mémoire seulement (pas de persistance)
+    # exact=True : le Bloom n'est plus qu'un pré-filtre, chaque réponse « déjà vue »
+    #   est confirmée dans un set des clés hors bitmap (en mémoire, run courant) ;
+    #   pour les dédoublonnages où un faux positif perdrait silencieusement une ligne
+
+    def __init__(self, dossier=None, capacite_bloom=1_000_000, taux_faux_positifs=0.001, exact=False):
+        self.dossier = dossier
+        self.exactes = set() if exact else None
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self.bitmaps = {type_page: BitmapIds(self._chemin(f'vus_{type_page}.bits'))
+                        for type_page in TYPES_BITMAP}
+        self.bloom = FiltreBloom(self._chemin('vus_autres.bloom'), capacite_bloom, taux_faux_positifs)
+
+    def _chemin(self, nom):
+        return os.path.join(self.dossier, nom) if self.dossier else None
+
+    def _cible(self, cle):
+
+        # (bitmap, identifiant) pour une page /type/identifiant, (None, clé) sinon
+
+        if isinstance(cle, str):
+            cle = analyser_url_discogs(cle) or cle
+        if isinstance(cle, tuple):
+            type_page, identifiant, page = cle
+            if page == 1 and type_page in self.bitmaps:
+                return self.bitmaps[type_page], int(identifiant)
+            return None, f"{type_page}/{identifiant}?page={page}"
+        return None, cle
+
+    def ajouter(self, cle):
+
+        # cle : URL ou (type, identifiant, page) ; True si la page n'a jamais été vue
+
+        bitmap, valeur = self._cible(cle)
+        if bitmap is not None:
+            return bitmap.ajouter(valeur)
+        nouvelle = self.bloom.ajouter(valeur)
+        if self.exactes is None:
+            return nouvelle
+        # Bloom négatif : sûrement nouvelle, sinon vérification exacte
+        if not nouvelle and valeur in self.exactes:
+            return False
+        self.exactes.add(valeur)
+        return True
+
+    def __contains__(self, cle):
+        bitmap, valeur = self._cible(cle)
+        if bitmap is not None:
+            return valeur in bitmap
+        if self.exactes is None:
+            return valeur in self.bloom
+        return valeur in self.bloom and valeur in self.exactes
+
+    def __len__(self):
+        return sum(len(bitmap) for bitmap in self.bitmaps.values()) + len(self.bloom)
+
+    def octets(self):
+        return sum(bitmap.octets() for bitmap in self.bitmaps.values()) + self.bloom.octets()
+
+    def fermer(self):
+        for bitmap in self.bitmaps.values():
+            bitmap.fermer()
+        self.bloom.fermer()
@@ -0,0 +1,243 @@
+import sqlite3
+import time
+
+import configuration as config
+
+# -----------------------------------------------------------------------------
+# HISTORIQUE DES STATISTIQUES (relevés successifs, encodés en delta)
+# -----------------------------------------------------------------------------
+#
+# discogs_albums_final.csv est écrasé à chaque run : l'historique des
+# collections, wantlists, notes et prix est perdu. Chaque run ajoute ici un
+# relevé, mais seules les valeurs qui ont CHANGÉ depuis le relevé précédent
+# sont écrites (une valeur reste valable jusqu'au changement suivant).
+#
+# Table valeurs : clé primaire (release, métrique, relevé) sans rowid, donc
+# rangée physiquement par release puis métrique => la série d'une release est
+# lue d'un seul bloc. Un index (métrique, relevé) sert les requêtes par métrique.
+# La table dernieres garde la dernière valeur connue pour calculer les deltas
+# sans relire l'historique. La table visites garde la date de la dernière
+# visite de chaque page album (ancienneté de l'ordonnancement).
+
+METRIQUES = ('en_collection', 'en_wantlist', 'note_moyenne', 'nombre_notes',
+             'prix_faible', 'prix_moyen', 'prix_eleve')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS metriques (id INTEGER PRIMARY KEY, nom TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS releves (id INTEGER PRIMARY KEY, horodatage REAL NOT NULL, nom TEXT);
+CREATE TABLE IF NOT EXISTS valeurs (
+    release_id INTEGER NOT NULL,
+    metrique_id INTEGER NOT NULL,
+    releve_id INTEGER NOT NULL,
+    valeur REAL NOT NULL,
+    PRIMARY KEY (release_id, metrique_id, releve_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS valeurs_par_metrique ON valeurs (metrique_id, releve_id);
+CREATE TABLE IF NOT EXISTS dernieres (
+    release_id INTEGER NOT NULL,
+    metrique_id INTEGER NOT NULL,
+    valeur REAL NOT NULL,
+    PRIMARY KEY (release_id, metrique_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS visites (release_id INTEGER PRIMARY KEY, horodatage REAL NOT NULL);
+"""
+
+def en_nombre(texte):
+
+    # Valeur nettoyée ("76309", "4.46", "12.50") => float, None si absente ou illisible
+
+    if texte is None or texte == '':
+        return None
+    if isinstance(texte, (int, float)):
+        return float(texte)
+    texte = str(texte).strip().replace(',', '.')
+    # "1.234.00" (séparateur de milliers devenu point) : seul le dernier point est décimal
+    if texte.count('.') > 1:
+        entier, _, decimales = texte.rpartition('.')
+        texte = entier.replace('.', '') + '.' + decimales
+    try:
+        return float(texte)
+    except ValueError:
+        return None
+
+class HistoriqueStats:
+
+    def __init__(self, chemin=None):
+        self.chemin = chemin or config.FICHIER_HISTORIQUE
+        self.connexion = sqlite3.connect(self.chemin)
+        self.connexion.executescript(SCHEMA)
+        self.connexion.executemany("INSERT OR IGNORE INTO metriques (nom) VALUES (?)",
+                                   [(m,) for m in METRIQUES])
+        self.connexion.commit()
+        self.metriques = dict(self.connexion.execute("SELECT nom, id FROM metriques"))
+
+    def _ids_releases(self, urls):
+
+        # {url: id}, en créant les releases inconnues
+
+        urls = list(urls)
+        self.connexion.executemany("INSERT OR IGNORE INTO releases (url) VALUES (?)", [(u,) for u in urls])
+        ids = {}
+        for debut in range(0, len(urls), 500):
+            lot = urls[debut:debut + 500]
+            requete = f"SELECT url, id FROM releases WHERE url IN ({','.join('?' * len(lot))})"
+            ids.update(self.connexion.execute(requete, lot))
+        return ids
+
+    def enregistrer_releve(self, albums, horodatage=None, nom=None):
+
+        # Ajoute un relevé ; n'écrit que les valeurs nouvelles ou modifiées
+        # Retourne {'ecrites': n, 'inchangees': n, 'absentes': n}
+
+        horodatage = horodatage or time.time()
+        comptes = {'ecrites': 0, 'inchangees': 0, 'absentes': 0}
+
+        with self.connexion:
+            releve_id = self.connexion.execute("INSERT INTO releves (horodatage, nom) VALUES (?, ?)",
+                                               (horodatage, nom)).lastrowid
+            ids = self._ids_releases(album['url'] for album in albums)
+            dernieres = {(r, m): v for r, m, v in self.connexion.execute(
+                "SELECT release_id, metrique_id, valeur FROM dernieres")}
+
+            nouvelles = []
+            visitees = []
+            for album in albums:
+                release_id = ids[album['url']]
+                visitee = False
+                for metrique, metrique_id in self.metriques.items():
+                    valeur = en_nombre(album.get(metrique))
+                    if valeur is None:
+                        # Absente de ce run (page non visitée, pas de vente) : pas un changement
+                        comptes['absentes'] += 1
+                        continue
+                    visitee = True
+                    if dernieres.get((release_id, metrique_id)) == valeur:
+                        comptes['inchangees'] += 1
+                    else:
+                        nouvelles.append((release_id, metrique_id, valeur))
+                        dernieres[(release_id, metrique_id)] = valeur
+                # Au moins une statistique lue : la page album a été visitée pendant ce run
+                if visitee:
+                    visitees.append((release_id, horodatage))
+
+            self.connexion.executemany("INSERT INTO valeurs (release_id, metrique_id, releve_id, valeur) "
+                                       "VALUES (?, ?, ?, ?)", [(r, m, releve_id, v) for r, m, v in nouvelles])
+            self.connexion.executemany("INSERT OR REPLACE INTO dernieres (release_id, metrique_id, valeur) "
+                                       "VALUES (?, ?, ?)", nouvelles)
+            self.connexion.executemany("INSERT OR REPLACE INTO visites (release_id, horodatage) "
+                                       "VALUES (?, ?)", visitees)
+            comptes['ecrites'] = len(nouvelles)
+
+        return comptes
+
+    # --- Requêtes ------------------------------------------------------------
+
+    def serie(self, url, metrique, debut=None, fin=None):
+
+        # [(horodatage, valeur)] des changements d'une métrique pour une release
+        # La valeur en vigueur au début de l'intervalle est incluse comme premier point
+
+        ligne = self.connexion.execute("SELECT id FROM releases WHERE url = ?", (url,)).fetchone()
+        if ligne is None:
+            return []
+        points = self.connexion.execute(
+            "SELECT r.horodatage, v.valeur FROM valeurs v JOIN releves r ON r.id = v.releve_id "
+            "WHERE v.release_id = ? AND v.metrique_id = ? ORDER BY v.releve_id",
+            (ligne[0], self.metriques[metrique])).fetchall()
+        return _restreindre(points, debut, fin)
+
+    def series_release(self, url, debut=None, fin=None):
+
+        # {métrique: [(horodatage, valeur)]} pour toutes les métriques d'une release
+
+        return {metrique: self.serie(url, metrique, debut, fin) for metrique in self.metriques}
+
+    def valeurs_a(self, metrique, horodatage=None):
+
+        # {url: valeur en vigueur à cette date} pour toutes les releases
+
+        horodatage = horodatage or time.time()
+        requete = ("SELECT rel.url, v.valeur FROM valeurs v "
+                   "JOIN releves r ON r.id = v.releve_id "
+                   "JOIN releases rel ON rel.id = v.release_id "
+                   "WHERE v.metrique_id = ? AND r.horodatage <= ? ORDER BY v.releve_id")
+        # Parcours par l'index (métrique, relevé) : la dernière valeur écrase les précédentes
+        return dict(self.connexion.execute(requete, (self.metriques[metrique], horodatage)))
+
+    def variations(self, metrique, debut, fin=None, limite=20):
+
+        # Plus fortes hausses d'une métrique entre deux dates : [(url, avant, après, écart)]
+
+        avant = self.valeurs_a(metrique, debut)
+        apres = self.valeurs_a(metrique, fin)
+        ecarts = [(url, avant[url], valeur, valeur - avant[url])
+                  for url, valeur in apres.items() if url in avant and valeur != avant[url]]
+        return sorted(ecarts, key=lambda e: e[3], reverse=True)[:limite]
+
+    def dernieres_visites(self):
+
+        # {url: date de la dernière visite de sa page album}
+
+        return dict(self.connexion.execute(
+            "SELECT rel.url, v.horodatage FROM visites v JOIN releases rel ON rel.id = v.release_id"))
+
+    def releves(self):
+        return self.connexion.execute("SELECT id, horodatage, nom FROM releves ORDER BY id").fetchall()
+
+    def fermer(self):
+        self.connexion.close()
+
+def _restreindre(points, debut=None, fin=None):
+
+    # Garde les points de [debut, fin], précédés de la valeur en vigueur à debut
+
+    if debut is None and fin is None:
+        return points
+    resultat = []
+    en_vigueur = None
+    for horodatage, valeur in points:
+        if debut is not None and horodatage < debut:
+            en_vigueur = (debut, valeur)
+            continue
+        if fin is not None and horodatage > fin:
+            break
+        resultat.append((horodatage, valeur))
+    if en_vigueur and (not resultat or resultat[0][0] > debut):
+        resultat.insert(0, en_vigueur)
+    return resultat
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Historique des statistiques Discogs")
+    parser.add_argument("--base", default=None, help=f"Fichier SQLite (défaut : {config.FICHIER_HISTORIQUE})")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    commande_serie = commandes.add_parser("serie", help="Évolution d'une release")
+    commande_serie.add_argument("url")
+    commande_serie.add_argument("metrique", nargs="?", choices=METRIQUES)
+
+    commande_variations = commandes.add_parser("variations", help="Plus fortes hausses d'une métrique")
+    commande_variations.add_argument("metrique", choices=METRIQUES)
+    commande_variations.add_argument("--jours", type=float, default=30)
+    commande_variations.add_argument("--limite", type=int, default=20)
+
+    args = parser.parse_args()
+    historique = HistoriqueStats(args.base)
+
+    def _date(horodatage):
+        return datetime.fromtimestamp(horodatage).strftime('%d/%m/%Y %H:%M')
+
+    if args.commande == "serie":
+        metriques = [args.metrique] if args.metrique else METRIQUES
+        for metrique in metriques:
+            points = historique.serie(args.url, metrique)
+            print(f"{metrique:15s} " + " → ".join(f"{v:g} ({_date(h)})" for h, v in points))
+    else:
+        debut = time.time() - args.jours * 86400
+        for url, avant, apres, ecart in historique.variations(args.metrique, debut, limite=args.limite):
+            print(f"{ecart:+10g}  {avant:g} → {apres:g}  {url}")
+
+    historique.fermer()
@@ -0,0 +1,103 @@
+import threading
+from collections import deque
+
+import configuration as config
+
+# -----------------------------------------------------------------------------
+# LATENCES OBSERVÉES, TIMEOUTS ADAPTATIFS ET RELANCES (HEDGING)
+# -----------------------------------------------------------------------------
+#
+# Avec un timeout fixe de 30s, une page bloquée immobilise un worker 30s alors
+# que les pages normales répondent en 2-3s. Les latences récentes sont gardées
+# par type de page ('catalogue', 'album') :
+#   - timeout = p99 x LATENCE_MARGE, borné entre TIMEOUT_MIN_MS et PAGE_TIMEOUT_MS
+#   - relance : si une page n'a pas répondu au bout du p95, une seconde tentative
+#     part en parallèle et la première bonne réponse est gardée
+
+def percentile(valeurs_triees, p):
+    if not valeurs_triees:
+        return 0.0
+    rang = (len(valeurs_triees) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * (rang - bas)
+
+class SuiviLatences:
+
+    def __init__(self, taille_fenetre=500):
+        self._verrou = threading.Lock()
+        self.taille_fenetre = taille_fenetre
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        with self._verrou:
+            # {type_page: deque des dernières durées en secondes}
+            self.durees = {}
+            # {type_page: {'timeouts': n, 'relances': n, 'relances_gagnantes': n}}
+            self.compteurs = {}
+
+    def enregistrer(self, type_page, secondes):
+        with self._verrou:
+            if type_page not in self.durees:
+                self.durees[type_page] = deque(maxlen=self.taille_fenetre)
+            self.durees[type_page].append(secondes)
+
+    def compter(self, type_page, evenement):
+        with self._verrou:
+            compteurs = self.compteurs.setdefault(type_page, {})
+            compteurs[evenement] = compteurs.get(evenement, 0) + 1
+
+    def _percentile(self, type_page, p):
+
+        # Percentile des durées récentes, None tant qu'il y a trop peu d'échantillons
+
+        with self._verrou:
+            durees = sorted(self.durees.get(type_page, ()))
+        if len(durees) < config.LATENCE_MIN_ECHANTILLONS:
+            return None
+        return percentile(durees, p)
+
+    def timeout_s(self, type_page):
+
+        # Durée maximale d'un chargement (délai avant HTML compris)
+
+        plafond = config.PAGE_TIMEOUT_MS / 1000 + config.DELAI_AVANT_HTML
+        if not config.TIMEOUTS_ADAPTATIFS:
+            return plafond
+        p99 = self._percentile(type_page, 99)
+        if p99 is None:
+            return plafond
+        plancher = config.TIMEOUT_MIN_MS / 1000 + config.DELAI_AVANT_HTML
+        return min(plafond, max(plancher, p99 * config.LATENCE_MARGE))
+
+    def delai_relance(self, type_page):
+
+        # Délai avant la relance (p95), None si le hedging est désactivé ou pas encore calibré
+
+        if not config.HEDGING:
+            return None
+        return self._percentile(type_page, 95)
+
+    def rapport(self):
+
+        # Latences de queue par type de page (secondes) + timeouts et relances
+
+        with self._verrou:
+            copie = {type_page: sorted(durees) for type_page, durees in self.durees.items()}
+            compteurs = {type_page: dict(c) for type_page, c in self.compteurs.items()}
+        rapport = {}
+        for type_page in sorted(set(copie) | set(compteurs)):
+            durees = copie.get(type_page, [])
+            rapport[type_page] = {
+                'pages': len(durees),
+                'p50': round(percentile(durees, 50), 3),
+                'p95': round(percentile(durees, 95), 3),
+                'p99': round(percentile(durees, 99), 3),
+                'max': round(durees[-1], 3) if durees else 0.0,
+                'timeout_s': round(self.timeout_s(type_page), 2),
+                **compteurs.get(type_page, {}),
+            }
+        return rapport
+
+# Instance partagée par tout le processus
+suivi_latences = SuiviLatences()
@@ -1,430 +1,157 @@
-import asyncio
-from crawl4ai import AsyncWebCrawler
-from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
-from bs4 import BeautifulSoup
 import time
 import csv
-import html
-import re
+import sys
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 
-# -----------------------------------------------------------------------------
-# CODE DE BASE AVEC SYSTÈME DE RETRY
-# -----------------------------------------------------------------------------
-
-def crawl_get(url: str, wait_for_selector: str = "body", max_retries: int = 3):
-    
-    # Fonction de crawling avec retry simple en cas d'erreur
-    
-    async def _run():
-        for tentative in range(max_retries):
-            try:
-                browser_config = BrowserConfig(
-                    headless=True,
-                    verbose=False
-                )
-                
-                crawler_config = CrawlerRunConfig(
-                    wait_for=wait_for_selector,
-                    delay_before_return_html=3.0,
-                    page_timeout=30000
-                )
-                
-                async with AsyncWebCrawler(config=browser_config) as crawler:
-                    result = await crawler.arun(url=url, config=crawler_config)
-                    
-                    # Vérifier que le contenu est valide
-                    if result and result.html and len(result.html) > 500:
-                        return result
-                    else:
-                        raise Exception("Contenu invalide ou vide")
-            
-            except Exception as e:
-                print(f"    Tentative {tentative + 1}/{max_retries} échouée: {str(e)[:60]}...")
-                
-                # Si c'est la dernière tentative, on lève l'erreur
-                if tentative == max_retries - 1:
-                    print(f"    Échec définitif après {max_retries} tentatives")
-                    raise e
-                
-                # Sinon on attend et on réessaye
-                print(f"    Attente 5s avant nouvelle tentative...")
-                await asyncio.sleep(5)
-        
-        return None
-    
-    return asyncio.run(_run())
+import configuration as config
+from reseau import crawl_get, crawl_get_async
+from extraction import extraire_infos_catalogue, extraire_infos_completes_album
+from enregistrements import Album
+from echecs import FileEchecs, rejouer_echecs
+from disjoncteur import disjoncteur
+from pool_navigateurs import statistiques_pools
+from latences import suivi_latences
+from ordonnancement import Ordonnanceur, dernieres_visites_depuis_historique, champs_vides_depuis_csv
+from cache_pages import CachePages, charger_infos_album
+from frontiere import EnsembleVus
 
 # -----------------------------------------------------------------------------
-# NETTOYAGE DES DONNÉES
+# PLANIFICATION DES COLONNES
 # -----------------------------------------------------------------------------
 
-def nettoyer_artiste(artiste):
-    
-    #Nettoie le nom de l'artiste en supprimant les numéros entre parenthèses
-    #Exemple : Justice (3) devient Justice
-   
-    if not artiste:
-        return artiste
-    
-    # Décoder les entités HTML d'abord
-    artiste = html.unescape(artiste)
-    
-    # Supprimer les guillemets indésirables
-    artiste = artiste.replace('"', '').replace('"', '').replace('"', '')
-    
-    # Supprimer les patterns comme (3), (12), etc. à la fin
-    artiste = re.sub(r'\s*\(\d+\)$', '', artiste)
-    
-    return artiste.strip()
+# Colonnes de base (toujours présentes)
+COLONNES_BASE = ['artiste', 'album', 'url']
 
-def nettoyer_album(album):
-    
-    # Nettoie le titre de l'album en décodant les entités HTML
-    # Exemple : She&#39;s So Unusual devient She's So Unusual
-    
-    if not album:
-        return album
-    
-    # Décoder les entités HTML
-    album = html.unescape(album)
-    
-    # Supprimer les guillemets indésirables (mais garder les apostrophes)
-    album = album.replace('"', '').replace('"', '').replace('"', '')
-    
-    # Nettoyer les doubles espaces
-    album = re.sub(r'\s+', ' ', album)
-    
-    return album.strip()
+# Colonnes disponibles directement sur les cartes du catalogue (étape 1)
+COLONNES_CATALOGUE = ['artiste', 'album', 'url', 'annee', 'format', 'miniature']
 
-def nettoyer_label(label_str):
-    
-    # Nettoie les labels en limitant à 3 principaux, supprimant les doublons 
-    # ET en retirant les numéros entre parenthèses
-    # Exemple : "Parlophone, Warner Music Group, GEM (6)" => "Parlophone, Warner Music Group, GEM"
-    
-    if not label_str:
-        return ""
-    
-    # Séparer les labels
-    labels = [l.strip() for l in label_str.split(',')]
-    
-    # Nettoyer chaque label individuellement
-    labels_nettoyes = []
-    for label in labels:
-        if label:
-            # Supprimer les numéros entre parenthèses à la fin : (6), (12), etc.
-            label_propre = re.sub(r'\s*\(\d+\)$', '', label.strip())
-            
-            # Ajouter seulement si pas déjà présent (supprimer doublons)
-            if label_propre and label_propre not in labels_nettoyes:
-                labels_nettoyes.append(label_propre)
-    
-    # Limiter à 3 labels principaux
-    return ', '.join(labels_nettoyes[:3])
+# Colonnes qui nécessitent la visite de la page album (étape 2)
+COLONNES_PAGE_ALBUM = ['label', 'pays', 'date_sortie', 'genres',
+                       'en_collection', 'en_wantlist', 'note_moyenne', 'nombre_notes',
+                       'derniere_vente', 'prix_faible', 'prix_moyen', 'prix_eleve']
 
-def nettoyer_format(format_str):
-    
-    # Nettoie les formats en supprimant "Tout format" et les doublons
-    
-    if not format_str:
-        return ""
-    
-    # Séparer les formats
-    formats = [f.strip() for f in format_str.split(',')]
-    
-    # Supprimer "Tout format" et les doublons
-    formats_clean = []
-    for fmt in formats:
-        if fmt and fmt != "Tout format" and fmt not in formats_clean:
-            formats_clean.append(fmt)
-    
-    return ', '.join(formats_clean)
+# Ordre complet des colonnes du CSV enrichi
+COLONNES_ENRICHIES = ['artiste', 'album', 'url',
+                      'label', 'format', 'pays', 'date_sortie', 'annee', 'genres',
+                      'en_collection', 'en_wantlist', 'note_moyenne', 'nombre_notes',
+                      'derniere_vente', 'prix_faible', 'prix_moyen', 'prix_eleve']
 
-def nettoyer_genres(genres_str):
-    
-    # Nettoie les genres en supprimant les doublons ET les "&" 
-    # SAUF pour "Stage & Screen" qui est un genre spécifique
-    # Exemples :
-    # - "Pop, Folk, World, & Country" => "Pop, Folk, World, Country"
-    # - "Rock, Funk / Soul, Pop, Stage & Screen" => "Rock, Funk / Soul, Pop, Stage & Screen"
+def planifier_colonnes(colonnes=None):
     
-    if not genres_str:
-        return ""
+    # Détermine le travail minimum pour obtenir les colonnes demandées
+    # Retourne (colonnes à exporter, besoin de visiter les pages album)
+    # Exemple : ['artiste', 'annee'] => (['artiste', 'album', 'url', 'annee'], False)
     
-    # Décoder HTML
-    genres = html.unescape(genres_str)
+    if not colonnes:
+        return list(COLONNES_ENRICHIES), True
     
-    # Protéger "Stage & Screen" en le remplaçant temporairement
-    placeholder = "___STAGE_AND_SCREEN___"
-    genres = genres.replace("Stage & Screen", placeholder)
+    colonnes_connues = set(COLONNES_CATALOGUE) | set(COLONNES_PAGE_ALBUM)
+    inconnues = [c for c in colonnes if c not in colonnes_connues]
+    if inconnues:
+        raise ValueError(f"Colonnes inconnues : {', '.join(inconnues)}")
     
-    # Maintenant supprimer tous les autres "&"
-    genres = genres.replace(' & ', ', ')
-    genres = genres.replace('&', ',')
+    # Toujours garder artiste, album, url en tête, puis l'ordre demandé
+    colonnes_finales = list(COLONNES_BASE)
+    for colonne in colonnes:
+        if colonne not in colonnes_finales:
+            colonnes_finales.append(colonne)
     
-    # Restaurer "Stage & Screen"
-    genres = genres.replace(placeholder, "Stage & Screen")
+    besoin_page_album = any(c in COLONNES_PAGE_ALBUM for c in colonnes_finales)
     
-    # Séparer les genres pour supprimer les doublons
-    genres_list = [g.strip() for g in genres.split(',')]
-    
-    # Supprimer les doublons tout en gardant l'ordre
-    genres_uniques = []
-    for genre in genres_list:
-        if genre and genre not in genres_uniques:
-            genres_uniques.append(genre)
-    
-    return ', '.join(genres_uniques)
+    return colonnes_finales, besoin_page_album
 
-def nettoyer_prix(prix_str):
-    
-    # Version simple : convertit toutes les virgules en points pour Excel
-    
-    if not prix_str:
-        return ""
-    
-    # Décoder les entités HTML
-    prix = html.unescape(prix_str)
-    
-    # Remplacer les espaces insécables par des espaces normaux
-    prix = prix.replace('\u00a0', ' ').replace('\xa0', ' ')
-    
-    # Supprimer le symbole € et autres devises
-    prix = prix.replace('€', '').replace('$', '').replace('£', '')
-    
-    # Supprimer tous les espaces
-    prix = re.sub(r'\s+', '', prix)
-    
-    # Convertir TOUTES les virgules en points
-    prix = prix.replace(',', '.')
-    
-    return prix.strip()
+# -----------------------------------------------------------------------------
+# ÉTAPE 1 : RÉCUPÉRER URLs + Artiste + Album DEPUIS LE CATALOGUE
+# -----------------------------------------------------------------------------
 
-def nettoyer_nombre(nombre_str):
-    
-    # Nettoie les nombres en supprimant les espaces et en gardant seulement les chiffres
-    # Exemple : "76 309" devient "76309"
-    
-    if not nombre_str:
-        return ""
-    
-    # Supprimer tous les espaces et caractères non numériques sauf le point et la virgule
-    nombre = re.sub(r'[^\d.,]', '', nombre_str.strip())
-    
-    return nombre
+# Tailles de page acceptées par la recherche Discogs (paramètre limit)
+RESULTATS_PAR_PAGE_VALIDES = (25, 50, 100, 250)
 
-def nettoyer_pays(pays_str):
-    
-    # Nettoie les pays en supprimant les espaces en trop ET les "&"
-    # Exemple : "UK, Europe & US" => "UK, Europe, US"
-    
-    if not pays_str:
-        return ""
-    
-    # Décoder HTML et nettoyer
-    pays = html.unescape(pays_str)
-    
-    # Supprimer tous les "&" et les remplacer par des virgules
-    pays = pays.replace(' & ', ', ')
-    pays = pays.replace('&', ',')
-    
-    # Nettoyer les virgules multiples et espaces
-    pays = re.sub(r',\s*,+', ',', pays)  # Supprimer virgules multiples
-    pays = re.sub(r'\s+', ' ', pays)     # Espaces multiples
-    pays = pays.strip().strip(',')       # Espaces et virgules en début/fin
-    
-    return pays
+# Facettes utilisables pour découper le catalogue => paramètre de recherche Discogs
+FACETTES_CATALOGUE = {
+    'genre': 'genre_exact',
+    'decennie': 'decade',
+    'format': 'format_exact',
+    'pays': 'country_exact',
+}
 
-def formater_date_pour_excel(date_str):
-    
-    # Convertit TOUTES les dates au format JJ/MM/AAAA pour Excel
-    
-    if not date_str:
-        return ""
-    
-    try:
-        date_str = date_str.strip()
-        
-        # Si c'est juste une année (4 chiffres)
-        if re.match(r'^\d{4}$', date_str):
-            return f"01/01/{date_str}"
-        
-        # Si c'est déjà au bon format JJ/MM/AAAA
-        if re.match(r'^\d{2}/\d{2}/\d{4}$', date_str):
-            return date_str
-        
-        # Dictionnaire des mois français
-        mois_dict = {
-            # Français
-            'janv': '01', 'janvier': '01',
-            'févr': '02', 'février': '02', 'fevrier': '02',
-            'mars': '03',
-            'avr': '04', 'avril': '04',
-            'mai': '05',
-            'juin': '06',
-            'juil': '07', 'juillet': '07',
-            'août': '08', 'aout': '08',
-            'sept': '09', 'septembre': '09',
-            'oct': '10', 'octobre': '10',
-            'nov': '11', 'novembre': '11',
-            'déc': '12', 'décembre': '12', 'decembre': '12',
-        }
-        
-        # Pattern pour "22 oct. 2012" ou "4 nov. 2016" ou "15 Dec 2023"
-        match_jour_mois_annee = re.search(r'(\d{1,2})\s+(\w+)\.?\s+(\d{4})', date_str, re.IGNORECASE)
-        if match_jour_mois_annee:
-            jour = match_jour_mois_annee.group(1).zfill(2)
-            mois_txt = match_jour_mois_annee.group(2).lower().rstrip('.')
-            annee = match_jour_mois_annee.group(3)
-            
-            if mois_txt in mois_dict:
-                return f"{jour}/{mois_dict[mois_txt]}/{annee}"
-        
-        # Pattern pour "oct. 2012" ou "nov 2016" (sans jour)
-        match_mois_annee = re.search(r'(\w+)\.?\s+(\d{4})', date_str, re.IGNORECASE)
-        if match_mois_annee:
-            mois_txt = match_mois_annee.group(1).lower().rstrip('.')
-            annee = match_mois_annee.group(2)
-            
-            if mois_txt in mois_dict:
-                return f"01/{mois_dict[mois_txt]}/{annee}"
-        
-        # Pattern pour format ISO "2023-05-15"
-        match_iso = re.search(r'(\d{4})-(\d{2})-(\d{2})', date_str)
-        if match_iso:
-            annee = match_iso.group(1)
-            mois = match_iso.group(2)
-            jour = match_iso.group(3)
-            return f"{jour}/{mois}/{annee}"
-        
-        # Si rien ne marche, retourner tel quel
-        return date_str
-    
-    except Exception as e:
-        return date_str
+GENRES_DISCOGS = ['Rock', 'Electronic', 'Pop', 'Funk / Soul', 'Jazz', 'Hip Hop',
+                  'Folk, World, & Country', 'Classical', 'Latin', 'Reggae', 'Stage & Screen',
+                  'Blues', 'Non-Music', 'Children\'s', 'Brass & Military']
 
-def formater_derniere_vente(date_str):
-    
-    # Formate spécifiquement les dates de dernière vente
-    # Exemple : "il y a 3 jours" => date calculée, "Dec 2023" => "01/12/2023"
-    
-    if not date_str:
-        return ""
+DECENNIES_DISCOGS = [1950, 1960, 1970, 1980, 1990, 2000, 2010, 2020]
+
+def verifier_resultats_par_page(resultats_par_page):
     
-    date_str = date_str.strip().lower()
+    # ValueError si Discogs n'accepte pas cette taille de page
     
-    # Gérer les dates relatives
-    if 'il y a' in date_str or 'ago' in date_str:
-        from datetime import datetime, timedelta
-        aujourd_hui = datetime.now()
-        
-        # "il y a X jours"
-        match_jours = re.search(r'(\d+)\s*(jour|day)', date_str)
-        if match_jours:
-            jours = int(match_jours.group(1))
-            date_vente = aujourd_hui - timedelta(days=jours)
-            return date_vente.strftime("%d/%m/%Y")
-        
-        # "il y a X mois"
-        match_mois = re.search(r'(\d+)\s*(mois|month)', date_str)
-        if match_mois:
-            mois = int(match_mois.group(1))
-            # Approximation : 1 mois = 30 jours
-            date_vente = aujourd_hui - timedelta(days=mois*30)
-            return date_vente.strftime("%d/%m/%Y")
-    
-    # Sinon utiliser la fonction générale
-    return formater_date_pour_excel(date_str)
-
-# -----------------------------------------------------------------------------
-# ÉTAPE 1 : RÉCUPÉRER URLs + Artiste + Album DEPUIS LE CATALOGUE
-# -----------------------------------------------------------------------------
+    if resultats_par_page not in RESULTATS_PAR_PAGE_VALIDES:
+        raise ValueError(f"Résultats par page invalides : {resultats_par_page} "
+                         f"(valeurs possibles : {RESULTATS_PAR_PAGE_VALIDES})")
 
-def extraire_infos_catalogue(html_content):
+def construire_url_catalogue(page, resultats_par_page=50, filtres=None):
     
-    # Extrait URLs, artistes et albums depuis la page de catalogue
+    # Construit l'URL d'une page du catalogue trié par popularité
+    # Exemple : filtres={'genre': 'Rock', 'decennie': 1970}
+    #   => ...?sort=have%2Cdesc&type=release&genre_exact=Rock&decade=1970&limit=250&page=1
     
-    soup = BeautifulSoup(html_content, 'html.parser')
-    albums = []
+    verifier_resultats_par_page(resultats_par_page)
     
-    # Chercher toutes les div avec la classe card-release-title
-    titres_divs = soup.find_all('div', class_='card-release-title')
+    parametres = [('sort', 'have,desc'), ('type', 'release')]
+    for facette, valeur in (filtres or {}).items():
+        parametres.append((FACETTES_CATALOGUE[facette], valeur))
     
-    print(f"  → {len(titres_divs)} albums trouvés")
+    # Le paramètre limit n'est ajouté que s'il diffère de la taille par défaut
+    if resultats_par_page != 50:
+        parametres.append(('limit', resultats_par_page))
+    parametres.append(('page', page))
     
-    for titre_div in titres_divs:
-        try:
-            # Extraire le lien et le titre de l'album
-            lien_titre = titre_div.find('a', class_='search_result_title')
-            if not lien_titre:
-                continue
-            
-            # Récupérer le titre de l'album
-            album = lien_titre.get('title', lien_titre.get_text(strip=True))
-            
-            # Récupérer le href et construire l'URL complète
-            href = lien_titre.get('href', '')
-            if not href:
-                continue
-            url_album = f"https://www.discogs.com{href}"
-            
-            # Trouver la div de l'artiste (juste après)
-            artiste_div = titre_div.find_next_sibling('div', class_='card-artist-name')
-            
-            if artiste_div:
-                # Chercher le lien de l'artiste
-                lien_artiste = artiste_div.find('a')
-                if lien_artiste:
-                    artiste = lien_artiste.get('title', lien_artiste.get_text(strip=True))
-                else:
-                    # Si pas de lien, prendre le texte du span
-                    span = artiste_div.find('span')
-                    artiste = span.get('title', span.get_text(strip=True)) if span else "Inconnu"
-            else:
-                artiste = "Inconnu"
-            
-            # Ajouter à la liste avec nettoyage
-            albums.append({
-                'artiste': nettoyer_artiste(artiste.strip()),
-                'album': nettoyer_album(album.strip()),
-                'url': url_album
-            })
-        
-        except Exception as e:
-            continue
-    
-    return albums
+    return f"{config.URL_DISCOGS}/fr/search/?{urlencode(parametres)}"
 
-def recuperer_infos_catalogue(page_debut=1, page_fin=200):
+def recuperer_infos_catalogue(page_debut=1, page_fin=200, resultats_par_page=50,
+                              filtres=None, arreter_si_vide=False, file_echecs=None):
     
     # Récupère URLs, artistes et albums depuis les pages de catalogue avec retry
+    # filtres : facettes optionnelles (genre, decennie, format, pays)
+    # arreter_si_vide : s'arrêter à la première page vide (fin du listing)
+    # file_echecs : une seule tentative par page, les échecs sont mis de côté
+    #               pour la reprise différée au lieu d'être retentés sur place
     
+    verifier_resultats_par_page(resultats_par_page)
     tous_les_albums = []  
     
     print("="*70)
     print("ÉTAPE 1 : RÉCUPÉRATION DEPUIS LE CATALOGUE")
     print("="*70)
     print(f"Catalogue : Albums triés par popularité (have desc)")
-    print(f"Pages à scraper : {page_debut} à {page_fin}\n")
+    if filtres:
+        print(f"Filtres : {', '.join(f'{k}={v}' for k, v in filtres.items())}")
+    print(f"Pages à scraper : {page_debut} à {page_fin} ({resultats_par_page} résultats/page)\n")
     
     for page in range(page_debut, page_fin + 1):
         print(f"{'='*70}")
         print(f"Page {page}/{page_fin}")
         print(f"{'='*70}")
         
-        url = f"https://www.discogs.com/fr/search/?sort=have%2Cdesc&type=release&page={page}"
+        url = construire_url_catalogue(page, resultats_par_page, filtres)
         print(f"URL: {url}")
         
         try:
             # Tentative avec retry automatique
-            response = crawl_get(url, wait_for_selector="div.card-release-title", max_retries=3)
+            response = crawl_get(url, wait_for_selector="div.card-release-title",
+                                 max_retries=1 if file_echecs is not None else 3)
             
             # Extraire les infos
             albums = extraire_infos_catalogue(response.html)
             
             if not albums:
                 print(f"  Aucun album trouvé sur la page {page}")
-                time.sleep(2)
+                if arreter_si_vide:
+                    print(f"  Fin du listing atteinte")
+                    break
+                time.sleep(config.PAUSE_CATALOGUE_VIDE)
                 continue
             
             tous_les_albums.extend(albums)
@@ -437,171 +164,103 @@ def recuperer_infos_catalogue(page_debut=1, page_fin=200):
                 print(f"  Exemple : {exemple['artiste']} - {exemple['album']}")
             
             # Pause entre les pages
-            time.sleep(1)
+            time.sleep(config.PAUSE_CATALOGUE)
         
         except Exception as e:
+            if file_echecs is not None:
+                print(f"  Page {page} mise en file des échecs : {type(e).__name__}")
+                file_echecs.ajouter(url, 'catalogue', e)
+                continue
             print(f"  Page {page} ignorée après échec des tentatives: {e}")
-            time.sleep(5)
+            time.sleep(config.PAUSE_ERREUR_CATALOGUE)
             continue
     
     return tous_les_albums
 
-# -----------------------------------------------------------------------------
-# ÉTAPE 2 : ENRICHIR AVEC STATISTIQUES DE LA PAGE ALBUM
-# -----------------------------------------------------------------------------
-
-def extraire_infos_completes_album(html_content, url):
-    
-    # Extrait TOUTES les informations de la page album avec nettoyage AMÉLIORÉ
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Initialiser avec des valeurs par défaut
-    infos = {
-        'url': url,
-        'label': '',
-        'format': '',
-        'pays': '',
-        'date_sortie': '',
-        'annee': '',
-        'genres': '',
-        'en_collection': '',
-        'en_wantlist': '',
-        'note_moyenne': '',
-        'nombre_notes': '',
-        'derniere_vente': '',
-        'prix_faible': '',
-        'prix_moyen': '',
-        'prix_eleve': ''
+def generer_shards(genres=None, decennies=None, formats=None, pays=None):
+    
+    # Découpe le catalogue en shards indépendants (produit cartésien des facettes)
+    # Exemple : genres=['Rock', 'Jazz'], decennies=[1970] => 2 shards
+    
+    valeurs_par_facette = {
+        'genre': genres,
+        'decennie': decennies,
+        'format': formats,
+        'pays': pays,
     }
+    facettes = [(nom, valeurs) for nom, valeurs in valeurs_par_facette.items() if valeurs]
     
-    try:
-        # LABEL 
-        labels = []
-        label_links = soup.find_all('a', href=lambda x: x and '/label/' in x)
-        for link in label_links:
-            label_text = link.get_text(strip=True)
-            if label_text and label_text not in labels:
-                labels.append(label_text)
-        infos['label'] = nettoyer_label(', '.join(labels))
-        
-        # FORMAT 
-        formats = []
-        format_links = soup.find_all('a', href=lambda x: x and 'format_exact=' in x)
-        for link in format_links:
-            format_text = link.get_text(strip=True)
-            if format_text and format_text not in formats:
-                formats.append(format_text)
-        infos['format'] = nettoyer_format(', '.join(formats))
-        
-        # PAYS
-        country_link = soup.find('a', href=lambda x: x and 'country=' in x)
-        if country_link:
-            infos['pays'] = nettoyer_pays(country_link.get_text(strip=True))  
-        
-        # DATE DE SORTIE ET ANNÉE 
-        time_tag = soup.find('time', datetime=True)
-        if time_tag:
-            date_brute = time_tag.get_text(strip=True)
-            infos['date_sortie'] = formater_date_pour_excel(date_brute)
-            datetime_value = time_tag.get('datetime', '')
-            if datetime_value:
-                infos['annee'] = datetime_value[:4]
-        
-        # GENRES 
-        genres = []
-        genre_links = soup.find_all('a', href=lambda x: x and '/genre/' in x)
-        for link in genre_links:
-            genre_text = link.get_text(strip=True)
-            if genre_text and genre_text not in genres:
-                genres.append(genre_text)
-        infos['genres'] = nettoyer_genres(', '.join(genres))  
-        
-        # STATISTIQUES 
-        section_stats = soup.find('section', id='release-stats')
-        if section_stats:
-            items = section_stats.find_all('li')
-            
-            for item in items:
-                try:
-                    span_name = item.find('span', class_='name_qjn4_')
-                    if not span_name:
-                        continue
-                    
-                    nom_stat = span_name.get_text(strip=True).lower()
-                    
-                    # En Collection
-                    if 'collection' in nom_stat:
-                        link = item.find('a', class_='link_wXY7O')
-                        if link:
-                            infos['en_collection'] = nettoyer_nombre(link.get_text(strip=True))
-                    
-                    # En Wantlist
-                    elif 'wantlist' in nom_stat:
-                        link = item.find('a', class_='link_wXY7O')
-                        if link:
-                            infos['en_wantlist'] = nettoyer_nombre(link.get_text(strip=True))
-                    
-                    # Note Moyenne
-                    elif 'note moyenne' in nom_stat or 'moyenne' in nom_stat:
-                        spans = item.find_all('span')
-                        for span in spans:
-                            if span != span_name and '/' in span.get_text():
-                                note_text = span.get_text(strip=True)
-                                match = re.search(r'(\d+[.,]\d+)', note_text)
-                                if match:
-                                    infos['note_moyenne'] = match.group(1).replace(',', '.')
-                                break
-                    
-                    # Nombre de Notes
-                    elif 'notes:' in nom_stat or nom_stat == 'notes':
-                        link = item.find('a', class_='link_wXY7O')
-                        if link:
-                            infos['nombre_notes'] = nettoyer_nombre(link.get_text(strip=True))
-                    
-                    # Dernière vente (MODIFIÉ)
-                    elif 'dernière vente' in nom_stat or 'derniere vente' in nom_stat:
-                        time_elem = item.find('time')
-                        if time_elem:
-                            date_brute = time_elem.get_text(strip=True)
-                            infos['derniere_vente'] = formater_derniere_vente(date_brute)
-                    
-                    # Prix Faible (MODIFIÉ)
-                    elif 'faible' in nom_stat:
-                        spans = item.find_all('span')
-                        for span in spans:
-                            if span != span_name and ('€' in span.get_text() or '$' in span.get_text()):
-                                infos['prix_faible'] = nettoyer_prix(span.get_text(strip=True))
-                                break
-                    
-                    # Prix Moyen (MODIFIÉ)
-                    elif 'prix moyen' in nom_stat or 'moyen' in nom_stat:
-                        spans = item.find_all('span')
-                        for span in spans:
-                            if span != span_name and ('€' in span.get_text() or '$' in span.get_text()):
-                                infos['prix_moyen'] = nettoyer_prix(span.get_text(strip=True))
-                                break
-                    
-                    # Prix Élevé (MODIFIÉ)
-                    elif 'élevée' in nom_stat or 'elevee' in nom_stat or 'élevé' in nom_stat:
-                        spans = item.find_all('span')
-                        for span in spans:
-                            if span != span_name and ('€' in span.get_text() or '$' in span.get_text()):
-                                infos['prix_eleve'] = nettoyer_prix(span.get_text(strip=True))
-                                break
-                
-                except Exception as e:
-                    continue
-        
-        return infos
+    if not facettes:
+        return [{}]
+    
+    noms = [nom for nom, _ in facettes]
+    return [dict(zip(noms, combinaison))
+            for combinaison in itertools.product(*(valeurs for _, valeurs in facettes))]
+
+def recuperer_catalogue_par_shards(shards, pages_par_shard=40, resultats_par_page=250,
+                                   workers_paralleles=4, file_echecs=None):
+    
+    # Récupère chaque shard en parallèle puis supprime les doublons entre shards
+    # Chaque shard est un listing indépendant : la limite de profondeur d'un
+    # seul listing s'applique par shard et non plus au catalogue entier
+    
+    # Taille invalide : erreur unique ici, et non un échec silencieux de chaque shard
+    verifier_resultats_par_page(resultats_par_page)
+    
+    print("="*70)
+    print(f"CATALOGUE PAR SHARDS : {len(shards)} shards, {workers_paralleles} en parallèle")
+    print("="*70)
+    
+    def _recuperer_shard(filtres):
+        try:
+            return recuperer_infos_catalogue(1, pages_par_shard, resultats_par_page,
+                                             filtres=filtres, arreter_si_vide=True,
+                                             file_echecs=file_echecs)
+        except Exception as e:
+            print(f"  Shard {filtres} ignoré : {e}")
+            return []
+    
+    with ThreadPoolExecutor(max_workers=workers_paralleles) as executor:
+        resultats = list(executor.map(_recuperer_shard, shards))
+    
+    # Dédoublonnage entre shards (un album peut appartenir à plusieurs genres)
+    # Ensemble compact : 1 bit par identifiant de release au lieu d'une chaîne par URL
+    # exact=True : une URL sans identifiant n'est jamais écartée sur un faux positif du Bloom
+    urls_vues = EnsembleVus(exact=True)
+    tous_les_albums = []
+    doublons = 0
+    for albums in resultats:
+        for album in albums:
+            if not urls_vues.ajouter(album['url']):
+                doublons += 1
+                continue
+            tous_les_albums.append(album)
     
-    except Exception as e:
-        print(f"    Erreur extraction : {e}")
-        return infos
+    print(f"\n  {len(tous_les_albums)} albums uniques ({doublons} doublons entre shards supprimés)")
+    
+    return tous_les_albums
+
+# -----------------------------------------------------------------------------
+# ÉTAPE 2 : ENRICHIR AVEC STATISTIQUES DE LA PAGE ALBUM
+# -----------------------------------------------------------------------------
 
-def enrichir_avec_details(albums, sauvegarder_tous_les=50):
+def enrichir_avec_details(albums, sauvegarder_tous_les=50, colonnes=None, nettoyer=True,
+                          file_echecs=None, budget_s=None, echeance=None, dernieres_visites=None,
+                          cache=None, champs_vides=None):
     
     # Visite chaque URL d'album pour ajouter toutes les informations
+    # Si les colonnes demandées sont toutes disponibles dans le catalogue,
+    # aucune page album n'est visitée
+    # nettoyer=False : valeurs brutes (nettoyage par lot avec post_traitement.py)
+    # file_echecs : les albums en échec sont mis de côté sans retry ni pause
+    # Les albums sont visités par priorité (ordonnancement.py) ; budget_s / echeance
+    # arrêtent l'étape avant la limite, les albums restants sont rendus non enrichis
+    # cache : CachePages, une page inchangée depuis le run précédent n'est pas re-parsée
+    
+    colonnes, besoin_page_album = planifier_colonnes(colonnes)
+    if not besoin_page_album:
+        print("\n✓ Colonnes demandées disponibles dans le catalogue : aucune page album à visiter")
+        return list(albums)
     
     albums_enrichis = []
     total = len(albums)
@@ -611,20 +270,34 @@ def enrichir_avec_details(albums, sauvegarder_tous_les=50):
     print("="*70)
     print(f"\nTotal d'albums à enrichir : {total}")
     print("Cette étape peut prendre du temps (~1.5s par album)\n")
+    if budget_s:
+        print(f"Budget : {budget_s/60:.1f} minutes, albums les plus utiles d'abord\n")
+    
+    ordonnanceur = Ordonnanceur(COLONNES_PAGE_ALBUM, dernieres_visites, champs_vides=champs_vides)
+    ordonnanceur.ajouter_tous(albums)
     
-    for i, album in enumerate(albums, 1):
+    for i, album in enumerate(ordonnanceur.iterer(budget_s, echeance), 1):
         print(f"[{i}/{total}] {album['artiste']} - {album['album']}")
         
         try:
-            # Scraper la page de l'album
-            response = crawl_get(album['url'])
-            
-            # Extraire TOUTES les informations
-            infos = extraire_infos_completes_album(response.html, album['url'])
+            max_retries = 1 if file_echecs is not None else 3
+            if cache is not None:
+                # Scraper la page, extraire seulement si elle a changé depuis le dernier run
+                infos, statut = charger_infos_album(album['url'], cache, nettoyer, max_retries)
+                if statut != 'extraites':
+                    print(f"  = Page inchangée ({statut}), infos reprises du cache")
+            else:
+                # Scraper la page de l'album
+                response = crawl_get(album['url'], max_retries=max_retries)
+                
+                # Extraire TOUTES les informations
+                infos = extraire_infos_completes_album(response.html, album['url'], nettoyer)
             
-            # Fusionner avec les infos existantes
-            album_enrichi = {**album, **infos}
-            albums_enrichis.append(album_enrichi)
+            # Fusionner avec les infos existantes (en place, sans copie de l'album)
+            if not isinstance(album, Album):
+                album = Album.depuis_dict(album)
+            album.mettre_a_jour(infos)
+            albums_enrichis.append(album)
             
             print(f"  ✓ Label: {infos.get('label', 'N/A')[:40]}")
             print(f"    Format: {infos.get('format', 'N/A')}")
@@ -634,19 +307,52 @@ def enrichir_avec_details(albums, sauvegarder_tous_les=50):
             # Sauvegardes périodiques
             if i % sauvegarder_tous_les == 0:
                 print(f"\n  Sauvegarde intermédiaire ({i} albums)...")
-                sauvegarder_csv_enrichi(albums_enrichis, f'discogs_enrichi_backup_{i}.csv')
+                sauvegarder_csv_enrichi(albums_enrichis, f'discogs_enrichi_backup_{i}.csv', colonnes)
                 print()
             
             # Pause
-            time.sleep(1.5)
+            time.sleep(config.PAUSE_ALBUM)
         
         except Exception as e:
-            print(f"  Erreur : {e}")
             albums_enrichis.append(album)
-            time.sleep(3)
+            if file_echecs is not None:
+                print(f"  Mis en file des échecs : {type(e).__name__}")
+                file_echecs.ajouter(album['url'], 'album', e, album)
+                continue
+            print(f"  Erreur : {e}")
+            time.sleep(config.PAUSE_ERREUR_ALBUM)
             continue
     
-    return albums_enrichis
+    if ordonnanceur.restants:
+        print(f"\n  Budget atteint : {ordonnanceur.restants} albums non enrichis (les moins prioritaires)")
+    
+    # Résultat dans l'ordre du catalogue, albums hors budget compris
+    enrichis = {album['url']: album for album in albums_enrichis}
+    return [enrichis.get(album['url'], album) for album in albums]
+
+def reprendre_echecs(file_echecs, albums, colonnes=None, nettoyer=True, besoin_page_album=True):
+    
+    # Passe de reprise différée : rejoue la file des échecs puis réintègre les résultats
+    # - album enrichi récupéré : remplace sa version non enrichie (même URL)
+    # - page catalogue récupérée : ses albums sont ajoutés (et enrichis si besoin)
+    
+    recuperes = rejouer_echecs(file_echecs, nettoyer=nettoyer)
+    
+    positions = {album['url']: i for i, album in enumerate(albums)}
+    for album in recuperes['album']:
+        if album['url'] in positions:
+            albums[positions[album['url']]] = album
+        else:
+            positions[album['url']] = len(albums)
+            albums.append(album)
+    
+    nouveaux = [album for album in recuperes['catalogue'] if album['url'] not in positions]
+    if nouveaux and besoin_page_album:
+        nouveaux = enrichir_avec_details(nouveaux, colonnes=colonnes, nettoyer=nettoyer,
+                                         file_echecs=file_echecs)
+    albums.extend(nouveaux)
+    
+    return albums
 
 # -----------------------------------------------------------------------------
 # SAUVEGARDE
@@ -658,22 +364,19 @@ def sauvegarder_csv(albums, nom_fichier='discogs_albums.csv'):
     
     with open(nom_fichier, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['artiste', 'album', 'url']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
         writer.writeheader()
         writer.writerows(albums)
     
     print(f"  ✓ {len(albums)} albums sauvegardés dans '{nom_fichier}'")
 
-def sauvegarder_csv_enrichi(albums, nom_fichier='discogs_albums_enrichi.csv'):
-    # Sauvegarde avec toutes les colonnes enrichies"""
+def sauvegarder_csv_enrichi(albums, nom_fichier='discogs_albums_enrichi.csv', colonnes=None):
+    # Sauvegarde avec toutes les colonnes enrichies (ou seulement celles demandées)
     if not albums:
         return
     
     with open(nom_fichier, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['artiste', 'album', 'url', 
-                     'label', 'format', 'pays', 'date_sortie', 'annee', 'genres',
-                     'en_collection', 'en_wantlist', 'note_moyenne', 'nombre_notes', 
-                     'derniere_vente', 'prix_faible', 'prix_moyen', 'prix_eleve']
+        fieldnames = colonnes or COLONNES_ENRICHIES
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
         writer.writeheader()
         writer.writerows(albums)
@@ -683,7 +386,7 @@ def sauvegarder_csv_enrichi(albums, nom_fichier='discogs_albums_enrichi.csv'):
 def sauvegarder_urls(urls, nom_fichier='discogs_urls.txt'):
     with open(nom_fichier, 'w', encoding='utf-8') as f:
         for item in urls:
-            if isinstance(item, dict):
+            if not isinstance(item, str):
                 f.write(item['url'] + '\n')
             else:
                 f.write(item + '\n')
@@ -702,22 +405,62 @@ if __name__ == "__main__":
     print("\nÉtape 1 : Récupération Artiste + Album + URL")
     print("Étape 2 : Enrichissement avec statistiques complètes")
     
-    # Configuration
-    choix = input("\nScraper 200 pages du catalogue ? (oui/non) : ").strip().lower()
+    # Mode profilage : temps, piles et allocations par étape (fetch, parse, extract, clean, write)
+    if '--profile' in sys.argv:
+        from profilage import Profileur
+        profileur = Profileur()
+        profileur.demarrer()
+        print(f"\nProfilage activé : résultats dans '{profileur.dossier}/' en fin de run")
+    
+    # File des échecs (reprise différée) : peut contenir les échecs d'un run précédent
+    file_echecs = FileEchecs() if config.REPRISE_DIFFEREE else None
+    if file_echecs:
+        print(f"\n{len(file_echecs)} pages en échec lors d'un run précédent {file_echecs.resume()}")
+        if input("Rejouer seulement ces échecs ? (oui/non) : ").strip().lower() in ['oui', 'o', 'yes', 'y']:
+            albums_repris = reprendre_echecs(file_echecs, [], nettoyer=True)
+            sauvegarder_csv_enrichi(albums_repris, 'discogs_albums_reprise.csv')
+            exit()
     
-    if choix not in ['oui', 'o', 'yes', 'y']:
-        print("\nMode TEST")
-        page_debut = int(input("Page de début (défaut=1) : ").strip() or "1")
-        page_fin = int(input("Page de fin (défaut=2) : ").strip() or "2")
+    # Configuration
+    # Taille de page vérifiée avant tout téléchargement : on redemande si elle est invalide
+    while True:
+        saisie = input("\nRésultats par page (25/50/100/250, défaut=50) : ").strip() or "50"
+        try:
+            resultats_par_page = int(saisie)
+            verifier_resultats_par_page(resultats_par_page)
+            break
+        except ValueError:
+            print(f"  Valeur invalide : {saisie} (valeurs possibles : {RESULTATS_PAR_PAGE_VALIDES})")
+    mode_shards = input("Découper le catalogue par genre et décennie ? (oui/non) : ").strip().lower()
+    
+    if mode_shards in ['oui', 'o', 'yes', 'y']:
+        shards = generer_shards(genres=GENRES_DISCOGS, decennies=DECENNIES_DISCOGS)
+        pages_par_shard = int(input(f"Pages max par shard ({len(shards)} shards, défaut=4) : ").strip() or "4")
+        workers = int(input("Shards en parallèle (défaut=4) : ").strip() or "4")
     else:
-        page_debut = 1
-        page_fin = 200
+        choix = input("\nScraper 10 000 albums du catalogue ? (oui/non) : ").strip().lower()
+        
+        if choix not in ['oui', 'o', 'yes', 'y']:
+            print("\nMode TEST")
+            page_debut = int(input("Page de début (défaut=1) : ").strip() or "1")
+            page_fin = int(input("Page de fin (défaut=2) : ").strip() or "2")
+        else:
+            page_debut = 1
+            page_fin = -(-10000 // resultats_par_page)  # 200 pages de 50, 40 pages de 250
     
     print(f"\nDémarrage...\n")
     debut_total = time.time()
     
     # ÉTAPE 1 : Récupérer toutes les infos depuis le catalogue
-    albums = recuperer_infos_catalogue(page_debut=page_debut, page_fin=page_fin)
+    if mode_shards in ['oui', 'o', 'yes', 'y']:
+        albums = recuperer_catalogue_par_shards(shards, pages_par_shard=pages_par_shard,
+                                                resultats_par_page=resultats_par_page,
+                                                workers_paralleles=workers,
+                                                file_echecs=file_echecs)
+    else:
+        albums = recuperer_infos_catalogue(page_debut=page_debut, page_fin=page_fin,
+                                           resultats_par_page=resultats_par_page,
+                                           file_echecs=file_echecs)
     
     if not albums:
         print("\nAucun album récupéré. Arrêt.")
@@ -742,17 +485,77 @@ if __name__ == "__main__":
     print("  - Note moyenne, Nombre de notes")
     print("  - Dernière vente")
     print("  - Prix : Faible, Moyen, Élevé")
-    print(f"\nTemps estimé : ~{len(albums)*1.5/60:.0f} minutes pour {len(albums)} albums")
+    print(f"\nColonnes disponibles sans visite : {', '.join(COLONNES_CATALOGUE)}")
+    print(f"Colonnes nécessitant l'étape 2 : {', '.join(COLONNES_PAGE_ALBUM)}")
     
-    enrichir = input("\nEnrichir avec l'étape 2 ? (oui/non) : ").strip().lower()
+    # Une faute de frappe ne doit pas perdre l'étape 1 : on redemande
+    while True:
+        saisie = input("\nColonnes souhaitées (séparées par des virgules, vide=toutes) : ").strip()
+        colonnes_demandees = [c.strip() for c in saisie.split(',') if c.strip()]
+        try:
+            colonnes, besoin_page_album = planifier_colonnes(colonnes_demandees)
+            break
+        except ValueError as e:
+            print(f"  {e}")
+    
+    budget_minutes = None
+    if besoin_page_album:
+        print(f"\nTemps estimé : ~{len(albums)*1.5/60:.0f} minutes pour {len(albums)} albums")
+        enrichir = input("\nEnrichir avec l'étape 2 ? (oui/non) : ").strip().lower()
+        if enrichir in ['oui', 'o', 'yes', 'y']:
+            saisie_budget = input("Budget en minutes (albums les plus utiles d'abord, vide=illimité) : ").strip()
+            budget_minutes = float(saisie_budget) if saisie_budget else None
+    else:
+        # Tout est déjà dans le catalogue : pas besoin de visiter les pages album
+        print("\n✓ Toutes les colonnes demandées sont déjà disponibles")
+        enrichir = 'oui'
+    
+    # Cache des pages album (requêtes conditionnelles, empreinte du contenu)
+    cache = CachePages() if config.CACHE_PAGES else None
+    
+    # Mode master : un seul pressage visité par album
+    albums_a_enrichir = albums
+    pressages = rapport_master = None
+    if config.REGROUPEMENT_MASTERS and besoin_page_album and enrichir in ['oui', 'o', 'yes', 'y']:
+        from masters import (charger_correspondances, sauvegarder_correspondances, regrouper_pressages,
+                             fusionner_masters, rapport_masters)
+        correspondances = charger_correspondances()
+        albums_a_enrichir, pressages = regrouper_pressages(albums, correspondances)
+        print(f"\nMode master : {len(albums)} releases => {len(albums_a_enrichir)} pages album à visiter")
     
     if enrichir in ['oui', 'o', 'yes', 'y']:
-        # ÉTAPE 2 : Enrichir
-        albums_enrichis = enrichir_avec_details(albums, sauvegarder_tous_les=50)
+        # ÉTAPE 2 : Enrichir (seulement si les colonnes le nécessitent)
+        debut_etape2 = time.time()
+        albums_enrichis = enrichir_avec_details(albums_a_enrichir, sauvegarder_tous_les=50, colonnes=colonnes,
+                                                nettoyer=not config.POST_TRAITEMENT_PAR_LOT,
+                                                file_echecs=file_echecs,
+                                                budget_s=budget_minutes * 60 if budget_minutes else None,
+                                                dernieres_visites=dernieres_visites_depuis_historique(),
+                                                cache=cache,
+                                                champs_vides=champs_vides_depuis_csv(COLONNES_PAGE_ALBUM,
+                                                                                     'discogs_albums_final.csv'))
+        duree_etape2 = time.time() - debut_etape2
+        
+        if pressages is not None:
+            albums_enrichis = fusionner_masters(albums_enrichis, pressages, correspondances)
+            sauvegarder_correspondances(correspondances)
+            rapport_master = rapport_masters(albums, albums_a_enrichir, albums_enrichis)
+            colonnes = colonnes + ['master_id', 'pressages']
     else:
         albums_enrichis = albums
+        colonnes = COLONNES_BASE
         print("\n✓ Étape 2 ignorée")
     
+    # Passe de reprise des pages mises de côté pendant le run
+    if file_echecs:
+        print(f"\n{len(file_echecs)} pages en échec {file_echecs.resume()}")
+        if input("Lancer la passe de reprise maintenant ? (oui/non) : ").strip().lower() in ['oui', 'o', 'yes', 'y']:
+            albums_enrichis = reprendre_echecs(file_echecs, list(albums_enrichis), colonnes,
+                                               nettoyer=not config.POST_TRAITEMENT_PAR_LOT,
+                                               besoin_page_album=besoin_page_album and enrichir in ['oui', 'o', 'yes', 'y'])
+        else:
+            print(f"  Échecs conservés dans '{file_echecs.chemin}' pour un prochain run")
+    
     duree_totale = time.time() - debut_total
     
     # RÉSULTATS FINAUX
@@ -763,6 +566,39 @@ if __name__ == "__main__":
     print(f"Temps total : {duree_totale/60:.2f} minutes")
     print(f"Vitesse : {len(albums_enrichis)/(duree_totale/60):.1f} albums/minute")
     
+    # Mode master : pages album évitées (temps estimé d'après la durée moyenne mesurée)
+    if rapport_master:
+        duree_page = duree_etape2 / max(rapport_master['pages_visitees'], 1)
+        print(f"Mode master : {rapport_master['releases']} releases => {rapport_master['masters']} masters, "
+              f"{rapport_master['pages_evitees']} pages album évitées "
+              f"(~{rapport_master['pages_evitees'] * duree_page / 60:.1f} minutes économisées)")
+    
+    # Pages de blocage détectées (challenge, captcha, consentement...)
+    rapport_blocages = disjoncteur.rapport()
+    if rapport_blocages['total_blocages']:
+        print(f"Pages bloquées : {rapport_blocages['total_blocages']} {rapport_blocages['blocages']}")
+        print(f"  Disjoncteur ouvert {rapport_blocages['ouvertures']} fois "
+              f"({rapport_blocages['secondes_en_pause']/60:.1f} minutes de pause)")
+    
+    # Pages album inchangées depuis le run précédent (extraction et écriture évitées)
+    if cache is not None and sum(cache.statistiques.values()):
+        print(f"Pages inchangées : {cache.taux_evitement():.0%} "
+              f"({cache.statistiques['non_modifiees_304']} réponses 304, "
+              f"{cache.statistiques['empreinte_identique']} empreintes identiques)")
+    
+    # Latences de queue par type de page (timeouts adaptatifs et relances)
+    for type_page, lat in suivi_latences.rapport().items():
+        print(f"Latences {type_page} : p50 {lat['p50']:.1f}s | p95 {lat['p95']:.1f}s | "
+              f"p99 {lat['p99']:.1f}s | max {lat['max']:.1f}s | timeout {lat['timeout_s']:.0f}s"
+              f" | {lat.get('timeouts', 0)} timeouts, {lat.get('relances', 0)} relances "
+              f"({lat.get('relances_gagnantes', 0)} gagnantes)")
+    
+    # Pool de navigateurs (lancés, recyclés, mémoire)
+    stats_pool = statistiques_pools()
+    if stats_pool['crees']:
+        print(f"Navigateurs : {stats_pool['crees']} lancés pour {stats_pool['pages_servies']} pages, "
+              f"recyclés {stats_pool['recycles'] or 0}, RSS max {stats_pool['rss_max_observee_mo']} Mo")
+    
     if albums_enrichis:
         print(f"\nAperçu des 10 premiers résultats :")
         print("-"*70)
@@ -775,11 +611,31 @@ if __name__ == "__main__":
             print(f"\n... et {len(albums_enrichis) - 10} autres")
         
         # Sauvegarde finale
-        if enrichir in ['oui', 'o', 'yes', 'y']:
-            sauvegarder_csv_enrichi(albums_enrichis, 'discogs_albums_final.csv')
+        albums_nettoyes = albums_enrichis
+        if enrichir in ['oui', 'o', 'yes', 'y'] and config.POST_TRAITEMENT_PAR_LOT:
+            from post_traitement import post_traiter_colonnes, sauvegarder_csv_post_traite, albums_depuis_tableau
+            tableau = post_traiter_colonnes(albums_enrichis)
+            sauvegarder_csv_post_traite(tableau, 'discogs_albums_final.csv', colonnes)
+            # Les autres sorties partent des valeurs nettoyées, comme le CSV final
+            albums_nettoyes = albums_depuis_tableau(tableau)
+        elif enrichir in ['oui', 'o', 'yes', 'y']:
+            sauvegarder_csv_enrichi(albums_enrichis, 'discogs_albums_final.csv', colonnes)
         else:
             sauvegarder_csv(albums_enrichis, 'discogs_albums_final.csv')
         
+        if config.EXPORT_TABLES_ENTITES:
+            from entites import sauvegarder_tables_entites
+            sauvegarder_tables_entites(albums_nettoyes, 'discogs_tables', colonnes)
+        
+        # Relevé des statistiques (seules les valeurs modifiées sont ajoutées)
+        if config.HISTORIQUE_STATS and enrichir in ['oui', 'o', 'yes', 'y']:
+            from historique import HistoriqueStats
+            historique = HistoriqueStats()
+            comptes = historique.enregistrer_releve(albums_nettoyes)
+            historique.fermer()
+            print(f"  ✓ Historique : {comptes['ecrites']} valeurs modifiées ajoutées "
+                  f"({comptes['inchangees']} inchangées) dans '{config.FICHIER_HISTORIQUE}'")
+        
         print(f"\n{'='*70}")
         print("LE SCRAPING EST GOOD !")
         print(f"{'='*70}")
@@ -788,4 +644,12 @@ if __name__ == "__main__":
         print(f"  - discogs_albums_final.csv : Données finales")
         print(f"  - discogs_urls.txt : Liste des URLs")
         if enrichir in ['oui', 'o', 'yes', 'y']:
-            print(f"  - discogs_enrichi_backup_X.csv : Sauvegardes intermédiaires")
\ No newline at end of file
+            print(f"  - discogs_enrichi_backup_X.csv : Sauvegardes intermédiaires")
+        if config.EXPORT_TABLES_ENTITES:
+            print(f"  - discogs_tables/ : Albums encodés + tables d'entités")
+        if config.HISTORIQUE_STATS and enrichir in ['oui', 'o', 'yes', 'y']:
+            print(f"  - {config.FICHIER_HISTORIQUE} : Historique des statistiques")
+        if rapport_master:
+            print(f"  - {config.FICHIER_MASTERS} : Correspondances release => master")
+        if file_echecs:
+            print(f"  - {file_echecs.chemin} : Pages toujours en échec ({len(file_echecs)})")
\ No newline at end of file
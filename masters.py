@@ -0,0 +1,130 @@
+import json
+import os
+
+import configuration as config
+from nettoyage import nettoyer_artiste, nettoyer_album
+from recherche import cle_normalisee
+
+# -----------------------------------------------------------------------------
+# MODE MASTER (une seule page album visitée par album, tous pressages confondus)
+# -----------------------------------------------------------------------------
+#
+# Le catalogue "type=release" trié par popularité contient de nombreux
+# pressages d'un même album (rééditions, pays, formats), chacun enrichi
+# séparément. En mode master :
+#   1. les releases sont regroupées AVANT toute visite : par master connu
+#      (correspondances release => master des runs précédents), sinon par
+#      (artiste, titre) normalisés, comme dans recherche.py
+#   2. seul le représentant de chaque groupe est enrichi : le pressage le plus
+#      collectionné (premier dans l'ordre du catalogue)
+#   3. le master_id lu sur sa page est enregistré pour le représentant seul :
+#      les autres pressages ne sont rattachés que par présomption (même titre
+#      ne veut pas dire même master : rééditions, albums homonymes), et une
+#      correspondance enregistrée sert à tous les runs suivants ; deux groupes
+#      qui s'avèrent avoir le même master sont fusionnés
+# Une ligne par master : statistiques du représentant, 'pressages' = nombre de
+# releases du groupe, formats réunis, année la plus ancienne.
+
+def charger_correspondances(chemin=None):
+
+    # {url de release: master_id} appris lors des runs précédents
+
+    chemin = chemin or config.FICHIER_MASTERS
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, encoding='utf-8') as f:
+        return json.load(f)
+
+def sauvegarder_correspondances(correspondances, chemin=None):
+    chemin = chemin or config.FICHIER_MASTERS
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(correspondances, f, ensure_ascii=False)
+
+def _cle_titre(album):
+    return ('titre', cle_normalisee(album.get('artiste'), nettoyer_artiste),
+            cle_normalisee(album.get('album'), nettoyer_album))
+
+def regrouper_pressages(albums, correspondances=None):
+
+    # Regroupe les releases du catalogue par master (connu ou présumé)
+    # Retourne (représentants dans l'ordre du catalogue, {url du représentant: pressages du groupe})
+
+    correspondances = correspondances or {}
+
+    # Un titre dont un pressage a un master connu rejoint ce master
+    master_par_titre = {}
+    for album in albums:
+        master = correspondances.get(album['url'])
+        if master:
+            master_par_titre.setdefault(_cle_titre(album), master)
+
+    groupes = {}
+    for album in albums:
+        master = correspondances.get(album['url']) or master_par_titre.get(_cle_titre(album))
+        cle = ('master', master) if master else _cle_titre(album)
+        groupes.setdefault(cle, []).append(album)
+
+    representants = []
+    pressages_par_representant = {}
+    for cle, pressages in groupes.items():
+        representant = pressages[0]
+        # Master déjà lu sur la page du représentant lors d'un run précédent (pas celui présumé par le titre)
+        if correspondances.get(representant['url']):
+            representant['master_id'] = correspondances[representant['url']]
+        representant['pressages'] = str(len(pressages))
+        representants.append(representant)
+        pressages_par_representant[representant['url']] = pressages
+
+    return representants, pressages_par_representant
+
+def _agreger(representant, pressages):
+
+    # Champs du catalogue réunis sur tous les pressages (les statistiques restent celles du représentant)
+
+    formats = []
+    for album in [representant] + pressages:
+        for fmt in (album.get('format') or '').split(','):
+            fmt = fmt.strip()
+            if fmt and fmt not in formats:
+                formats.append(fmt)
+    representant['format'] = ', '.join(formats)
+
+    annees = [album.get('annee') for album in [representant] + pressages if album.get('annee')]
+    if annees:
+        representant['annee'] = min(annees)
+
+    representant['pressages'] = str(len(pressages))
+
+def fusionner_masters(representants, pressages_par_representant, correspondances):
+
+    # Après l'enrichissement : une ligne par master, correspondances mises à jour en place
+
+    par_master = {}
+    resultat = []
+    for representant in representants:
+        pressages = pressages_par_representant[representant['url']]
+        master = representant.get('master_id')
+        if master:
+            # Seule la page du représentant a été lue
+            correspondances[representant['url']] = master
+            premier = par_master.get(master)
+            if premier is not None:
+                # Titres différents ("Album" / "Album (Remastered)") mais même master
+                pressages_par_representant[premier['url']].extend(pressages)
+                _agreger(premier, pressages_par_representant[premier['url']])
+                continue
+            par_master[master] = representant
+        _agreger(representant, pressages)
+        resultat.append(representant)
+    return resultat
+
+def rapport_masters(albums_catalogue, representants, masters):
+
+    # Releases du catalogue, pages album réellement visitées, lignes finales
+
+    return {
+        'releases': len(albums_catalogue),
+        'pages_visitees': len(representants),
+        'pages_evitees': len(albums_catalogue) - len(representants),
+        'masters': len(masters),
+    }
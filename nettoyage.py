@@ -0,0 +1,377 @@
+import html
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# -----------------------------------------------------------------------------
+# NETTOYAGE DES DONNÉES
+# -----------------------------------------------------------------------------
+#
+# Les artistes, labels, genres, pays et dates se répètent énormément sur
+# 10 000 albums : les fonctions de nettoyage sont mémorisées (cache LRU borné)
+# et les expressions régulières compilées une seule fois au chargement.
+# Titres d'albums et nombres sont presque tous uniques : pas de cache pour eux.
+#
+# Pages françaises et anglaises (LANGUES_EXTRACTION) : "76 309" / "76,309",
+# "1 234,56 €" / "$1,234.56", "28 août 2007" / "Aug 28, 2007". Le format
+# suffit à lever l'ambiguïté (les compteurs sont entiers, les prix ont
+# toujours 1 ou 2 décimales), sans avoir à connaître la langue de la page :
+# le nettoyage par lot (post_traitement.py) reste possible sans elle.
+
+# Nombre maximum de valeurs gardées en cache par fonction
+TAILLE_CACHE = 4096
+
+# Expressions régulières précompilées
+RE_NUMERO_FINAL = re.compile(r'\s*\(\d+\)$')              # "Justice (3)" => "Justice"
+RE_ESPACES = re.compile(r'\s+')
+RE_NON_NUMERIQUE = re.compile(r'[^\d.,]')
+RE_NON_CHIFFRE = re.compile(r'\D')
+RE_DECIMALES = re.compile(r'[.,](\d{1,2})$')             # ",56" de "1 234,56", ".56" de "1,234.56"
+RE_SEPARATEURS = re.compile(r'[.,]')
+RE_NOTE = re.compile(r'(\d+[.,]\d+)')                     # "4,41 / 5" => "4,41"
+RE_VIRGULES_MULTIPLES = re.compile(r',\s*,+')
+RE_ANNEE = re.compile(r'^\d{4}$')
+RE_DATE_EXCEL = re.compile(r'^\d{2}/\d{2}/\d{4}$')
+RE_JOUR_MOIS_ANNEE = re.compile(r'(\d{1,2})\s+(\w+)\.?\s+(\d{4})', re.IGNORECASE)
+RE_MOIS_JOUR_ANNEE = re.compile(r'([^\W\d_]+)\.?\s+(\d{1,2}),?\s+(\d{4})')  # "Aug 28, 2007"
+RE_MOIS_ANNEE = re.compile(r'(\w+)\.?\s+(\d{4})', re.IGNORECASE)
+RE_DATE_ISO = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+RE_IL_Y_A_JOURS = re.compile(r'(\d+)\s*(jour|day)')
+RE_IL_Y_A_MOIS = re.compile(r'(\d+)\s*(mois|month)')
+
+# Entrée "tous les formats" du filtre de recherche, pas un format
+FORMATS_IGNORES = ("Tout format", "All Media")
+
+# Dictionnaire des mois français
+MOIS_FRANCAIS = {
+    'janv': '01', 'janvier': '01',
+    'févr': '02', 'février': '02', 'fevrier': '02',
+    'mars': '03',
+    'avr': '04', 'avril': '04',
+    'mai': '05',
+    'juin': '06',
+    'juil': '07', 'juillet': '07',
+    'août': '08', 'aout': '08',
+    'sept': '09', 'septembre': '09',
+    'oct': '10', 'octobre': '10',
+    'nov': '11', 'novembre': '11',
+    'déc': '12', 'décembre': '12', 'decembre': '12',
+}
+
+# Dictionnaire des mois anglais (pages en anglais)
+MOIS_ANGLAIS = {
+    'jan': '01', 'january': '01',
+    'feb': '02', 'february': '02',
+    'mar': '03', 'march': '03',
+    'apr': '04', 'april': '04',
+    'may': '05',
+    'jun': '06', 'june': '06',
+    'jul': '07', 'july': '07',
+    'aug': '08', 'august': '08',
+    'sep': '09', 'september': '09',
+    'oct': '10', 'october': '10',
+    'nov': '11', 'november': '11',
+    'dec': '12', 'december': '12',
+}
+
+# Aucune abréviation n'a deux sens d'une langue à l'autre
+MOIS = {**MOIS_FRANCAIS, **MOIS_ANGLAIS}
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def nettoyer_artiste(artiste):
+
+    #Nettoie le nom de l'artiste en supprimant les numéros entre parenthèses
+    #Exemple : Justice (3) devient Justice
+
+    if not artiste:
+        return artiste
+
+    # Décoder les entités HTML d'abord
+    artiste = html.unescape(artiste)
+
+    # Supprimer les guillemets indésirables
+    artiste = artiste.replace('"', '')
+
+    # Supprimer les patterns comme (3), (12), etc. à la fin
+    artiste = RE_NUMERO_FINAL.sub('', artiste)
+
+    return artiste.strip()
+
+def nettoyer_album(album):
+
+    # Nettoie le titre de l'album en décodant les entités HTML
+    # Exemple : She&#39;s So Unusual devient She's So Unusual
+
+    if not album:
+        return album
+
+    # Décoder les entités HTML
+    album = html.unescape(album)
+
+    # Supprimer les guillemets indésirables (mais garder les apostrophes)
+    album = album.replace('"', '')
+
+    # Nettoyer les doubles espaces
+    album = RE_ESPACES.sub(' ', album)
+
+    return album.strip()
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def nettoyer_label(label_str):
+
+    # Nettoie les labels en limitant à 3 principaux, supprimant les doublons
+    # ET en retirant les numéros entre parenthèses
+    # Exemple : "Parlophone, Warner Music Group, GEM (6)" => "Parlophone, Warner Music Group, GEM"
+
+    if not label_str:
+        return ""
+
+    # Séparer les labels
+    labels = [l.strip() for l in label_str.split(',')]
+
+    # Nettoyer chaque label individuellement
+    labels_nettoyes = []
+    for label in labels:
+        if label:
+            # Supprimer les numéros entre parenthèses à la fin : (6), (12), etc.
+            label_propre = RE_NUMERO_FINAL.sub('', label.strip())
+
+            # Ajouter seulement si pas déjà présent (supprimer doublons)
+            if label_propre and label_propre not in labels_nettoyes:
+                labels_nettoyes.append(label_propre)
+
+    # Limiter à 3 labels principaux
+    return ', '.join(labels_nettoyes[:3])
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def nettoyer_format(format_str):
+
+    # Nettoie les formats en supprimant "Tout format" ("All Media" en anglais) et les doublons
+
+    if not format_str:
+        return ""
+
+    # Séparer les formats
+    formats = [f.strip() for f in format_str.split(',')]
+
+    # Supprimer "Tout format" et les doublons
+    formats_clean = []
+    for fmt in formats:
+        if fmt and fmt not in FORMATS_IGNORES and fmt not in formats_clean:
+            formats_clean.append(fmt)
+
+    return ', '.join(formats_clean)
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def nettoyer_genres(genres_str):
+
+    # Nettoie les genres en supprimant les doublons ET les "&"
+    # SAUF pour "Stage & Screen" qui est un genre spécifique
+    # Exemples :
+    # - "Pop, Folk, World, & Country" => "Pop, Folk, World, Country"
+    # - "Rock, Funk / Soul, Pop, Stage & Screen" => "Rock, Funk / Soul, Pop, Stage & Screen"
+
+    if not genres_str:
+        return ""
+
+    # Décoder HTML
+    genres = html.unescape(genres_str)
+
+    # Protéger "Stage & Screen" en le remplaçant temporairement
+    placeholder = "___STAGE_AND_SCREEN___"
+    genres = genres.replace("Stage & Screen", placeholder)
+
+    # Maintenant supprimer tous les autres "&"
+    genres = genres.replace(' & ', ', ')
+    genres = genres.replace('&', ',')
+
+    # Restaurer "Stage & Screen"
+    genres = genres.replace(placeholder, "Stage & Screen")
+
+    # Séparer les genres pour supprimer les doublons
+    genres_list = [g.strip() for g in genres.split(',')]
+
+    # Supprimer les doublons tout en gardant l'ordre
+    genres_uniques = []
+    for genre in genres_list:
+        if genre and genre not in genres_uniques:
+            genres_uniques.append(genre)
+
+    return ', '.join(genres_uniques)
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def nettoyer_prix(prix_str):
+
+    # Prix avec un point décimal et sans séparateur de milliers, pour Excel
+    # Exemples : "1 234,56 €" => "1234.56", "$1,234.56" => "1234.56", "12,00 €" => "12.00"
+
+    if not prix_str:
+        return ""
+
+    # Décoder les entités HTML, puis ne garder que chiffres et séparateurs
+    # (devises €, $, £, "CA$"..., espaces et espaces insécables)
+    prix = RE_NON_NUMERIQUE.sub('', html.unescape(prix_str))
+
+    # Séparateur décimal : le dernier "," ou "." suivi de 1 ou 2 chiffres ; les autres sont des milliers
+    match = RE_DECIMALES.search(prix)
+    if match is None:
+        return RE_SEPARATEURS.sub('', prix)
+    return f"{RE_SEPARATEURS.sub('', prix[:match.start()])}.{match.group(1)}"
+
+def nettoyer_nombre(nombre_str):
+
+    # Compteur (collection, wantlist, notes) : entier, chiffres seuls
+    # Exemples : "76 309" (fr) et "76,309" (en) deviennent "76309"
+
+    if not nombre_str:
+        return ""
+
+    return RE_NON_CHIFFRE.sub('', nombre_str)
+
+def nettoyer_note(note_str):
+
+    # Garde la note sur 5 avec un point décimal
+    # Exemple : "4,41 / 5" devient "4.41"
+
+    if not note_str:
+        return ""
+
+    match = RE_NOTE.search(note_str)
+    return match.group(1).replace(',', '.') if match else ""
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def nettoyer_pays(pays_str):
+
+    # Nettoie les pays en supprimant les espaces en trop ET les "&"
+    # Exemple : "UK, Europe & US" => "UK, Europe, US"
+
+    if not pays_str:
+        return ""
+
+    # Décoder HTML et nettoyer
+    pays = html.unescape(pays_str)
+
+    # Supprimer tous les "&" et les remplacer par des virgules
+    pays = pays.replace(' & ', ', ')
+    pays = pays.replace('&', ',')
+
+    # Nettoyer les virgules multiples et espaces
+    pays = RE_VIRGULES_MULTIPLES.sub(',', pays)  # Supprimer virgules multiples
+    pays = RE_ESPACES.sub(' ', pays)             # Espaces multiples
+    pays = pays.strip().strip(',')               # Espaces et virgules en début/fin
+
+    return pays
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def formater_date_pour_excel(date_str):
+
+    # Convertit TOUTES les dates au format JJ/MM/AAAA pour Excel
+
+    if not date_str:
+        return ""
+
+    try:
+        date_str = date_str.strip()
+
+        # Si c'est juste une année (4 chiffres)
+        if RE_ANNEE.match(date_str):
+            return f"01/01/{date_str}"
+
+        # Si c'est déjà au bon format JJ/MM/AAAA
+        if RE_DATE_EXCEL.match(date_str):
+            return date_str
+
+        # Pattern pour "22 oct. 2012" ou "4 nov. 2016" ou "15 Dec 2023"
+        match_jour_mois_annee = RE_JOUR_MOIS_ANNEE.search(date_str)
+        if match_jour_mois_annee:
+            jour = match_jour_mois_annee.group(1).zfill(2)
+            mois_txt = match_jour_mois_annee.group(2).lower().rstrip('.')
+            annee = match_jour_mois_annee.group(3)
+
+            if mois_txt in MOIS:
+                return f"{jour}/{MOIS[mois_txt]}/{annee}"
+
+        # Pattern anglais "Aug 28, 2007" ou "Oct. 4 2016"
+        match_mois_jour_annee = RE_MOIS_JOUR_ANNEE.search(date_str)
+        if match_mois_jour_annee:
+            mois_txt = match_mois_jour_annee.group(1).lower()
+            jour = match_mois_jour_annee.group(2).zfill(2)
+            annee = match_mois_jour_annee.group(3)
+
+            if mois_txt in MOIS:
+                return f"{jour}/{MOIS[mois_txt]}/{annee}"
+
+        # Pattern pour "oct. 2012" ou "nov 2016" (sans jour)
+        match_mois_annee = RE_MOIS_ANNEE.search(date_str)
+        if match_mois_annee:
+            mois_txt = match_mois_annee.group(1).lower().rstrip('.')
+            annee = match_mois_annee.group(2)
+
+            if mois_txt in MOIS:
+                return f"01/{MOIS[mois_txt]}/{annee}"
+
+        # Pattern pour format ISO "2023-05-15"
+        match_iso = RE_DATE_ISO.search(date_str)
+        if match_iso:
+            annee = match_iso.group(1)
+            mois = match_iso.group(2)
+            jour = match_iso.group(3)
+            return f"{jour}/{mois}/{annee}"
+
+        # Si rien ne marche, retourner tel quel
+        return date_str
+
+    except Exception as e:
+        return date_str
+
+def formater_derniere_vente(date_str):
+
+    # Formate spécifiquement les dates de dernière vente
+    # Exemple : "il y a 3 jours" => date calculée, "Dec 2023" => "01/12/2023"
+    # Pas de cache ici : les dates relatives dépendent du jour d'exécution
+    # (les dates absolues passent par formater_date_pour_excel, qui est en cache)
+
+    if not date_str:
+        return ""
+
+    date_str = date_str.strip().lower()
+
+    # Gérer les dates relatives
+    if 'il y a' in date_str or 'ago' in date_str:
+        aujourd_hui = datetime.now()
+
+        # "il y a X jours"
+        match_jours = RE_IL_Y_A_JOURS.search(date_str)
+        if match_jours:
+            jours = int(match_jours.group(1))
+            date_vente = aujourd_hui - timedelta(days=jours)
+            return date_vente.strftime("%d/%m/%Y")
+
+        # "il y a X mois"
+        match_mois = RE_IL_Y_A_MOIS.search(date_str)
+        if match_mois:
+            mois = int(match_mois.group(1))
+            # Approximation : 1 mois = 30 jours
+            date_vente = aujourd_hui - timedelta(days=mois*30)
+            return date_vente.strftime("%d/%m/%Y")
+
+    # Sinon utiliser la fonction générale
+    return formater_date_pour_excel(date_str)
+
+# Fonctions mémorisées (pour les statistiques et le vidage des caches)
+FONCTIONS_EN_CACHE = [nettoyer_artiste, nettoyer_label, nettoyer_format, nettoyer_genres,
+                      nettoyer_prix, nettoyer_pays, formater_date_pour_excel]
+
+def statistiques_cache():
+
+    # Retourne {nom_fonction: (hits, misses, taille)} pour chaque fonction en cache
+
+    stats = {}
+    for fonction in FONCTIONS_EN_CACHE:
+        info = fonction.cache_info()
+        stats[fonction.__name__] = (info.hits, info.misses, info.currsize)
+    return stats
+
+def vider_caches():
+    for fonction in FONCTIONS_EN_CACHE:
+        fonction.cache_clear()
@@ -0,0 +1,134 @@
+import csv
+import heapq
+import itertools
+import os
+import time
+
+import configuration as config
+from historique import HistoriqueStats
+
+# -----------------------------------------------------------------------------
+# ORDONNANCEMENT DE L'ENRICHISSEMENT PAR PRIORITÉ
+# -----------------------------------------------------------------------------
+#
+# Parcourir les albums dans l'ordre du catalogue fait qu'un run interrompu a
+# pu enrichir des lignes peu utiles et manquer les plus importantes. Chaque
+# album reçoit un score (plus haut = plus utile) :
+#   rang       : position dans le catalogue (les plus collectionnés d'abord)
+#   ancienneté : temps depuis la dernière visite de la page album (historique.py,
+#                jamais visité = maximum)
+#   champs vides : proportion des colonnes de la page album restées vides au
+#                  run précédent (discogs_albums_final.csv, jamais enrichi = maximum)
+# et un tas (heapq) les sert du plus utile au moins utile, dans la limite
+# d'un budget de temps ou d'une échéance.
+
+def poids_par_defaut():
+    if not config.ORDONNANCEMENT_PRIORITE:
+        # Ordre du catalogue
+        return {'rang': 1.0, 'anciennete': 0.0, 'champs_vides': 0.0}
+    return {'rang': config.POIDS_RANG, 'anciennete': config.POIDS_ANCIENNETE,
+            'champs_vides': config.POIDS_CHAMPS_VIDES}
+
+class Ordonnanceur:
+
+    def __init__(self, champs, dernieres_visites=None, poids=None, champs_vides=None):
+
+        # champs : colonnes remplies par la page album (pour compter les vides)
+        # dernieres_visites : {url: timestamp de la dernière visite}
+        # champs_vides : {url: proportion des champs vides au run précédent}
+
+        self.champs = champs
+        self.dernieres_visites = dernieres_visites or {}
+        self.champs_vides = champs_vides or {}
+        self.poids = poids or poids_par_defaut()
+        self._tas = []
+        # Départage les scores égaux dans l'ordre d'ajout
+        self._sequence = itertools.count()
+        self.restants = 0
+
+    def score(self, album, rang, total, maintenant=None):
+        maintenant = maintenant or time.time()
+
+        score_rang = 1 - rang / max(total, 1)
+
+        derniere_visite = self.dernieres_visites.get(album['url'])
+        if derniere_visite is None:
+            score_anciennete = 1.0
+        else:
+            score_anciennete = min((maintenant - derniere_visite) / (config.ANCIENNETE_MAX_JOURS * 86400), 1.0)
+
+        # Avant la visite, l'album n'a que les colonnes du catalogue : les vides
+        # viennent du run précédent, sinon de l'album lui-même (déjà enrichi)
+        score_vides = self._proportion_vides(album)
+        if score_vides == 1.0:
+            score_vides = self.champs_vides.get(album['url'], 1.0)
+
+        return (self.poids['rang'] * score_rang
+                + self.poids['anciennete'] * score_anciennete
+                + self.poids['champs_vides'] * score_vides)
+
+    def _proportion_vides(self, album):
+        return sum(1 for champ in self.champs if not album.get(champ)) / max(len(self.champs), 1)
+
+    def ajouter_tous(self, albums):
+
+        # Le rang est la position dans la liste (ordre du catalogue = popularité)
+
+        maintenant = time.time()
+        total = len(albums)
+        for rang, album in enumerate(albums):
+            # heapq est un tas min : score négatif pour servir le plus utile d'abord
+            heapq.heappush(self._tas, (-self.score(album, rang, total, maintenant),
+                                       next(self._sequence), album))
+        self.restants = len(self._tas)
+
+    def iterer(self, budget_s=None, echeance=None, pages_max=None):
+
+        # Produit les albums du plus utile au moins utile
+        # S'arrête avant de dépasser le budget (secondes) ou l'échéance (timestamp),
+        # en estimant la durée d'une page d'après celles déjà traitées
+
+        debut = time.time()
+        fins = [f for f in (debut + budget_s if budget_s else None, echeance) if f]
+        fin = min(fins) if fins else None
+        traites = 0
+
+        while self._tas:
+            if pages_max is not None and traites >= pages_max:
+                break
+            if fin is not None:
+                maintenant = time.time()
+                duree_moyenne = (maintenant - debut) / traites if traites else 0
+                if maintenant + duree_moyenne > fin:
+                    break
+            _, _, album = heapq.heappop(self._tas)
+            self.restants = len(self._tas)
+            yield album
+            traites += 1
+
+    def __len__(self):
+        return len(self._tas)
+
+def dernieres_visites_depuis_historique(chemin=None):
+
+    # {url: date de la dernière visite de sa page album}, relevée par historique.py
+    # Sans historique, aucune date : tous les albums comptent comme jamais visités
+
+    chemin = chemin or config.FICHIER_HISTORIQUE
+    if not os.path.exists(chemin):
+        return {}
+    historique = HistoriqueStats(chemin)
+    try:
+        return historique.dernieres_visites()
+    finally:
+        historique.fermer()
+
+def champs_vides_depuis_csv(champs, nom_fichier='discogs_albums_final.csv'):
+
+    # {url: proportion des champs de la page album vides} pour chaque ligne du run précédent
+
+    if not os.path.exists(nom_fichier):
+        return {}
+    with open(nom_fichier, newline='', encoding='utf-8') as csvfile:
+        return {ligne['url']: sum(1 for champ in champs if not ligne.get(champ)) / max(len(champs), 1)
+                for ligne in csv.DictReader(csvfile) if ligne.get('url')}
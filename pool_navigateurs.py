@@ -0,0 +1,225 @@
+import asyncio
+import itertools
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+import configuration as config
+
+# -----------------------------------------------------------------------------
+# POOL DE NAVIGATEURS (réutilisation + recyclage)
+# -----------------------------------------------------------------------------
+#
+# Lancer un Chromium par page coûte ~1s et beaucoup de CPU ; réutiliser le même
+# navigateur pendant 36h fait gonfler sa mémoire. Le pool garde TAILLE_POOL
+# navigateurs ouverts et recycle (ferme puis relance) chacun :
+#   - après POOL_PAGES_MAX pages servies,
+#   - quand la RSS totale des processus navigateur dépasse POOL_RSS_MAX_MO,
+#   - quand il ne répond plus (contrôle de santé) ou après une erreur de chargement,
+#   - quand son chargement a été annulé (relance perdante) : page dans un état inconnu.
+#
+# Les objets Playwright sont liés à leur boucle d'événements : un pool par boucle.
+
+def rss_navigateurs_mo():
+
+    # RSS totale des processus enfants (Chromium), None si psutil est absent
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    total = 0
+    for enfant in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            total += enfant.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / 1024 / 1024
+
+class _Contexte:
+
+    # Un navigateur du pool et son compteur de pages
+
+    _numeros = itertools.count(1)
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.numero = next(self._numeros)
+        self.pages = 0
+        self.cree_le = time.monotonic()
+        # False après une annulation en plein chargement : à fermer, jamais remis au pool
+        self.utilisable = True
+
+class PoolNavigateurs:
+
+    def __init__(self, creer_crawler, taille=None, pages_max=None, rss_max_mo=None):
+
+        # creer_crawler : coroutine qui retourne un crawler démarré (AsyncWebCrawler)
+
+        self.creer_crawler = creer_crawler
+        self.taille = taille or config.TAILLE_POOL
+        self.pages_max = pages_max or config.POOL_PAGES_MAX
+        self.rss_max_mo = rss_max_mo or config.POOL_RSS_MAX_MO
+        # Une place par navigateur utilisable en même temps
+        self._places = asyncio.Semaphore(self.taille)
+        self._libres = asyncio.Queue()
+        self.en_cours = 0
+        self.crees = 0
+        self.recycles = {}
+        self.pages_servies = 0
+        self.rss_max_observee_mo = 0.0
+
+    async def _creer(self):
+        contexte = _Contexte(await self.creer_crawler())
+        self.crees += 1
+        return contexte
+
+    async def _fermer(self, contexte):
+        try:
+            await contexte.crawler.close()
+        except Exception as e:
+            print(f"    Pool : fermeture du navigateur {contexte.numero} impossible ({e})")
+
+    async def _recycler(self, contexte, motif):
+        self.recycles[motif] = self.recycles.get(motif, 0) + 1
+        await self._fermer(contexte)
+
+    @staticmethod
+    def _en_bonne_sante(contexte):
+
+        # Navigateur toujours connecté (si l'information est accessible)
+
+        strategie = getattr(contexte.crawler, 'crawler_strategy', None)
+        gestionnaire = getattr(strategie, 'browser_manager', None)
+        navigateur = getattr(gestionnaire, 'browser', None)
+        if navigateur is None or not hasattr(navigateur, 'is_connected'):
+            return True
+        return navigateur.is_connected()
+
+    async def acquerir(self):
+
+        # Attendre une place, puis prendre un navigateur libre ou en lancer un nouveau
+
+        await self._places.acquire()
+        try:
+            while True:
+                if self._libres.empty():
+                    contexte = await self._creer()
+                else:
+                    contexte = self._libres.get_nowait()
+                    if not self._en_bonne_sante(contexte):
+                        await self._recycler(contexte, 'sante')
+                        continue
+                self.en_cours += 1
+                return contexte
+        except BaseException:
+            self._places.release()
+            raise
+
+    async def liberer(self, contexte, erreur=False):
+        try:
+            await self._rendre(contexte, erreur)
+        finally:
+            self._places.release()
+
+    async def _rendre(self, contexte, erreur):
+        self.en_cours -= 1
+        contexte.pages += 1
+        self.pages_servies += 1
+
+        if not contexte.utilisable:
+            await self._recycler(contexte, 'annulation')
+            return
+        if erreur:
+            await self._recycler(contexte, 'erreur')
+            return
+        if contexte.pages >= self.pages_max:
+            await self._recycler(contexte, 'pages')
+            return
+
+        # Mesure de la RSS espacée (parcours des processus enfants)
+        if self.pages_servies % config.POOL_VERIFICATION_RSS == 0:
+            rss = rss_navigateurs_mo()
+            if rss is not None:
+                self.rss_max_observee_mo = max(self.rss_max_observee_mo, rss)
+                if rss > self.rss_max_mo:
+                    await self._recycler(contexte, 'memoire')
+                    return
+
+        self._libres.put_nowait(contexte)
+
+    @asynccontextmanager
+    async def navigateur(self):
+
+        # async with pool.navigateur() as crawler: ...
+        # Une exception pendant le chargement recycle le navigateur utilisé
+        # Une annulation le marque inutilisable ; sa fermeture est protégée
+        # pour aller à son terme même si la tâche annulée est de nouveau annulée
+
+        contexte = await self.acquerir()
+        try:
+            yield contexte.crawler
+        except asyncio.CancelledError:
+            contexte.utilisable = False
+            await asyncio.shield(self.liberer(contexte))
+            raise
+        except BaseException:
+            await self.liberer(contexte, erreur=True)
+            raise
+        await self.liberer(contexte)
+
+    async def fermer(self):
+        while not self._libres.empty():
+            await self._fermer(self._libres.get_nowait())
+
+    def statistiques(self):
+        return {
+            'taille': self.taille,
+            'en_cours': self.en_cours,
+            'libres': self._libres.qsize(),
+            'crees': self.crees,
+            'recycles': dict(self.recycles),
+            'pages_servies': self.pages_servies,
+            'rss_max_observee_mo': round(self.rss_max_observee_mo, 1),
+        }
+
+# -----------------------------------------------------------------------------
+# UN POOL PAR BOUCLE D'ÉVÉNEMENTS
+# -----------------------------------------------------------------------------
+
+_pools = weakref.WeakKeyDictionary()
+
+def pool_de_la_boucle(creer_crawler):
+
+    # Pool de la boucle courante (créé au premier appel)
+
+    boucle = asyncio.get_running_loop()
+    pool = _pools.get(boucle)
+    if pool is None:
+        pool = _pools[boucle] = PoolNavigateurs(creer_crawler)
+    return pool
+
+async def fermer_pool():
+
+    # Ferme les navigateurs du pool de la boucle courante (fin de run)
+
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.fermer()
+    return pool
+
+def statistiques_pools():
+
+    # Statistiques cumulées de tous les pools encore ouverts
+
+    total = {'en_cours': 0, 'libres': 0, 'crees': 0, 'recycles': {}, 'pages_servies': 0,
+             'rss_max_observee_mo': 0.0}
+    for pool in list(_pools.values()):
+        stats = pool.statistiques()
+        for cle in ('en_cours', 'libres', 'crees', 'pages_servies'):
+            total[cle] += stats[cle]
+        for motif, nombre in stats['recycles'].items():
+            total['recycles'][motif] = total['recycles'].get(motif, 0) + nombre
+        total['rss_max_observee_mo'] = max(total['rss_max_observee_mo'], stats['rss_max_observee_mo'])
+    return total
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from nettoyage import (nettoyer_artiste, nettoyer_album, nettoyer_label, nettoyer_format,
+                       nettoyer_genres, nettoyer_pays, formater_date_pour_excel,
+                       formater_derniere_vente)
+
+# -----------------------------------------------------------------------------
+# POST-TRAITEMENT PAR LOT (colonne par colonne)
+# -----------------------------------------------------------------------------
+#
+# Nettoie en une seule passe les valeurs brutes extraites avec nettoyer=False
+# (voir extraire_infos_completes_album), en dehors de la boucle de scraping :
+# - colonnes texte : chaque valeur DISTINCTE n'est nettoyée qu'une fois
+#   (pd.factorize), puis le résultat est redistribué sur toute la colonne
+# - colonnes numériques : opérations vectorisées pandas (.str) => colonnes typées
+
+# Colonnes texte brutes de la page album => fonction de nettoyage
+COLONNES_TEXTE = {
+    'label': nettoyer_label,
+    'format': nettoyer_format,
+    'pays': nettoyer_pays,
+    'date_sortie': formater_date_pour_excel,
+    'genres': nettoyer_genres,
+    'derniere_vente': formater_derniere_vente,
+}
+
+# Colonnes du catalogue, à ajouter si l'étape 1 a aussi été faite en mode brut
+COLONNES_TEXTE_CATALOGUE = {
+    'artiste': nettoyer_artiste,
+    'album': nettoyer_album,
+}
+
+COLONNES_ENTIERES = ['en_collection', 'en_wantlist', 'nombre_notes']
+COLONNES_PRIX = ['prix_faible', 'prix_moyen', 'prix_eleve']
+
+def _nettoyer_colonne_texte(colonne, nettoyeur):
+
+    # Nettoie une colonne texte en n'appelant le nettoyeur qu'une fois par valeur distincte
+
+    codes, valeurs_distinctes = pd.factorize(colonne, use_na_sentinel=True)
+    valeurs_nettoyees = np.array([nettoyeur(v) for v in valeurs_distinctes] + [""], dtype=object)
+    # Le code -1 (valeur manquante) pointe sur la dernière case : ""
+    return pd.Series(valeurs_nettoyees[codes], index=colonne.index, dtype=object)
+
+def _vers_entiers(colonne):
+
+    # "76 309" => 76309 (Int64, valeurs manquantes => <NA>)
+
+    chiffres = colonne.astype('string').str.replace(r'\D', '', regex=True)
+    return pd.to_numeric(chiffres.replace('', pd.NA), errors='coerce').astype('Int64')
+
+def _vers_note(colonne):
+
+    # "4,41 / 5" => 4.41
+
+    note = colonne.astype('string').str.extract(r'(\d+[.,]\d+)', expand=False)
+    return pd.to_numeric(note.str.replace(',', '.', regex=False), errors='coerce').astype('Float64')
+
+def _vers_prix(colonne):
+
+    # "1 250,00 €" (fr) ou "$1,250.00" (en) => 1250.0
+    # Comme nettoyer_prix : le dernier séparateur suivi de 1 ou 2 chiffres est décimal
+
+    prix = colonne.astype('string').str.replace(r'[^\d.,]', '', regex=True)
+    prix = (prix.str.replace(r'[.,](?=.*[.,]\d{1,2}$)|[.,](?!\d{1,2}$)', '', regex=True)
+            .str.replace(',', '.', regex=False))
+    return pd.to_numeric(prix.replace('', pd.NA), errors='coerce').astype('Float64')
+
+def post_traiter_colonnes(albums, inclure_catalogue=False):
+
+    # Transforme une liste d'albums bruts en DataFrame nettoyé et typé
+    # inclure_catalogue=True : nettoie aussi artiste/album (étape 1 en mode brut)
+
+    tableau = pd.DataFrame([dict(album) for album in albums])
+
+    nettoyeurs = dict(COLONNES_TEXTE)
+    if inclure_catalogue:
+        nettoyeurs.update(COLONNES_TEXTE_CATALOGUE)
+
+    for nom, nettoyeur in nettoyeurs.items():
+        if nom in tableau:
+            tableau[nom] = _nettoyer_colonne_texte(tableau[nom], nettoyeur)
+
+    for nom in COLONNES_ENTIERES:
+        if nom in tableau:
+            tableau[nom] = _vers_entiers(tableau[nom])
+
+    if 'note_moyenne' in tableau:
+        tableau['note_moyenne'] = _vers_note(tableau['note_moyenne'])
+
+    for nom in COLONNES_PRIX:
+        if nom in tableau:
+            tableau[nom] = _vers_prix(tableau[nom])
+
+    if 'annee' in tableau:
+        tableau['annee'] = _vers_entiers(tableau['annee'])
+
+    return tableau
+
+def albums_depuis_tableau(tableau):
+
+    # DataFrame post-traité => liste d'albums (dicts) pour les autres sorties
+    # (tables d'entités, historique) : valeurs Python, manquantes => ""
+
+    return tableau.astype(object).where(tableau.notna(), '').to_dict('records')
+
+def sauvegarder_csv_post_traite(tableau, nom_fichier='discogs_albums_enrichi.csv', colonnes=None):
+
+    # Même format de CSV que sauvegarder_csv_enrichi (valeurs manquantes => vide)
+
+    if tableau.empty:
+        return
+
+    if colonnes:
+        tableau = tableau.reindex(columns=colonnes)
+
+    tableau.to_csv(nom_fichier, index=False, encoding='utf-8', na_rep='', float_format='%.2f')
+
+    print(f"  ✓ {len(tableau)} albums sauvegardés dans '{nom_fichier}'")
@@ -0,0 +1,360 @@
+import atexit
+import cProfile
+import functools
+import importlib
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import configuration as config
+
+# -----------------------------------------------------------------------------
+# PROFILAGE PAR ÉTAPE (python main.py --profile)
+# -----------------------------------------------------------------------------
+#
+# Un run lent : navigateur, BeautifulSoup, nettoyage ou écriture du CSV ?
+# Les fonctions de chaque étape sont enveloppées le temps du run :
+#   fetch    téléchargement (crawl_get, http_get et leurs versions async)
+#   parse    construction de l'arbre BeautifulSoup
+#   extract  extracteurs (hors parse et clean, comptés à part)
+#   clean    fonctions de nettoyage.py, post-traitement par lot
+#   write    sauvegardes CSV, tables d'entités, historique
+# Pour chaque étape :
+#   - temps propre (sans les étapes imbriquées) et nombre d'appels
+#   - cProfile (fil principal) : <étape>.pstats et <étape>.txt
+#   - échantillonnage de toutes les piles toutes les PROFIL_INTERVALLE_MS :
+#     piles.collapsed, une ligne "étape;module:fonction;... nombre" par pile,
+#     lisible par flamegraph.pl ou speedscope (le fil d'arrière-plan des
+#     téléchargements y apparaît aussi, ce que cProfile ne voit pas)
+#   - tracemalloc : mémoire nette et pic par étape ; lignes de code qui ont
+#     alloué la mémoire retenue en sortie d'étape, sur un appel sur
+#     PROFIL_ECHANTILLON_MEMOIRE (allocations.txt). Les clichés coûtent cher :
+#     leur temps est exclu des étapes et apparaît à part ("profilage")
+# Sans --profile rien n'est enveloppé : aucun coût.
+
+# (module, fonction ou Classe.méthode) par étape
+ETAPES = {
+    'fetch': [('reseau', 'crawl_get'), ('reseau', 'http_get'),
+              ('reseau', 'crawl_get_async'), ('reseau', 'http_get_async')],
+    'parse': [('bs4', 'BeautifulSoup.__init__')],
+    'extract': [('extraction', 'extraire_infos_catalogue'), ('extraction', 'extraire_infos_completes_album'),
+                ('extraction', 'extraire_liens_discographie'), ('extraction', 'extraire_titre_release')],
+    'clean': [('nettoyage', 'nettoyer_artiste'), ('nettoyage', 'nettoyer_album'),
+              ('nettoyage', 'nettoyer_label'), ('nettoyage', 'nettoyer_format'),
+              ('nettoyage', 'nettoyer_genres'), ('nettoyage', 'nettoyer_prix'),
+              ('nettoyage', 'nettoyer_nombre'), ('nettoyage', 'nettoyer_note'),
+              ('nettoyage', 'nettoyer_pays'), ('nettoyage', 'formater_date_pour_excel'),
+              ('nettoyage', 'formater_derniere_vente'), ('post_traitement', 'post_traiter_colonnes')],
+    'write': [('main', 'sauvegarder_csv'), ('main', 'sauvegarder_csv_enrichi'), ('main', 'sauvegarder_urls'),
+              ('post_traitement', 'sauvegarder_csv_post_traite'), ('entites', 'sauvegarder_tables_entites'),
+              ('historique', 'HistoriqueStats.enregistrer_releve')],
+}
+
+# Allocations affichées par étape
+TOP_ALLOCATIONS = 15
+
+def _module(nom):
+
+    # Module déjà chargé, main.py lancé en script compris ; import des modules optionnels
+
+    if nom == 'main':
+        principal = sys.modules.get('__main__')
+        if getattr(principal, '__file__', '').endswith('main.py'):
+            return principal
+    try:
+        return importlib.import_module(nom)
+    except ImportError:
+        # Dépendance optionnelle absente (pandas pour post_traitement) : étape non enveloppée
+        return None
+
+class Profileur:
+
+    def __init__(self, dossier=None, intervalle_ms=None, echantillon_memoire=None):
+        self.dossier = dossier or config.DOSSIER_PROFIL
+        self.intervalle_s = (intervalle_ms or config.PROFIL_INTERVALLE_MS) / 1000
+        self.echantillon_memoire = echantillon_memoire or config.PROFIL_ECHANTILLON_MEMOIRE
+
+        self.profils = {etape: cProfile.Profile() for etape in ETAPES}
+        self.temps = Counter()
+        self.appels = Counter()
+        self.piles = Counter()
+        # {étape: Counter("fichier:ligne" => octets retenus)}
+        self.allocations = {etape: Counter() for etape in ETAPES}
+        self.mesures_memoire = Counter()
+        # Octets (fil principal) : mémoire gardée en sortie, pic au-dessus de l'entrée
+        self.memoire_nette = Counter()
+        self.pic_memoire = Counter()
+
+        # {code de la fonction d'origine: étape}, pour classer les piles échantillonnées
+        self._etape_par_code = {}
+        self._originaux = []
+        self._local = threading.local()
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._echantillonneur = None
+        self._debut = None
+        self._termine = False
+
+    # --- Enveloppes ----------------------------------------------------------
+
+    def instrumenter(self):
+
+        # Remplace chaque fonction d'étape par son enveloppe, dans son module
+        # ET dans les modules qui l'ont importée ("from extraction import ...")
+
+        remplacements = {}
+        for etape, cibles in ETAPES.items():
+            for nom_module, nom in cibles:
+                module = _module(nom_module)
+                if module is None:
+                    continue
+                proprietaire, attribut = module, nom
+                if '.' in nom:
+                    nom_classe, attribut = nom.split('.')
+                    proprietaire = getattr(module, nom_classe, None)
+                fonction = getattr(proprietaire, attribut, None)
+                if fonction is None or fonction in remplacements:
+                    continue
+                enveloppe = self._envelopper(etape, fonction)
+                remplacements[fonction] = enveloppe
+                self._etape_par_code[inspect.unwrap(fonction).__code__] = etape
+                self._originaux.append((proprietaire, attribut, fonction))
+                setattr(proprietaire, attribut, enveloppe)
+
+        for module in list(sys.modules.values()):
+            for attribut, valeur in list(getattr(module, '__dict__', {}).items()):
+                try:
+                    enveloppe = remplacements.get(valeur)
+                except TypeError:
+                    # Valeur non hachable
+                    continue
+                if enveloppe is not None:
+                    self._originaux.append((module, attribut, valeur))
+                    setattr(module, attribut, enveloppe)
+
+    def _envelopper(self, etape, fonction):
+        if inspect.iscoroutinefunction(fonction):
+            # Coroutines : plusieurs tâches entrelacées sur une boucle, seul le temps est compté
+            # (les piles échantillonnées les classent d'après leur code). Appelée depuis
+            # l'enveloppe bloquante de la même étape (crawl_get => crawl_get_async) :
+            # déjà comptée, la coroutine est rendue telle quelle
+            async def _compter(coroutine):
+                debut = time.perf_counter()
+                try:
+                    return await coroutine
+                finally:
+                    with self._verrou:
+                        self.temps[etape] += time.perf_counter() - debut
+                        self.appels[etape] += 1
+
+            @functools.wraps(fonction)
+            def enveloppe_async(*args, **kwargs):
+                pile = getattr(self._local, 'pile', None)
+                if pile and pile[-1][0] == etape:
+                    return fonction(*args, **kwargs)
+                return _compter(fonction(*args, **kwargs))
+            return enveloppe_async
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            self._entrer(etape)
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                self._sortir()
+        return enveloppe
+
+    def _entrer(self, etape):
+
+        # Pile des étapes du fil : l'étape englobante est suspendue (temps et cProfile propres)
+        # Fil principal seulement : cProfile, mémoire nette et pic (tracemalloc est global)
+
+        pile = getattr(self._local, 'pile', None)
+        if pile is None:
+            pile = self._local.pile = []
+        principal = threading.current_thread() is threading.main_thread()
+
+        if principal and pile:
+            self.profils[pile[-1][0]].disable()
+
+        with self._verrou:
+            self.appels[etape] += 1
+            mesurer = (principal and (self.appels[etape] - 1) % self.echantillon_memoire == 0
+                       and self.appels[etape] <= self.echantillon_memoire * config.PROFIL_CLICHES_MAX)
+
+        cliche = None
+        memoire = 0
+        if principal and tracemalloc.is_tracing():
+            if mesurer:
+                debut_cliche = time.perf_counter()
+                cliche = tracemalloc.take_snapshot()
+                # Le temps des clichés n'est compté dans aucune étape
+                if pile:
+                    pile[-1][2] += time.perf_counter() - debut_cliche
+            memoire, pic = tracemalloc.get_traced_memory()
+            if pile:
+                # Pic de l'étape englobante jusqu'ici, avant remise à zéro pour celle-ci
+                pile[-1][5] = max(pile[-1][5], pic)
+            tracemalloc.reset_peak()
+
+        pile.append([etape, time.perf_counter(), 0.0, cliche, memoire, memoire])
+        if principal:
+            self.profils[etape].enable()
+
+    def _sortir(self):
+        pile = self._local.pile
+        etape, debut, enfants, cliche, memoire_debut, pic = pile.pop()
+        principal = threading.current_thread() is threading.main_thread()
+        if principal:
+            self.profils[etape].disable()
+
+        fin = time.perf_counter()
+        if principal and tracemalloc.is_tracing():
+            memoire, pic_courant = tracemalloc.get_traced_memory()
+            pic = max(pic, pic_courant)
+            with self._verrou:
+                self.memoire_nette[etape] += memoire - memoire_debut
+                self.pic_memoire[etape] = max(self.pic_memoire[etape], pic - memoire_debut)
+            if pile:
+                pile[-1][5] = max(pile[-1][5], pic)
+            if cliche is not None:
+                self._mesurer_memoire(etape, cliche)
+
+        with self._verrou:
+            self.temps[etape] += fin - debut - enfants
+        if pile:
+            # Durée de l'étape imbriquée et de son cliché de sortie, retirées du temps propre du parent
+            pile[-1][2] += time.perf_counter() - debut
+            if principal:
+                self.profils[pile[-1][0]].enable()
+
+    def _mesurer_memoire(self, etape, avant):
+
+        # Lignes qui ont alloué la mémoire encore retenue en sortie d'étape
+
+        differences = tracemalloc.take_snapshot().compare_to(avant, 'lineno')
+        with self._verrou:
+            self.mesures_memoire[etape] += 1
+            for difference in differences:
+                trame = difference.traceback[0]
+                if difference.size_diff > 0 and trame.filename not in (tracemalloc.__file__, __file__):
+                    self.allocations[etape][f"{trame.filename}:{trame.lineno}"] += difference.size_diff
+
+    # --- Échantillonnage des piles -------------------------------------------
+
+    def _echantillonner(self):
+        moi = threading.get_ident()
+        principal = threading.main_thread().ident
+        while not self._arret.wait(self.intervalle_s):
+            for ident, cadre in sys._current_frames().items():
+                if ident == moi:
+                    continue
+                noms = []
+                etape = None
+                while cadre is not None:
+                    module = cadre.f_globals.get('__name__', '?')
+                    if module == 'tracemalloc':
+                        # Clichés du profileur : coût de la mesure, hors étapes
+                        etape = 'profilage'
+                    elif etape is None:
+                        etape = self._etape_par_code.get(cadre.f_code)
+                    if module != __name__:
+                        noms.append(f"{module}:{cadre.f_code.co_name}")
+                    cadre = cadre.f_back
+                # Fils secondaires inactifs (attente de la boucle, du pool) : ignorés
+                if etape is None and ident != principal:
+                    continue
+                noms.append(etape or 'autre')
+                self.piles[';'.join(reversed(noms))] += 1
+
+    # --- Démarrage et rapport ------------------------------------------------
+
+    def demarrer(self):
+        self.instrumenter()
+        tracemalloc.start(config.PROFIL_PROFONDEUR_TRACEMALLOC)
+        self._echantillonneur = threading.Thread(target=self._echantillonner, daemon=True,
+                                                 name='profilage')
+        self._echantillonneur.start()
+        self._debut = time.perf_counter()
+        # Rapport écrit même si le run s'arrête en cours (exit(), Ctrl+C)
+        atexit.register(self.terminer)
+
+    def arreter(self):
+
+        # Remet les fonctions d'origine, arrête l'échantillonnage et tracemalloc
+
+        self._arret.set()
+        if self._echantillonneur is not None:
+            self._echantillonneur.join()
+        for proprietaire, attribut, fonction in reversed(self._originaux):
+            setattr(proprietaire, attribut, fonction)
+        self._originaux = []
+        for profil in self.profils.values():
+            profil.disable()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def ecrire(self):
+
+        # Fichiers de résultats dans self.dossier ; retourne {étape: (secondes, appels)}
+
+        os.makedirs(self.dossier, exist_ok=True)
+
+        for etape, profil in self.profils.items():
+            if not self.appels[etape]:
+                continue
+            profil.dump_stats(os.path.join(self.dossier, f'{etape}.pstats'))
+            sortie = io.StringIO()
+            pstats.Stats(profil, stream=sortie).sort_stats('tottime').print_stats(30)
+            with open(os.path.join(self.dossier, f'{etape}.txt'), 'w', encoding='utf-8') as f:
+                f.write(sortie.getvalue())
+
+        with open(os.path.join(self.dossier, 'piles.collapsed'), 'w', encoding='utf-8') as f:
+            for pile, nombre in self.piles.most_common():
+                f.write(f"{pile} {nombre}\n")
+
+        with open(os.path.join(self.dossier, 'allocations.txt'), 'w', encoding='utf-8') as f:
+            for etape, allocations in self.allocations.items():
+                if not allocations:
+                    continue
+                f.write(f"=== {etape} : mémoire retenue en sortie d'étape "
+                        f"({self.mesures_memoire[etape]} appels mesurés sur {self.appels[etape]})\n")
+                for ligne, octets in allocations.most_common(TOP_ALLOCATIONS):
+                    f.write(f"{octets / self.mesures_memoire[etape] / 1024:10.1f} Kio/appel  {ligne}\n")
+                f.write("\n")
+
+        return {etape: (self.temps[etape], self.appels[etape]) for etape in ETAPES}
+
+    def terminer(self):
+        if self._termine:
+            return
+        self._termine = True
+        self.arreter()
+        resume = self.ecrire()
+
+        total = time.perf_counter() - self._debut
+        echantillons = sum(self.piles.values()) or 1
+        par_etape = Counter()
+        for pile, nombre in self.piles.items():
+            par_etape[pile.split(';', 1)[0]] += nombre
+
+        print(f"\n{'='*70}")
+        print(f"PROFIL PAR ÉTAPE ({total:.1f}s au total)")
+        print(f"{'='*70}")
+        print(f"{'Étape':10s} {'Temps propre':>13s} {'Part':>7s} {'Appels':>8s} {'Échantillons':>13s} "
+              f"{'Mém. nette':>11s} {'Pic':>9s}")
+        for etape, (secondes, appels) in resume.items():
+            print(f"{etape:10s} {secondes:12.2f}s {secondes / total:7.1%} {appels:8d} "
+                  f"{par_etape[etape] / echantillons:13.1%} {self.memoire_nette[etape] / 2**20:8.1f} Mo "
+                  f"{self.pic_memoire[etape] / 2**20:6.1f} Mo")
+        # Fil principal hors étapes (saisies, pauses, orchestration) et coût des clichés tracemalloc
+        for etape in ('autre', 'profilage'):
+            print(f"{etape:10s} {'':13s} {'':7s} {'':8s} {par_etape[etape] / echantillons:13.1%}")
+        print(f"\nRésultats dans '{self.dossier}/' : <étape>.pstats / <étape>.txt (cProfile), "
+              f"piles.collapsed (flamegraph), allocations.txt (tracemalloc)")
@@ -0,0 +1,244 @@
+import csv
+import re
+import sqlite3
+import unicodedata
+from array import array
+
+import numpy as np
+
+import configuration as config
+from nettoyage import nettoyer_artiste, nettoyer_album
+
+# -----------------------------------------------------------------------------
+# INDEX DE CORRESPONDANCE FLOUE ARTISTE / ALBUM
+# -----------------------------------------------------------------------------
+#
+# Retrouver "The Beatles - Abbey Road (Remastered)" parmi les albums scrapés
+# sans comparer la chaîne à chaque ligne du CSV :
+#   - clé normalisée : nettoyer_artiste / nettoyer_album, puis minuscules,
+#     sans accents ni ponctuation, "&" => "and", sans "The" initial
+#   - index exact : (clé artiste, clé album) => entrées (score 1.0 immédiat)
+#   - index inverse de trigrammes par champ : trigramme => identifiants
+# Une recherche compte les trigrammes communs sur les listes les plus
+# sélectives (les trigrammes très fréquents ne départagent presque rien),
+# puis calcule le score exact (coefficient de Dice) des meilleurs candidats.
+#
+# L'index est enregistré dans un fichier SQLite et rechargé en mémoire.
+
+RE_NON_ALPHANUMERIQUE = re.compile(r'[^\w]+')
+
+# Préfixes des trigrammes : un même trigramme d'artiste et d'album n'est pas confondu
+CHAMP_ARTISTE = 'a'
+CHAMP_ALBUM = 'l'
+
+# Candidats dont le score exact est calculé
+CANDIDATS_MAX = 30
+
+# Une liste de plus de PROPORTION_FREQUENTS x entrées n'est pas parcourue (sauf faute de mieux)
+PROPORTION_FREQUENTS = 0.02
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entrees (id INTEGER PRIMARY KEY, artiste TEXT, album TEXT, url TEXT);
+CREATE TABLE IF NOT EXISTS trigrammes (trigramme TEXT PRIMARY KEY, ids BLOB NOT NULL);
+"""
+
+def cle_normalisee(texte, nettoyeur=None):
+
+    # "Beyoncé & Jay-Z (2)" => "beyonce and jay z"
+
+    if not texte:
+        return ''
+    if nettoyeur is not None:
+        texte = nettoyeur(texte) or ''
+    texte = unicodedata.normalize('NFKD', texte.casefold())
+    texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    texte = texte.replace('&', ' and ').replace('_', ' ')
+    mots = RE_NON_ALPHANUMERIQUE.sub(' ', texte).split()
+    if len(mots) > 1 and mots[0] == 'the':
+        mots = mots[1:]
+    return ' '.join(mots)
+
+def trigrammes(cle):
+
+    # Ensemble des trigrammes de la clé, bordée d'espaces ("  abc ") pour pondérer les débuts de mots
+
+    if not cle:
+        return set()
+    bordee = f"  {cle} "
+    return {bordee[i:i + 3] for i in range(len(bordee) - 2)}
+
+def similarite(trigrammes_a, trigrammes_b):
+
+    # Coefficient de Dice : 1.0 pour des clés identiques, 0.0 sans trigramme commun
+
+    if not trigrammes_a or not trigrammes_b:
+        return 0.0
+    return 2 * len(trigrammes_a & trigrammes_b) / (len(trigrammes_a) + len(trigrammes_b))
+
+class IndexCorrespondance:
+
+    def __init__(self, entrees, listes):
+
+        # entrees : [(artiste, album, url)] ; listes : {trigramme préfixé: array d'identifiants}
+
+        self.entrees = entrees
+        self.listes = listes
+        self.cles = [(cle_normalisee(artiste, nettoyer_artiste), cle_normalisee(album, nettoyer_album))
+                     for artiste, album, _ in entrees]
+        self.exacts = {}
+        for identifiant, cles in enumerate(self.cles):
+            self.exacts.setdefault(cles, []).append(identifiant)
+        self.seuil_frequents = max(100, int(len(entrees) * PROPORTION_FREQUENTS))
+
+    @classmethod
+    def construire(cls, albums):
+
+        # Index à partir d'albums (dicts avec 'artiste', 'album', 'url')
+
+        entrees = []
+        listes = {}
+        for identifiant, album in enumerate(albums):
+            artiste, titre = album.get('artiste') or '', album.get('album') or ''
+            entrees.append((artiste, titre, album.get('url') or ''))
+            for prefixe, nettoyeur, texte in ((CHAMP_ARTISTE, nettoyer_artiste, artiste),
+                                              (CHAMP_ALBUM, nettoyer_album, titre)):
+                for trigramme in trigrammes(cle_normalisee(texte, nettoyeur)):
+                    liste = listes.get(prefixe + trigramme)
+                    if liste is None:
+                        liste = listes[prefixe + trigramme] = array('I')
+                    liste.append(identifiant)
+        return cls(entrees, listes)
+
+    @classmethod
+    def depuis_csv(cls, nom_fichier='discogs_albums_final.csv'):
+        with open(nom_fichier, newline='', encoding='utf-8') as csvfile:
+            return cls.construire(csv.DictReader(csvfile))
+
+    # --- Persistance ---------------------------------------------------------
+
+    def enregistrer(self, chemin=None):
+        chemin = chemin or config.FICHIER_INDEX_RECHERCHE
+        connexion = sqlite3.connect(chemin)
+        with connexion:
+            connexion.executescript(SCHEMA)
+            connexion.execute("DELETE FROM entrees")
+            connexion.execute("DELETE FROM trigrammes")
+            connexion.executemany("INSERT INTO entrees (id, artiste, album, url) VALUES (?, ?, ?, ?)",
+                                  ((i, *entree) for i, entree in enumerate(self.entrees)))
+            connexion.executemany("INSERT INTO trigrammes (trigramme, ids) VALUES (?, ?)",
+                                  ((trigramme, liste.tobytes()) for trigramme, liste in self.listes.items()))
+        connexion.close()
+
+    @classmethod
+    def ouvrir(cls, chemin=None):
+        chemin = chemin or config.FICHIER_INDEX_RECHERCHE
+        connexion = sqlite3.connect(chemin)
+        entrees = [tuple(ligne) for ligne in
+                   connexion.execute("SELECT artiste, album, url FROM entrees ORDER BY id")]
+        listes = {}
+        for trigramme, ids in connexion.execute("SELECT trigramme, ids FROM trigrammes"):
+            liste = array('I')
+            liste.frombytes(ids)
+            listes[trigramme] = liste
+        connexion.close()
+        return cls(entrees, listes)
+
+    # --- Recherche -----------------------------------------------------------
+
+    def chercher(self, artiste=None, album=None, limite=5, score_min=0.3):
+
+        # Meilleures correspondances : [{'artiste', 'album', 'url', 'score'}], score décroissant
+        # Avec un seul des deux champs, seul ce champ est comparé
+
+        cle_artiste = cle_normalisee(artiste, nettoyer_artiste)
+        cle_album = cle_normalisee(album, nettoyer_album)
+        if not cle_artiste and not cle_album:
+            return []
+
+        exacts = self.exacts.get((cle_artiste, cle_album)) if cle_artiste and cle_album else None
+        if exacts and limite <= len(exacts):
+            return [self._resultat(i, 1.0) for i in exacts[:limite]]
+
+        requete = {}
+        if cle_artiste:
+            requete[CHAMP_ARTISTE] = trigrammes(cle_artiste)
+        if cle_album:
+            requete[CHAMP_ALBUM] = trigrammes(cle_album)
+
+        candidats = self._candidats(requete)
+        scores = []
+        for identifiant in candidats:
+            cles = self.cles[identifiant]
+            score = 0.0
+            if CHAMP_ARTISTE in requete:
+                score += similarite(requete[CHAMP_ARTISTE], trigrammes(cles[0]))
+            if CHAMP_ALBUM in requete:
+                score += similarite(requete[CHAMP_ALBUM], trigrammes(cles[1]))
+            score /= len(requete)
+            if score >= score_min:
+                scores.append((score, identifiant))
+
+        scores.sort(key=lambda s: (-s[0], s[1]))
+        return [self._resultat(identifiant, score) for score, identifiant in scores[:limite]]
+
+    def _candidats(self, requete):
+
+        # Identifiants qui partagent le plus de trigrammes sélectifs avec la requête
+
+        listes = [self.listes[prefixe + trigramme]
+                  for prefixe, ensemble in requete.items()
+                  for trigramme in ensemble if prefixe + trigramme in self.listes]
+        if not listes:
+            return []
+        listes.sort(key=len)
+        selectives = [liste for liste in listes if len(liste) <= self.seuil_frequents]
+        # Que des trigrammes fréquents : les plus rares d'entre eux
+        selectives = selectives or listes[:3]
+
+        # Comptage vectorisé sur les seuls identifiants rencontrés (listes lues sans copie)
+        identifiants = np.concatenate([np.frombuffer(liste, dtype=np.uint32) for liste in selectives])
+        valeurs, comptes = np.unique(identifiants, return_counts=True)
+        if len(valeurs) > CANDIDATS_MAX:
+            valeurs = valeurs[np.argpartition(-comptes, CANDIDATS_MAX)[:CANDIDATS_MAX]]
+        return valeurs.tolist()
+
+    def _resultat(self, identifiant, score):
+        artiste, album, url = self.entrees[identifiant]
+        return {'artiste': artiste, 'album': album, 'url': url, 'score': round(score, 3)}
+
+    def __len__(self):
+        return len(self.entrees)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Correspondance floue artiste / album")
+    parser.add_argument("--index", default=None,
+                        help=f"Fichier de l'index (défaut : {config.FICHIER_INDEX_RECHERCHE})")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    commande_construire = commandes.add_parser("construire", help="Construit l'index depuis le CSV")
+    commande_construire.add_argument("fichier", nargs="?", default="discogs_albums_final.csv")
+
+    commande_chercher = commandes.add_parser("chercher", help="Meilleures correspondances")
+    commande_chercher.add_argument("artiste")
+    commande_chercher.add_argument("album", nargs="?")
+    commande_chercher.add_argument("-n", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.commande == "construire":
+        debut = time.perf_counter()
+        index = IndexCorrespondance.depuis_csv(args.fichier)
+        index.enregistrer(args.index)
+        print(f"✓ {len(index)} albums indexés en {time.perf_counter() - debut:.2f}s "
+              f"({len(index.listes)} trigrammes)")
+    else:
+        index = IndexCorrespondance.ouvrir(args.index)
+        debut = time.perf_counter()
+        resultats = index.chercher(args.artiste, args.album, args.n)
+        duree = (time.perf_counter() - debut) * 1000
+        for resultat in resultats:
+            print(f"  {resultat['score']:.3f}  {resultat['artiste']} - {resultat['album']}  {resultat['url']}")
+        print(f"\nRecherche : {duree:.2f} ms")
@@ -0,0 +1,298 @@
+import asyncio
+import atexit
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import asynccontextmanager
+
+import configuration as config
+from disjoncteur import PageBloquee, detecter_blocage, disjoncteur
+from pool_navigateurs import pool_de_la_boucle, fermer_pool
+from latences import suivi_latences
+
+# -----------------------------------------------------------------------------
+# CODE DE BASE AVEC SYSTÈME DE RETRY
+# -----------------------------------------------------------------------------
+
+def _charger_crawl4ai():
+    
+    # Import différé de crawl4ai (Playwright + grosse arborescence de dépendances) :
+    # chargé seulement au premier téléchargement, pas pour le parsing hors ligne
+    
+    from crawl4ai import AsyncWebCrawler
+    from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
+    return AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+
+async def _lancer_navigateur():
+    
+    # Démarre un navigateur pour le pool (fermé par le pool lors du recyclage)
+    
+    AsyncWebCrawler, BrowserConfig, _ = _charger_crawl4ai()
+    crawler = AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False))
+    await crawler.start()
+    return crawler
+
+@asynccontextmanager
+async def _navigateur():
+    
+    # Navigateur du pool de la boucle courante, ou un navigateur par page si TAILLE_POOL = 0
+    
+    if config.TAILLE_POOL:
+        async with pool_de_la_boucle(_lancer_navigateur).navigateur() as crawler:
+            yield crawler
+    else:
+        AsyncWebCrawler, BrowserConfig, _ = _charger_crawl4ai()
+        async with AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False)) as crawler:
+            yield crawler
+
+def _contenu_valide(result):
+    return bool(result and result.html and len(result.html) > 500)
+
+async def _telecharger(url, crawler_config, type_page, timeout_s):
+    
+    # Un chargement borné par le timeout (adaptatif) ; sa durée alimente le suivi des latences
+    # Chrono lancé une fois le navigateur obtenu : l'attente d'une place dans le pool
+    # n'est pas de la latence de page (elle fausserait p95, timeouts et relances)
+    
+    try:
+        async with _navigateur() as crawler:
+            debut = time.monotonic()
+            result = await asyncio.wait_for(crawler.arun(url=url, config=crawler_config), timeout_s)
+            duree = time.monotonic() - debut
+    except asyncio.TimeoutError:
+        suivi_latences.compter(type_page, 'timeouts')
+        raise TimeoutError(f"Pas de réponse après {timeout_s:.1f}s")
+    if _contenu_valide(result):
+        suivi_latences.enregistrer(type_page, duree)
+    return result
+
+async def _telecharger_avec_relance(url, crawler_config, type_page, timeout_s):
+    
+    # Si la page n'a pas répondu après le p95 de son type, une seconde tentative
+    # part en parallèle : la première réponse valide l'emporte, l'autre est annulée
+    # (son navigateur, interrompu en plein arun, est fermé par le pool au lieu d'y retourner)
+    
+    premiere = asyncio.ensure_future(_telecharger(url, crawler_config, type_page, timeout_s))
+    delai = suivi_latences.delai_relance(type_page)
+    if delai is None:
+        return await premiere
+    
+    termines, _ = await asyncio.wait({premiere}, timeout=delai)
+    if termines:
+        return premiere.result()
+    
+    suivi_latences.compter(type_page, 'relances')
+    seconde = asyncio.ensure_future(_telecharger(url, crawler_config, type_page, timeout_s))
+    en_cours = {premiere, seconde}
+    try:
+        while en_cours:
+            termines, en_cours = await asyncio.wait(en_cours, return_when=asyncio.FIRST_COMPLETED)
+            for tache in termines:
+                if tache.exception() is None and _contenu_valide(tache.result()):
+                    if tache is seconde:
+                        suivi_latences.compter(type_page, 'relances_gagnantes')
+                    return tache.result()
+        # Aucune réponse valide : résultat (ou erreur) de la première tentative
+        return premiere.result()
+    finally:
+        for tache in en_cours:
+            tache.cancel()
+        await asyncio.gather(premiere, seconde, return_exceptions=True)
+
+def _type_page(wait_for_selector):
+    
+    # Les pages catalogue attendent les cartes, les pages album attendent "body"
+    
+    return 'catalogue' if 'card-release' in wait_for_selector else 'album'
+
+async def _avec_retry(charger, url, type_page, max_retries):
+    
+    # Boucle de retry commune aux deux chemins (navigateur et HTTP)
+    # charger : coroutine sans argument qui effectue une tentative
+    
+    for tentative in range(max_retries):
+        # Disjoncteur ouvert : attendre la fin du refroidissement
+        await disjoncteur.attendre_async()
+        try:
+            result = await charger()
+            
+            # Réponse HTTP 304 : page inchangée, pas de contenu à vérifier
+            if getattr(result, 'statut', None) == 304:
+                disjoncteur.signaler_succes()
+                return result
+            
+            # Vérifier que le contenu est valide
+            if _contenu_valide(result):
+                motif = detecter_blocage(result.html, type_page) if config.DETECTION_BLOCAGE else None
+                if motif:
+                    disjoncteur.signaler_blocage(motif)
+                    raise PageBloquee(motif, url)
+                disjoncteur.signaler_succes()
+                return result
+            else:
+                raise Exception("Contenu invalide ou vide")
+        
+        except Exception as e:
+            if not isinstance(e, PageBloquee):
+                disjoncteur.signaler_erreur()
+            print(f"    Tentative {tentative + 1}/{max_retries} échouée: {str(e)[:60]}...")
+            
+            # Si c'est la dernière tentative, on lève l'erreur
+            if tentative == max_retries - 1:
+                print(f"    Échec définitif après {max_retries} tentatives")
+                raise e
+            
+            # Sinon on attend et on réessaye
+            print(f"    Attente {config.PAUSE_RETRY}s avant nouvelle tentative...")
+            await asyncio.sleep(config.PAUSE_RETRY)
+    
+    return None
+
+async def crawl_get_async(url: str, wait_for_selector: str = "body", max_retries: int = 3,
+                          type_page: str = None):
+    
+    # Fonction de crawling avec retry simple en cas d'erreur
+    # Version asynchrone : utilisable dans une boucle d'événements existante
+    # Les pages de blocage lèvent PageBloquee et alimentent le disjoncteur global
+    
+    type_page = type_page or _type_page(wait_for_selector)
+    
+    async def _charger():
+        _, _, CrawlerRunConfig = _charger_crawl4ai()
+        
+        # Timeout déduit des latences observées pour ce type de page
+        timeout_s = suivi_latences.timeout_s(type_page)
+        crawler_config = CrawlerRunConfig(
+            wait_for=wait_for_selector,
+            delay_before_return_html=config.DELAI_AVANT_HTML,
+            page_timeout=int(min(timeout_s * 1000, config.PAGE_TIMEOUT_MS))
+        )
+        return await _telecharger_avec_relance(url, crawler_config, type_page, timeout_s)
+    
+    return await _avec_retry(_charger, url, type_page, max_retries)
+
+# -----------------------------------------------------------------------------
+# CHEMIN HTTP (sans navigateur, requêtes conditionnelles)
+# -----------------------------------------------------------------------------
+#
+# Les pages release sont rendues côté serveur : une simple requête HTTP suffit
+# et permet d'envoyer If-None-Match / If-Modified-Since. Le serveur répond alors
+# 304 sans contenu quand la page n'a pas changé.
+
+ENTETES_HTTP = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/124.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'fr-FR,fr;q=0.9',
+}
+
+class ReponseHttp:
+    
+    # Même attribut html que le résultat de crawl4ai, plus les validateurs HTTP
+    
+    __slots__ = ('url', 'statut', 'html', 'etag', 'derniere_modification')
+    
+    def __init__(self, url, statut, html='', etag=None, derniere_modification=None):
+        self.url = url
+        self.statut = statut
+        self.html = html
+        self.etag = etag
+        self.derniere_modification = derniere_modification
+
+def _requete_http(url, entetes, timeout_s):
+    
+    # Requête bloquante (exécutée dans un thread)
+    
+    requete = urllib.request.Request(url, headers=entetes)
+    try:
+        with urllib.request.urlopen(requete, timeout=timeout_s) as reponse:
+            charset = reponse.headers.get_content_charset() or 'utf-8'
+            return ReponseHttp(url, reponse.status, reponse.read().decode(charset, errors='replace'),
+                               reponse.headers.get('ETag'), reponse.headers.get('Last-Modified'))
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return ReponseHttp(url, 304, '', e.headers.get('ETag'), e.headers.get('Last-Modified'))
+        raise
+
+async def http_get_async(url: str, etag: str = None, derniere_modification: str = None,
+                         type_page: str = 'album', max_retries: int = 3):
+    
+    # Téléchargement HTTP conditionnel ; ReponseHttp.statut == 304 si la page est inchangée
+    
+    entetes = dict(ENTETES_HTTP)
+    if etag:
+        entetes['If-None-Match'] = etag
+    if derniere_modification:
+        entetes['If-Modified-Since'] = derniere_modification
+    
+    async def _charger():
+        timeout_s = suivi_latences.timeout_s(type_page)
+        debut = time.monotonic()
+        try:
+            reponse = await asyncio.wait_for(asyncio.to_thread(_requete_http, url, entetes, timeout_s),
+                                             timeout_s)
+        except asyncio.TimeoutError:
+            suivi_latences.compter(type_page, 'timeouts')
+            raise TimeoutError(f"Pas de réponse après {timeout_s:.1f}s")
+        if _contenu_valide(reponse):
+            suivi_latences.enregistrer(type_page, time.monotonic() - debut)
+        return reponse
+    
+    return await _avec_retry(_charger, url, type_page, max_retries)
+
+# -----------------------------------------------------------------------------
+# VERSION BLOQUANTE
+# -----------------------------------------------------------------------------
+#
+# Les navigateurs du pool sont liés à une boucle d'événements : les appels
+# bloquants (y compris depuis les threads des shards) passent tous par une
+# boucle unique qui tourne dans un thread en arrière-plan.
+
+_boucle = None
+_verrou_boucle = threading.Lock()
+
+def _boucle_arriere_plan():
+    global _boucle
+    with _verrou_boucle:
+        if _boucle is None:
+            _boucle = asyncio.new_event_loop()
+            threading.Thread(target=_boucle.run_forever, daemon=True).start()
+            atexit.register(fermer_navigateurs)
+    return _boucle
+
+def fermer_navigateurs():
+    
+    # Ferme les navigateurs de la boucle en arrière-plan (appelé à la sortie du programme)
+    
+    global _boucle
+    with _verrou_boucle:
+        boucle, _boucle = _boucle, None
+    if boucle is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(fermer_pool(), boucle).result(timeout=60)
+    finally:
+        boucle.call_soon_threadsafe(boucle.stop)
+
+def _executer(coroutine):
+    
+    # Sans pool : une boucle d'événements (et un navigateur) par appel
+    
+    if not config.TAILLE_POOL:
+        return asyncio.run(coroutine)
+    return asyncio.run_coroutine_threadsafe(coroutine, _boucle_arriere_plan()).result()
+
+def crawl_get(url: str, wait_for_selector: str = "body", max_retries: int = 3,
+              type_page: str = None):
+    
+    # Version bloquante de crawl_get_async
+    
+    return _executer(crawl_get_async(url, wait_for_selector, max_retries, type_page))
+
+def http_get(url: str, etag: str = None, derniere_modification: str = None,
+             type_page: str = 'album', max_retries: int = 3):
+    
+    # Version bloquante de http_get_async
+    
+    return _executer(http_get_async(url, etag, derniere_modification, type_page, max_retries))
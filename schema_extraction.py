@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import re
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+import configuration as config
+import nettoyage
+
+# -----------------------------------------------------------------------------
+# SCHÉMA DÉCLARATIF DE LA PAGE ALBUM, COMPILÉ UNE SEULE FOIS
+# -----------------------------------------------------------------------------
+#
+# Les champs de la page album sont décrits dans schema_album.json et non dans
+# le code. Par champ :
+#   - selecteurs : sélecteurs CSS essayés dans l'ordre (le suivant sert de
+#                  secours si Discogs renomme ses classes hachées "name_qjn4_")
+#   - attribut   : attribut lu au lieu du texte ("datetime", "href")
+#   - motif      : expression régulière, groupe 1 gardé
+#   - contient   : le texte de l'élément doit contenir l'une de ces chaînes
+#   - tous       : toutes les valeurs distinctes, séparées par ", "
+#   - nettoyeur  : fonction de nettoyage.py (ignorée avec nettoyer=False)
+# Section "statistiques" : une ligne par statistique, reconnue par son
+# libellé. Les libellés sont donnés par langue (expressions régulières sur le
+# libellé en minuscules, première règle qui correspond gagnante) ; seules les
+# langues de LANGUES_EXTRACTION sont compilées.
+#
+# La compilation est faite une fois par schéma : sélecteurs simples
+# ("a[href*='/label/']", "span.name_qjn4_") traduits en prédicats Python
+# (soupsieve pour les autres), nettoyeurs résolus, une expression par règle
+# de libellé, et la liste des balises utiles pour ne construire que ces
+# parties de l'arbre (SoupStrainer). Tous les champs de niveau page sont
+# cherchés en un seul parcours de l'arbre ; un libellé déjà rencontré est
+# résolu par une simple recherche dans un dictionnaire.
+
+# À incrémenter quand le code d'extraction change le résultat à schéma égal
+# (les infos gardées par cache_pages.py sont alors ré-extraites)
+VERSION_EXTRACTEUR = 2
+
+# Sélecteur simple : balise suivie de #id, .classe, [attribut], [attribut=|*=|^=|$="valeur"]
+RE_SELECTEUR_SIMPLE = re.compile(r'^([a-zA-Z][\w-]*)((?:#[\w-]+|\.[\w-]+|\[[\w-]+(?:[*^$]?=(?:"[^"]*"|\'[^\']*\'))?\])*)$')
+RE_CONDITION = re.compile(r'#([\w-]+)|\.([\w-]+)|\[([\w-]+)(?:([*^$]?=)(?:"([^"]*)"|\'([^\']*)\'))?\]')
+
+def _texte_attribut(element, attribut):
+
+    # Valeur d'attribut comme la voit CSS : les classes (listes) jointes par un espace
+
+    valeur = element.get(attribut)
+    if isinstance(valeur, list):
+        return ' '.join(valeur)
+    return valeur
+
+class _Selecteur:
+
+    # Sélecteur CSS compilé : les sélecteurs simples en un prédicat Python, les autres par soupsieve
+
+    def __init__(self, source):
+        self.source = source.strip()
+        match = RE_SELECTEUR_SIMPLE.match(self.source)
+        if match is None:
+            self.balise = None
+            self._compile = soupsieve.compile(self.source)
+            return
+
+        self.balise = match.group(1).lower()
+        self._compile = None
+        conditions = []
+        for identifiant, classe, attribut, operateur, guillemets, apostrophes in RE_CONDITION.findall(match.group(2)):
+            if identifiant:
+                conditions.append(lambda e, v=identifiant: e.get('id') == v)
+            elif classe:
+                conditions.append(lambda e, v=classe: v in (e.get('class') or ()))
+            elif not operateur:
+                conditions.append(lambda e, a=attribut: e.get(a) is not None)
+            else:
+                valeur = guillemets or apostrophes
+                test = {'=': str.__eq__, '*=': str.__contains__,
+                        '^=': str.startswith, '$=': str.endswith}[operateur]
+                conditions.append(lambda e, a=attribut, v=valeur, t=test:
+                                  (_texte_attribut(e, a) or None) is not None and t(_texte_attribut(e, a), v))
+        self.conditions = conditions
+
+    def correspond(self, element):
+        for condition in self.conditions:
+            if not condition(element):
+                return False
+        return True
+
+    def elements(self, racine):
+
+        # Éléments de la racine qui correspondent, dans l'ordre du document
+
+        if self._compile is not None:
+            return self._compile.select(racine)
+        # Parcours direct des descendants (find_all crée un SoupStrainer à chaque appel)
+        return [element for element in racine.descendants
+                if element.name == self.balise and self.correspond(element)]
+
+class _Champ:
+
+    def __init__(self, nom, definition):
+        self.nom = nom
+        selecteurs = definition.get('selecteurs')
+        if not selecteurs:
+            raise ValueError(f"Champ '{nom}' : aucun sélecteur")
+        self.selecteurs = [_Selecteur(selecteur) for selecteur in selecteurs]
+        self.attribut = definition.get('attribut')
+        self.motif = re.compile(definition['motif']) if definition.get('motif') else None
+        self.contient = tuple(definition.get('contient', ()))
+        self.tous = definition.get('tous', False)
+        self.nettoyeur = None
+        if definition.get('nettoyeur'):
+            self.nettoyeur = getattr(nettoyage, definition['nettoyeur'], None)
+            if self.nettoyeur is None:
+                raise ValueError(f"Champ '{nom}' : nettoyeur inconnu '{definition['nettoyeur']}'")
+
+    def _valeur(self, element):
+
+        # Valeur d'un élément ('' s'il ne convient pas)
+
+        if self.contient:
+            texte_complet = element.get_text()
+            if not any(chaine in texte_complet for chaine in self.contient):
+                return ''
+        if self.attribut:
+            valeur = element.get(self.attribut) or ''
+        else:
+            valeur = element.get_text(strip=True)
+        if self.motif is not None and valeur:
+            match = self.motif.search(valeur)
+            valeur = match.group(1) if match else ''
+        return valeur
+
+    def extraire(self, elements_par_selecteur, nettoyer=True, exclu=None):
+
+        # Premier sélecteur qui donne une valeur ; exclu : élément ignoré (libellé de la ligne)
+        # elements_par_selecteur(selecteur) : éléments trouvés, dans l'ordre du document
+
+        valeur = ''
+        for selecteur in self.selecteurs:
+            if self.tous:
+                valeurs = []
+                for element in elements_par_selecteur(selecteur):
+                    texte = self._valeur(element)
+                    if texte and texte not in valeurs:
+                        valeurs.append(texte)
+                valeur = ', '.join(valeurs)
+            else:
+                for element in elements_par_selecteur(selecteur):
+                    if element is not exclu:
+                        valeur = self._valeur(element)
+                        if valeur:
+                            break
+            if valeur:
+                break
+
+        if valeur and nettoyer and self.nettoyeur is not None:
+            return self.nettoyeur(valeur)
+        return valeur
+
+class ExtracteurAlbum:
+
+    def __init__(self, schema, langues=('fr',)):
+        self.champs = [_Champ(nom, definition) for nom, definition in schema['champs'].items()]
+
+        # Version des infos produites : schéma, langues et code d'extraction
+        source = json.dumps([VERSION_EXTRACTEUR, list(langues), schema], sort_keys=True, ensure_ascii=False)
+        self.version = hashlib.blake2b(source.encode('utf-8'), digest_size=8).hexdigest()
+
+        statistiques = schema.get('statistiques') or {}
+        self.sections = [_Selecteur(s) for s in statistiques.get('section', [])]
+        self.ligne = _Selecteur(statistiques.get('ligne', 'li'))
+        self.libelles = [_Selecteur(s) for s in statistiques.get('libelle', [])]
+
+        # Règles dans l'ordre du schéma : ("moyenne" avant "moyen")
+        self.regles = []
+        for nom, definition in (statistiques.get('champs') or {}).items():
+            motifs = [motif for langue in langues for motif in definition['libelles'].get(langue, [])]
+            if motifs:
+                self.regles.append((re.compile('|'.join(f'(?:{m})' for m in motifs)), _Champ(nom, definition)))
+        self._regle_par_libelle = {}
+
+        self.noms = ['url'] + [champ.nom for champ in self.champs] + [champ.nom for _, champ in self.regles]
+
+        # Sélecteurs de niveau page, évalués en un seul parcours de l'arbre, rangés par balise
+        self._niveau_page = [selecteur for champ in self.champs for selecteur in champ.selecteurs]
+        self._niveau_page += self.sections
+        self._par_balise = {}
+        self._complexes = []
+        for selecteur in self._niveau_page:
+            if selecteur.balise is None:
+                self._complexes.append(selecteur)
+            else:
+                self._par_balise.setdefault(selecteur.balise, []).append(selecteur)
+
+        # Balises à garder dans l'arbre (SoupStrainer) ; arbre complet si un sélecteur est complexe
+        self.filtre = None if self._complexes else SoupStrainer(sorted(self._par_balise))
+
+    def _regle(self, libelle):
+
+        # Champ d'une statistique d'après son libellé (mémorisé : les libellés se répètent)
+
+        if libelle not in self._regle_par_libelle:
+            self._regle_par_libelle[libelle] = next(
+                (champ for expression, champ in self.regles if expression.search(libelle)), None)
+        return self._regle_par_libelle[libelle]
+
+    def _parcourir(self, soup):
+
+        # {sélecteur: éléments} pour tous les sélecteurs de niveau page, en un passage
+
+        trouves = {selecteur: [] for selecteur in self._niveau_page}
+        for selecteur in self._complexes:
+            trouves[selecteur] = selecteur.elements(soup)
+        for element in soup.descendants:
+            for selecteur in self._par_balise.get(element.name, ()):
+                if selecteur.correspond(element):
+                    trouves[selecteur].append(element)
+        return trouves
+
+    def extraire(self, html_content, url, nettoyer=True):
+
+        # {champ: valeur} pour tous les champs du schéma ('' si absent)
+
+        infos = dict.fromkeys(self.noms, '')
+        infos['url'] = url
+        soup = BeautifulSoup(html_content, 'html.parser', parse_only=self.filtre)
+
+        try:
+            trouves = self._parcourir(soup)
+            for champ in self.champs:
+                infos[champ.nom] = champ.extraire(trouves.__getitem__, nettoyer)
+
+            section = next((trouves[s][0] for s in self.sections if trouves[s]), None)
+            if section is None:
+                return infos
+
+            for ligne in self.ligne.elements(section):
+                try:
+                    libelle = next((e for s in self.libelles for e in s.elements(ligne)), None)
+                    if libelle is None:
+                        continue
+                    champ = self._regle(libelle.get_text(strip=True).lower())
+                    if champ is None:
+                        continue
+                    valeur = champ.extraire(lambda s: s.elements(ligne), nettoyer, exclu=libelle)
+                    if valeur:
+                        infos[champ.nom] = valeur
+                except Exception as e:
+                    continue
+
+            return infos
+
+        except Exception as e:
+            print(f"    Erreur extraction : {e}")
+            return infos
+
+def charger_schema(chemin=None):
+    chemin = chemin or config.FICHIER_SCHEMA_EXTRACTION
+    if not os.path.isabs(chemin):
+        # Relatif au dossier du projet (et non au dossier courant)
+        chemin = os.path.join(os.path.dirname(os.path.abspath(__file__)), chemin)
+    with open(chemin, encoding='utf-8') as f:
+        return json.load(f)
+
+_extracteurs = {}
+
+def extracteur_album():
+
+    # Extracteur compilé pour le schéma et les langues de la configuration (une fois par couple)
+
+    cle = (config.FICHIER_SCHEMA_EXTRACTION, tuple(config.LANGUES_EXTRACTION))
+    if cle not in _extracteurs:
+        _extracteurs[cle] = ExtracteurAlbum(charger_schema(cle[0]), cle[1])
+    return _extracteurs[cle]